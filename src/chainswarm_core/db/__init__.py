@@ -1,17 +1,65 @@
 """Database utilities for ClickHouse repositories."""
 
 from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.budget import (
+    QueryBudget,
+    get_query_budget,
+    query_budget,
+    set_query_budget,
+)
+from chainswarm_core.db.checksum import (
+    RangeChecksum,
+    RangeDiff,
+    TableDiff,
+    diff_tables,
+)
 from chainswarm_core.db.client_factory import ClientFactory
+from chainswarm_core.db.concurrency import (
+    ConcurrencyLimiter,
+    LocalConcurrencyLimiter,
+    RedisConcurrencyLimiter,
+    clickhouse_workload,
+    concurrency_slot,
+    get_concurrency_limiter,
+    set_concurrency_limiter,
+)
 from chainswarm_core.db.connection import (
     create_database,
     get_connection_params,
     truncate_table,
 )
+from chainswarm_core.db.fingerprint import normalize_query, query_fingerprint
+from chainswarm_core.db.metadata import (
+    ColumnMetadata,
+    SchemaMetadataCache,
+    schema_cache,
+)
 from chainswarm_core.db.migrations import (
     BaseMigrateSchema,
     apply_schema_content,
     apply_schema_file,
 )
+from chainswarm_core.db.parquet import (
+    ParquetFile,
+    export_query_to_parquet,
+    import_parquet_file,
+    import_parquet_files,
+)
+from chainswarm_core.db.query_tracker import (
+    InFlightQuery,
+    InFlightQueryRegistry,
+    cancel_inflight_queries,
+    inflight_queries,
+)
+from chainswarm_core.db.result_cache import ResultCache, is_closed_window
+from chainswarm_core.db.sharding import (
+    AddressPartitioner,
+    ShardSpec,
+    city_hash64,
+    jump_consistent_hash,
+    shard_for_address,
+)
+from chainswarm_core.db.singleflight import SingleFlight, query_singleflight
 from chainswarm_core.db.utils import (
     clickhouse_row_to_pydantic,
     convert_clickhouse_enum,
@@ -22,16 +70,63 @@ from chainswarm_core.db.utils import (
 __all__ = [
     # Repository
     "BaseRepository",
+    # Query budgets
+    "QueryBudget",
+    "get_query_budget",
+    "query_budget",
+    "set_query_budget",
+    # Table checksums
+    "RangeChecksum",
+    "RangeDiff",
+    "TableDiff",
+    "diff_tables",
     # Client factory
     "ClientFactory",
+    # Concurrency limits
+    "ConcurrencyLimiter",
+    "LocalConcurrencyLimiter",
+    "RedisConcurrencyLimiter",
+    "clickhouse_workload",
+    "concurrency_slot",
+    "get_concurrency_limiter",
+    "set_concurrency_limiter",
     # Connection utilities
     "create_database",
     "truncate_table",
     "get_connection_params",
+    # Schema metadata
+    "ColumnMetadata",
+    "SchemaMetadataCache",
+    "schema_cache",
     # Migrations
     "BaseMigrateSchema",
     "apply_schema_content",
     "apply_schema_file",
+    # Parquet export/import
+    "ParquetFile",
+    "export_query_to_parquet",
+    "import_parquet_file",
+    "import_parquet_files",
+    # In-flight query tracking
+    "InFlightQuery",
+    "InFlightQueryRegistry",
+    "cancel_inflight_queries",
+    "inflight_queries",
+    # Query fingerprints
+    "normalize_query",
+    "query_fingerprint",
+    # Result cache
+    "ResultCache",
+    "is_closed_window",
+    # Sharding
+    "AddressPartitioner",
+    "ShardSpec",
+    "city_hash64",
+    "jump_consistent_hash",
+    "shard_for_address",
+    # Singleflight
+    "SingleFlight",
+    "query_singleflight",
     # Row utilities
     "row_to_dict",
     "convert_clickhouse_enum",
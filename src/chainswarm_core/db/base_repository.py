@@ -2,9 +2,34 @@
 
 import time
 from abc import ABC
-from typing import Optional
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Sequence
 
 import clickhouse_connect
+from clickhouse_connect.driver.exceptions import ClickHouseError
+from clickhouse_connect.driver.query import QueryResult
+from clickhouse_connect.driver.summary import QuerySummary
+
+from chainswarm_core.db.budget import get_query_budget, record_budget_exceeded
+from chainswarm_core.db.concurrency import (
+    DEFAULT_WORKLOAD,
+    clickhouse_workload,
+    concurrency_slot,
+    get_clickhouse_workload,
+)
+from chainswarm_core.db.fingerprint import query_fingerprint
+from chainswarm_core.db.metadata import ColumnMetadata, schema_cache
+from chainswarm_core.db.parquet import (
+    ClientContextProvider,
+    ParquetFile,
+    export_query_to_parquet,
+    import_parquet_file,
+    import_parquet_files,
+)
+from chainswarm_core.db.query_tracker import inflight_queries
+from chainswarm_core.db.sharding import SHARD_STRATEGY_JUMP, ShardSpec
+from chainswarm_core.db.singleflight import query_singleflight
 
 
 class BaseRepository(ABC):
@@ -13,20 +38,43 @@ class BaseRepository(ABC):
 
     Provides common functionality for all repository classes including
     client management and version generation for optimistic locking.
+
+    Queries issued through ``_query``, ``_stream``, ``_command`` and ``_insert`` are
+    tracked as in-flight so they can be cancelled on shutdown, and carry the
+    ``QueryBudget`` bound to the current task as query settings. When a
+    ``ConcurrencyLimiter`` is installed, each of them first waits for a slot
+    of the repository's ``workload_class`` (or the one bound with
+    ``clickhouse_workload``).
     """
 
+    # Concurrency limiter class of this repository's queries, e.g. "heavy" or "light"
+    workload_class: str = DEFAULT_WORKLOAD
+
     def __init__(
-        self, client: clickhouse_connect.driver.Client, partition_id: Optional[int] = None
+        self,
+        client: clickhouse_connect.driver.Client,
+        partition_id: Optional[int] = None,
+        shard_count: Optional[int] = None,
+        shard_strategy: str = SHARD_STRATEGY_JUMP,
     ):
         """
         Initialize the repository with a ClickHouse client.
 
         Args:
             client: ClickHouse client instance
-            partition_id: Optional partition ID for version generation
+            partition_id: Optional partition ID for version generation; together
+                with ``shard_count`` it is the index of the shard this
+                repository works on
+            shard_count: Optional total number of shards
+            shard_strategy: Address to shard mapping (``jump`` or ``modulo``)
         """
         self.client = client
         self.partition_id = partition_id
+        self.shard: Optional[ShardSpec] = None
+        if shard_count is not None:
+            if partition_id is None:
+                raise ValueError("partition_id is required when shard_count is set")
+            self.shard = ShardSpec(partition_id, shard_count, shard_strategy)
 
     def _generate_version(self) -> int:
         """
@@ -42,6 +90,368 @@ class BaseRepository(ABC):
             return base_version + self.partition_id
         return base_version
 
+    def _shard_condition(self, column: str = "address") -> str:
+        """
+        Return a SQL predicate restricting a scan to this repository's shard.
+
+        Returns ``1`` (always true) when the repository is not sharded, so it
+        can be embedded unconditionally:
+
+            WHERE processing_date = {date:Date} AND {self._shard_condition('address')}
+        """
+        if self.shard is None:
+            return "1"
+        return self.shard.condition(column)
+
+    def _query_settings(
+        self, settings: Optional[dict[str, Any]], query_id: Optional[str] = None
+    ) -> dict[str, Any]:
+        """
+        Build the settings sent with a single query.
+
+        Args:
+            settings: Caller supplied settings
+            query_id: Tracked query id
+
+        Returns:
+            Settings dict including the ``query_id`` (when given), capped by
+            the active query budget
+        """
+        query_settings = dict(settings or {})
+        budget = get_query_budget()
+        if budget is not None:
+            query_settings = budget.apply(query_settings, self._client_settings(budget.to_settings()))
+        if query_id is not None:
+            query_settings['query_id'] = query_id
+        return query_settings
+
+    def _client_settings(self, names: Iterable[str]) -> dict[str, Any]:
+        """Return the client-level values of the given settings that are set."""
+        get_setting = getattr(self.client, 'get_client_setting', None)
+        if get_setting is None:
+            return {}
+        values = {name: get_setting(name) for name in names}
+        return {name: value for name, value in values.items() if isinstance(value, (int, str)) and str(value).isdigit()}
+
+    @contextmanager
+    def _tracked_query(self, query: str) -> Iterator[str]:
+        """
+        Take a concurrency slot, track a query as in-flight and report budget-exceeded errors.
+
+        Yields:
+            The query id to send with the query
+        """
+        with concurrency_slot(self.workload_class), \
+                inflight_queries.track(query, database=self.client.database) as query_id:
+            try:
+                yield query_id
+            except ClickHouseError as e:
+                record_budget_exceeded(e)
+                raise
+
+    def _query(
+        self,
+        query: str,
+        parameters: Optional[dict[str, Any] | Sequence[Any]] = None,
+        settings: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> QueryResult:
+        """
+        Run a tracked SELECT query.
+
+        Args:
+            query: Query text
+            parameters: Query parameters
+            settings: Extra ClickHouse settings for this query
+            **kwargs: Passed through to ``client.query``
+
+        Returns:
+            ClickHouse query result
+        """
+        with self._tracked_query(query) as query_id:
+            return self.client.query(
+                query,
+                parameters=parameters,
+                settings=self._query_settings(settings, query_id),
+                **kwargs,
+            )
+
+    def _stream(
+        self,
+        query: str,
+        parameters: Optional[dict[str, Any] | Sequence[Any]] = None,
+        settings: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Iterator[Sequence[Sequence[Any]]]:
+        """
+        Stream a tracked SELECT query as blocks of rows.
+
+        The query stays registered as in-flight until the generator is
+        exhausted or closed. Suitable as the source of a ``BatchPipeline``.
+
+        Args:
+            query: Query text
+            parameters: Query parameters
+            settings: Extra ClickHouse settings for this query
+            **kwargs: Passed through to ``client.query_row_block_stream``
+
+        Yields:
+            Blocks of row tuples
+        """
+        with self._tracked_query(query) as query_id:
+            with self.client.query_row_block_stream(
+                query,
+                parameters=parameters,
+                settings=self._query_settings(settings, query_id),
+                **kwargs,
+            ) as stream:
+                for block in stream:
+                    yield block
+
+    def _query_shared(
+        self,
+        query: str,
+        parameters: Optional[dict[str, Any] | Sequence[Any]] = None,
+        settings: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> QueryResult:
+        """
+        Run a SELECT query, coalescing identical concurrent calls.
+
+        Callers issuing the same query (same text, parameters, settings and
+        database) while it is running wait for that execution and share its
+        result, which must therefore be treated as read-only. Use this for hot
+        lookups such as current label snapshots.
+        """
+        key = query_fingerprint(
+            query,
+            parameters,
+            self.client.database,
+            settings=self._query_settings(settings),
+            kwargs=kwargs,
+        )
+        return query_singleflight.do(key, self._query, query, parameters, settings, **kwargs)
+
+    def _command(
+        self,
+        cmd: str,
+        parameters: Optional[dict[str, Any] | Sequence[Any]] = None,
+        settings: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """
+        Run a tracked command (DDL, DELETE, OPTIMIZE, ...).
+
+        Args:
+            cmd: Command text
+            parameters: Command parameters
+            settings: Extra ClickHouse settings for this command
+            **kwargs: Passed through to ``client.command``
+
+        Returns:
+            Command result as returned by the client
+        """
+        with self._tracked_query(cmd) as query_id:
+            return self.client.command(
+                cmd,
+                parameters=parameters,
+                settings=self._query_settings(settings, query_id),
+                **kwargs,
+            )
+
+    def _insert(
+        self,
+        data: Sequence[Sequence[Any]],
+        column_names: str | Sequence[str] = '*',
+        table: Optional[str] = None,
+        settings: Optional[dict[str, Any]] = None,
+        **kwargs: Any,
+    ) -> QuerySummary:
+        """
+        Run a tracked insert.
+
+        Args:
+            data: Rows to insert
+            column_names: Column names matching the row layout
+            table: Target table (default: ``table_name()``)
+            settings: Extra ClickHouse settings for this insert
+            **kwargs: Passed through to ``client.insert``
+
+        Returns:
+            Insert summary
+        """
+        table = table or self.table_name()
+        with self._tracked_query(f"INSERT INTO {table}") as query_id:
+            return self.client.insert(
+                table,
+                data,
+                column_names=column_names,
+                settings=self._query_settings(settings, query_id),
+                **kwargs,
+            )
+
+    def _workload(self):
+        """Bind ``workload_class`` for queries issued outside ``_tracked_query`` (Parquet export/import)."""
+        return clickhouse_workload(get_clickhouse_workload() or self.workload_class)
+
+    def _columns(self) -> list[ColumnMetadata]:
+        """Return the cached column metadata of ``table_name()``."""
+        return schema_cache.get_columns(self.client, self.table_name())
+
+    def _column_types(self) -> dict[str, str]:
+        """Return a mapping of column name to ClickHouse type for ``table_name()``."""
+        return schema_cache.get_column_types(self.client, self.table_name())
+
+    def _select_columns(self, columns: Optional[Sequence[str]]) -> str:
+        return ", ".join(columns) if columns else "*"
+
+    def export_window_to_parquet(
+        self,
+        path: str | Path,
+        date_column: str,
+        start_date: str,
+        end_date: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> ParquetFile:
+        """
+        Export a date window of ``table_name()`` to a zstd Parquet file.
+
+        Args:
+            path: Destination file path
+            date_column: Date or DateTime column the window applies to
+            start_date: First day of the window (inclusive, YYYY-MM-DD)
+            end_date: Last day of the window (inclusive, YYYY-MM-DD)
+            columns: Columns to export (default: all)
+
+        Returns:
+            The written file
+        """
+        query = f"""
+            SELECT {self._select_columns(columns)}
+            FROM {self.table_name()}
+            WHERE toDate({date_column}) BETWEEN {{start_date:Date}} AND {{end_date:Date}}
+        """
+        with self._workload():
+            return export_query_to_parquet(
+                self.client,
+                query,
+                path,
+                parameters={"start_date": start_date, "end_date": end_date},
+                settings=self._query_settings(None),
+            )
+
+    def export_partition_to_parquet(
+        self,
+        path: str | Path,
+        partition_id: str,
+        columns: Optional[Sequence[str]] = None,
+    ) -> ParquetFile:
+        """
+        Export one partition of ``table_name()`` to a zstd Parquet file.
+
+        Args:
+            path: Destination file path
+            partition_id: Partition id as in ``system.parts.partition_id``
+            columns: Columns to export (default: all)
+
+        Returns:
+            The written file
+        """
+        query = f"""
+            SELECT {self._select_columns(columns)}
+            FROM {self.table_name()}
+            WHERE _partition_id = {{partition_id:String}}
+        """
+        with self._workload():
+            return export_query_to_parquet(
+                self.client,
+                query,
+                path,
+                parameters={"partition_id": partition_id},
+                settings=self._query_settings(None),
+            )
+
+    def _active_partition_ids(self) -> list[str]:
+        result = self._query(
+            """
+            SELECT DISTINCT partition_id
+            FROM system.parts
+            WHERE database = currentDatabase() AND table = {table:String} AND active
+            ORDER BY partition_id
+            """,
+            parameters={"table": self.table_name()},
+        )
+        return [row[0] for row in result.result_rows]
+
+    def export_partitions_to_parquet(
+        self,
+        directory: str | Path,
+        partition_ids: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> list[ParquetFile]:
+        """
+        Export partitions of ``table_name()`` to one Parquet file each.
+
+        Files are named ``<table>-<partition_id>.parquet`` so they can be
+        loaded back in parallel with ``import_parquet``.
+
+        Args:
+            directory: Destination directory
+            partition_ids: Partitions to export (default: all active partitions)
+            columns: Columns to export (default: all)
+
+        Returns:
+            The written files
+        """
+        directory = Path(directory)
+        if partition_ids is None:
+            partition_ids = self._active_partition_ids()
+        return [
+            self.export_partition_to_parquet(
+                directory / f"{self.table_name()}-{partition_id}.parquet",
+                partition_id,
+                columns,
+            )
+            for partition_id in partition_ids
+        ]
+
+    def import_parquet(
+        self,
+        paths: Sequence[str | Path],
+        client_context: Optional[ClientContextProvider] = None,
+        max_workers: int = 4,
+        column_names: Optional[Sequence[str]] = None,
+    ) -> list[ParquetFile]:
+        """
+        Load Parquet files into ``table_name()``.
+
+        Args:
+            paths: Parquet files to load
+            client_context: Callable returning a client context manager, e.g.
+                ``ClientFactory(params).client_context``. Required for parallel
+                loading; without it files are loaded one by one on ``self.client``.
+            max_workers: Number of concurrent inserts
+            column_names: Columns present in the files (default: all)
+
+        Returns:
+            Loaded files in the order of ``paths``
+        """
+        settings = self._query_settings(None)
+        with self._workload():
+            if client_context is None:
+                return [
+                    import_parquet_file(self.client, self.table_name(), path, column_names, settings)
+                    for path in paths
+                ]
+            return import_parquet_files(
+                client_context,
+                self.table_name(),
+                paths,
+                max_workers=max_workers,
+                column_names=column_names,
+                settings=settings,
+            )
+
     @classmethod
     def schema(cls) -> str:
         """Return the schema file name for this repository."""
@@ -50,4 +460,4 @@ class BaseRepository(ABC):
     @classmethod
     def table_name(cls) -> str:
         """Return the table name for this repository."""
-        pass
\ No newline at end of file
+        pass
@@ -0,0 +1,162 @@
+"""
+Per-task resource budgets for ClickHouse queries.
+
+A ``QueryBudget`` is bound to the current context (``BaseTask.run`` does this
+from the task context) and ``BaseRepository`` turns it into query settings
+for every query issued while it is active.
+"""
+
+import re
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, fields
+from typing import Any, Iterator, Mapping, Optional
+
+from chainswarm_core.observability import get_default_metrics_registry
+
+# A context variable rather than a thread local, so the budget follows the
+# task into coroutines and into threads started with copy_context().run
+_budget_context: ContextVar[Optional["QueryBudget"]] = ContextVar("chainswarm_query_budget", default=None)
+
+# ClickHouse error codes raised when a query hits one of the budget limits
+BUDGET_ERROR_CODES = {
+    158: "max_rows",  # TOO_MANY_ROWS
+    159: "max_execution_time",  # TIMEOUT_EXCEEDED
+    160: "max_execution_time",  # TOO_SLOW
+    241: "max_memory_usage",  # MEMORY_LIMIT_EXCEEDED
+}
+
+_ERROR_CODE_PATTERN = re.compile(r"Code: (\d+)")
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """
+    Server-side resource limits applied to every query of a task.
+
+    Attributes:
+        max_memory_usage: Max memory per query in bytes
+        max_threads: Max threads per query
+        max_execution_time: Max query runtime in seconds
+        priority: Query priority (lower value means higher priority, 0 disables)
+    """
+
+    max_memory_usage: Optional[int] = None
+    max_threads: Optional[int] = None
+    max_execution_time: Optional[int] = None
+    priority: Optional[int] = None
+
+    @classmethod
+    def from_context(cls, context: Any) -> "QueryBudget":
+        """
+        Build a budget from a task context dict or ``BaseTaskContext``.
+
+        Unknown keys are ignored and missing keys leave the limit unset.
+        """
+        if isinstance(context, Mapping):
+            values = {f.name: context.get(f.name) for f in fields(cls)}
+        else:
+            values = {f.name: getattr(context, f.name, None) for f in fields(cls)}
+        return cls(**values)
+
+    def is_empty(self) -> bool:
+        return all(getattr(self, f.name) is None for f in fields(self))
+
+    def to_settings(self) -> dict[str, int]:
+        """Return the ClickHouse settings for the limits that are set."""
+        return {
+            f.name: int(getattr(self, f.name))
+            for f in fields(self)
+            if getattr(self, f.name) is not None
+        }
+
+    def apply(
+        self,
+        settings: dict[str, Any],
+        client_settings: Optional[Mapping[str, Any]] = None,
+    ) -> dict[str, Any]:
+        """
+        Merge the budget into query settings.
+
+        Limits act as caps: when a setting is already present in the query
+        settings, or else in the client settings (e.g. the client-wide
+        ``max_execution_time``), the lower of the two values is used, so a
+        budget never loosens a limit. ``priority`` from the budget always wins.
+
+        Args:
+            settings: Query settings to merge into (not modified)
+            client_settings: Settings the client sends with every query
+
+        Returns:
+            New settings dict
+        """
+        merged = dict(settings)
+        client_settings = client_settings or {}
+        for name, value in self.to_settings().items():
+            current = merged.get(name, client_settings.get(name))
+            if name == "priority" or current is None or int(current) == 0:
+                merged[name] = value
+            else:
+                merged[name] = min(int(current), value)
+        return merged
+
+
+def get_query_budget() -> Optional[QueryBudget]:
+    return _budget_context.get()
+
+
+def set_query_budget(budget: Optional[QueryBudget]):
+    _budget_context.set(budget)
+
+
+@contextmanager
+def query_budget(budget: Optional[QueryBudget]) -> Iterator[Optional[QueryBudget]]:
+    """
+    Bind a budget to the current context for the duration of the block.
+
+    Example:
+        >>> with query_budget(QueryBudget(max_threads=4)):
+        ...     repository.fetch_window(...)
+    """
+    previous = get_query_budget()
+    set_query_budget(None if budget is None or budget.is_empty() else budget)
+    try:
+        yield budget
+    finally:
+        set_query_budget(previous)
+
+
+def get_budget_error_limit(error: BaseException) -> Optional[str]:
+    """
+    Return the name of the exceeded limit for a ClickHouse error.
+
+    Returns:
+        Limit name (e.g. ``max_memory_usage``) or None if the error is not
+        caused by a resource limit
+    """
+    code = getattr(error, 'code', None)
+    if not isinstance(code, int):
+        match = _ERROR_CODE_PATTERN.search(str(error))
+        code = int(match.group(1)) if match else None
+    return BUDGET_ERROR_CODES.get(code)
+
+
+def record_budget_exceeded(error: BaseException) -> Optional[str]:
+    """
+    Count a budget-exceeded error in the default metrics registry.
+
+    Returns:
+        Name of the exceeded limit or None if the error is unrelated
+    """
+    limit = get_budget_error_limit(error)
+    if limit is None:
+        return None
+
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is not None:
+        metrics_registry.get_or_create_counter(
+            "clickhouse_budget_exceeded_total",
+            "Total number of ClickHouse queries aborted by a resource limit",
+            labelnames=["limit"],
+        ).labels(limit=limit).inc()
+    return limit
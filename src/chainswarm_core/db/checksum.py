@@ -0,0 +1,243 @@
+"""
+Partition-checksum table diff for ClickHouse.
+
+Compares two tables (typically the same table in two databases, e.g.
+``analytics_torus`` and ``benchmark_torus``) without pulling rows. Every
+row is hashed server-side with ``cityHash64`` and rows are aggregated into
+order-independent checksums (``count()``, ``groupBitXor`` and ``sum`` of the
+row hashes) per partition. Partitions that differ are split into row-hash
+ranges and only differing ranges are refined further, so verifying a large
+table costs a handful of small aggregate queries.
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from clickhouse_connect.driver import Client
+
+from chainswarm_core.db.concurrency import concurrency_slot
+from chainswarm_core.db.query_tracker import inflight_queries
+
+MAX_HASH = 2 ** 64 - 1
+
+
+@dataclass(frozen=True)
+class RangeChecksum:
+    """Order-independent checksum of a set of rows."""
+
+    rows: int = 0
+    xor_hash: int = 0
+    sum_hash: int = 0
+
+
+@dataclass
+class RangeDiff:
+    """
+    A row-hash range whose contents differ between source and target.
+
+    Attributes:
+        partition_id: Value of ``_partition_id`` the range belongs to
+        hash_from: First row hash in the range (inclusive)
+        hash_to: Last row hash in the range (inclusive)
+        source_rows: Number of rows in the range in the source table
+        target_rows: Number of rows in the range in the target table
+    """
+
+    partition_id: str
+    hash_from: int
+    hash_to: int
+    source_rows: int
+    target_rows: int
+
+    def condition(self, row_hash: str) -> str:
+        """Return a WHERE condition selecting the rows of this range."""
+        partition_id = self.partition_id.replace("\\", "\\\\").replace("'", "\\'")
+        return (
+            f"_partition_id = '{partition_id}' "
+            f"AND {row_hash} BETWEEN {self.hash_from} AND {self.hash_to}"
+        )
+
+
+@dataclass
+class TableDiff:
+    """Result of ``diff_tables``."""
+
+    source_table: str
+    target_table: str
+    row_hash: str
+    partitions_compared: int = 0
+    partitions_differing: int = 0
+    queries: int = 0
+    ranges: list[RangeDiff] = field(default_factory=list)
+
+    @property
+    def is_equal(self) -> bool:
+        return not self.ranges
+
+
+def _qualified_name(table: str, database: Optional[str]) -> str:
+    return f"{database}.{table}" if database else table
+
+
+def _row_hash_expression(columns: Optional[Sequence[str]]) -> str:
+    if not columns:
+        return "cityHash64(*)"
+    return f"cityHash64({', '.join(columns)})"
+
+
+def _run_query(client: Client, query: str, parameters: dict[str, Any]) -> list[tuple]:
+    with concurrency_slot(), inflight_queries.track(query, database=client.database) as query_id:
+        return client.query(query, parameters=parameters, settings={'query_id': query_id}).result_rows
+
+
+def _partition_checksums(
+    client: Client,
+    table_ref: str,
+    row_hash: str,
+    where: Optional[str],
+) -> dict[str, RangeChecksum]:
+    where_clause = f"WHERE {where}" if where else ""
+    query = f"""
+        SELECT _partition_id, count(), groupBitXor(h), sum(h)
+        FROM (SELECT _partition_id, {row_hash} AS h FROM {table_ref} {where_clause})
+        GROUP BY _partition_id
+    """
+    rows = _run_query(client, query, {})
+    return {str(p): RangeChecksum(int(c), int(x), int(s)) for p, c, x, s in rows}
+
+
+def _bucket_checksums(
+    client: Client,
+    table_ref: str,
+    row_hash: str,
+    where: Optional[str],
+    partition_id: str,
+    hash_from: int,
+    hash_to: int,
+    step: int,
+) -> dict[int, RangeChecksum]:
+    extra = f"AND ({where})" if where else ""
+    query = f"""
+        SELECT intDiv(h - {{hash_from:UInt64}}, {{step:UInt64}}) AS bucket, count(), groupBitXor(h), sum(h)
+        FROM (
+            SELECT {row_hash} AS h FROM {table_ref}
+            WHERE _partition_id = {{partition_id:String}} {extra}
+        )
+        WHERE h BETWEEN {{hash_from:UInt64}} AND {{hash_to:UInt64}}
+        GROUP BY bucket
+    """
+    rows = _run_query(
+        client,
+        query,
+        {
+            "partition_id": partition_id,
+            "hash_from": hash_from,
+            "hash_to": hash_to,
+            "step": step,
+        },
+    )
+    return {int(b): RangeChecksum(int(c), int(x), int(s)) for b, c, x, s in rows}
+
+
+def diff_tables(
+    source_client: Client,
+    table: str,
+    target_client: Optional[Client] = None,
+    target_table: Optional[str] = None,
+    source_database: Optional[str] = None,
+    target_database: Optional[str] = None,
+    columns: Optional[Sequence[str]] = None,
+    where: Optional[str] = None,
+    fanout: int = 16,
+    leaf_rows: int = 10_000,
+    max_depth: int = 6,
+) -> TableDiff:
+    """
+    Find the partitions and row-hash ranges that differ between two tables.
+
+    Args:
+        source_client: Client for the source table
+        table: Source table name (e.g. ``Repository.table_name()``)
+        target_client: Client for the target table (default: ``source_client``)
+        target_table: Target table name (default: ``table``)
+        source_database: Database of the source table (default: client database)
+        target_database: Database of the target table (default: client database)
+        columns: Columns included in the row hash (default: all columns)
+        where: Optional filter applied on both sides (e.g. a date window)
+        fanout: Number of sub-ranges a differing range is split into
+        leaf_rows: Ranges with at most this many rows on both sides are not
+            split further
+        max_depth: Maximum number of refinement levels below a partition
+
+    Returns:
+        TableDiff listing the smallest differing ranges found
+
+    Example:
+        >>> diff = diff_tables(
+        ...     analytics_client, "core_transfers",
+        ...     target_client=benchmark_client,
+        ...     where="block_timestamp >= '2025-01-01'",
+        ... )
+        >>> for r in diff.ranges:
+        ...     print(r.partition_id, r.source_rows, r.target_rows)
+    """
+    if fanout < 2:
+        raise ValueError(f"fanout must be at least 2, got {fanout}")
+
+    target_client = target_client or source_client
+    source_ref = _qualified_name(table, source_database)
+    target_ref = _qualified_name(target_table or table, target_database)
+    row_hash = _row_hash_expression(columns)
+
+    diff = TableDiff(source_table=source_ref, target_table=target_ref, row_hash=row_hash)
+
+    source_partitions = _partition_checksums(source_client, source_ref, row_hash, where)
+    target_partitions = _partition_checksums(target_client, target_ref, row_hash, where)
+    diff.queries += 2
+
+    partition_ids = sorted(set(source_partitions) | set(target_partitions))
+    diff.partitions_compared = len(partition_ids)
+
+    # (partition_id, hash_from, hash_to, depth, source, target)
+    pending = []
+    for partition_id in partition_ids:
+        source = source_partitions.get(partition_id, RangeChecksum())
+        target = target_partitions.get(partition_id, RangeChecksum())
+        if source != target:
+            diff.partitions_differing += 1
+            pending.append((partition_id, 0, MAX_HASH, 0, source, target))
+
+    while pending:
+        partition_id, hash_from, hash_to, depth, source, target = pending.pop()
+
+        is_leaf = (
+            depth >= max_depth
+            or (source.rows <= leaf_rows and target.rows <= leaf_rows)
+            or source.rows == 0
+            or target.rows == 0
+            or hash_from == hash_to
+        )
+        if is_leaf:
+            diff.ranges.append(RangeDiff(partition_id, hash_from, hash_to, source.rows, target.rows))
+            continue
+
+        step = (hash_to - hash_from) // fanout + 1
+        source_buckets = _bucket_checksums(
+            source_client, source_ref, row_hash, where, partition_id, hash_from, hash_to, step
+        )
+        target_buckets = _bucket_checksums(
+            target_client, target_ref, row_hash, where, partition_id, hash_from, hash_to, step
+        )
+        diff.queries += 2
+
+        for bucket in sorted(set(source_buckets) | set(target_buckets)):
+            bucket_source = source_buckets.get(bucket, RangeChecksum())
+            bucket_target = target_buckets.get(bucket, RangeChecksum())
+            if bucket_source == bucket_target:
+                continue
+            bucket_from = hash_from + bucket * step
+            bucket_to = min(hash_to, bucket_from + step - 1)
+            pending.append((partition_id, bucket_from, bucket_to, depth + 1, bucket_source, bucket_target))
+
+    diff.ranges.sort(key=lambda r: (r.partition_id, r.hash_from))
+    return diff
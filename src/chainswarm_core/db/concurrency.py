@@ -0,0 +1,365 @@
+"""
+Cluster-wide limits on concurrent ClickHouse queries.
+
+When many workers on many nodes start heavy queries at once, the server
+runs all of them past its best concurrency and every query slows down.
+A ``ConcurrencyLimiter`` hands out a bounded number of slots per workload
+class (e.g. ``heavy`` scans vs ``light`` lookups); ``BaseRepository``
+takes a slot before each query and holds it until the query finished.
+
+Waiters are served first come, first served, so a steady stream of new
+queries cannot starve an early waiter.
+
+Example:
+    >>> set_concurrency_limiter(RedisConcurrencyLimiter(limits={"heavy": 4, "light": 32}))
+    >>> with clickhouse_workload("heavy"):
+    ...     repository.fetch_window(...)
+"""
+
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional
+
+from loguru import logger
+
+from chainswarm_core.observability import get_default_metrics_registry
+
+DEFAULT_WORKLOAD = "default"
+
+_workload_context: ContextVar[Optional[str]] = ContextVar("chainswarm_clickhouse_workload", default=None)
+# Token of the slot held by this thread per workload; deliberately per thread so pool threads running
+# with a copied context still take slots of their own
+_held_slots = threading.local()
+_active_limiter: Optional["ConcurrencyLimiter"] = None
+
+# KEYS: holders (token -> lease expiry ms), queue (token -> ticket), seen (token -> last poll ms), ticket counter
+# ARGV: token, limit, lease ms, waiter ttl ms
+_ACQUIRE_SCRIPT = """
+local time = redis.call('time')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('zremrangebyscore', KEYS[1], '-inf', now)
+local stale = redis.call('zrangebyscore', KEYS[3], '-inf', now - tonumber(ARGV[4]))
+for _, waiter in ipairs(stale) do
+    redis.call('zrem', KEYS[2], waiter)
+    redis.call('zrem', KEYS[3], waiter)
+end
+if not redis.call('zscore', KEYS[2], ARGV[1]) then
+    redis.call('zadd', KEYS[2], redis.call('incr', KEYS[4]), ARGV[1])
+end
+redis.call('zadd', KEYS[3], now, ARGV[1])
+local free = tonumber(ARGV[2]) - redis.call('zcard', KEYS[1])
+if free > 0 and redis.call('zrank', KEYS[2], ARGV[1]) < free then
+    redis.call('zrem', KEYS[2], ARGV[1])
+    redis.call('zrem', KEYS[3], ARGV[1])
+    redis.call('zadd', KEYS[1], now + tonumber(ARGV[3]), ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# KEYS: holders; ARGV: token, lease ms
+_RENEW_SCRIPT = """
+if not redis.call('zscore', KEYS[1], ARGV[1]) then
+    return 0
+end
+local time = redis.call('time')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+redis.call('zadd', KEYS[1], now + tonumber(ARGV[2]), ARGV[1])
+return 1
+"""
+
+
+class ConcurrencyLimiter(ABC):
+    """
+    Bounded number of concurrent queries per workload class.
+
+    Args:
+        limits: Maximum concurrent queries per workload class
+        default_limit: Limit of workload classes missing from ``limits``;
+            None leaves them unlimited
+        timeout_seconds: How long to wait for a slot before raising ``TimeoutError``
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, int]] = None,
+        default_limit: Optional[int] = None,
+        timeout_seconds: float = 600.0,
+    ):
+        self.limits = dict(limits or {})
+        for workload, limit in self.limits.items():
+            if limit < 1:
+                raise ValueError(f"Limit of workload {workload!r} must be at least 1, got {limit}")
+        self.default_limit = default_limit
+        self.timeout_seconds = timeout_seconds
+
+    def limit_for(self, workload: str) -> Optional[int]:
+        return self.limits.get(workload, self.default_limit)
+
+    @abstractmethod
+    def acquire(self, workload: str, limit: int, timeout_seconds: float) -> Optional[str]:
+        """Wait for a slot; return its token, or None on timeout."""
+
+    @abstractmethod
+    def release(self, workload: str, token: str) -> None:
+        """Return a slot taken by ``acquire``."""
+
+    @contextmanager
+    def slot(self, workload: str = DEFAULT_WORKLOAD) -> Iterator[None]:
+        """
+        Hold a slot of ``workload`` for the duration of the block.
+
+        Nested blocks of the same workload on the same thread (e.g. a lookup
+        issued while streaming) reuse the outer slot instead of waiting for
+        a second one.
+
+        Raises:
+            TimeoutError: If no slot became free within ``timeout_seconds``
+        """
+        limit = self.limit_for(workload)
+        held = _held_slots.__dict__.setdefault("owners", {})
+        if limit is None or workload in held:
+            yield
+            return
+
+        started = time.perf_counter()
+        token = self.acquire(workload, limit, self.timeout_seconds)
+        waited = time.perf_counter() - started
+        _record_wait(workload, waited, acquired=token is not None)
+        if token is None:
+            logger.warning(
+                "Timed out waiting for a ClickHouse concurrency slot",
+                extra={"workload": workload, "limit": limit, "waited": waited}
+            )
+            raise TimeoutError(f"No {workload!r} ClickHouse slot free after {waited:.1f}s (limit {limit})")
+
+        # Only the block that acquired the slot releases it, so nested blocks
+        # exiting out of order (interleaved generators) cannot leak or drop it
+        held[workload] = token
+        try:
+            yield
+        finally:
+            if held.get(workload) == token:
+                del held[workload]
+            try:
+                self.release(workload, token)
+            except Exception as e:
+                logger.warning("Concurrency slot release failed", extra={"workload": workload, "error": str(e)})
+
+
+class _LocalWorkload:
+    def __init__(self):
+        self.in_use = 0
+        self.waiters: Deque[threading.Event] = deque()
+
+
+class LocalConcurrencyLimiter(ConcurrencyLimiter):
+    """Process-local limiter with FIFO hand-over, for tests and single-node runs."""
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._workloads: Dict[str, _LocalWorkload] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, workload: str, limit: int, timeout_seconds: float) -> Optional[str]:
+        with self._lock:
+            state = self._workloads.setdefault(workload, _LocalWorkload())
+            if state.in_use < limit and not state.waiters:
+                state.in_use += 1
+                return uuid.uuid4().hex
+            turn = threading.Event()
+            state.waiters.append(turn)
+
+        if turn.wait(timeout_seconds):
+            return uuid.uuid4().hex
+        with self._lock:
+            # The slot may have been handed over between the timeout and taking the lock
+            if turn.is_set():
+                return uuid.uuid4().hex
+            state.waiters.remove(turn)
+        return None
+
+    def release(self, workload: str, token: str) -> None:
+        with self._lock:
+            state = self._workloads[workload]
+            if state.waiters:
+                # Hand the slot to the oldest waiter; in_use stays the same
+                state.waiters.popleft().set()
+            else:
+                state.in_use -= 1
+
+
+class RedisConcurrencyLimiter(ConcurrencyLimiter):
+    """
+    Fair distributed semaphore in Redis.
+
+    Each workload class has a sorted set of holders (scored by lease expiry)
+    and a queue of waiters (scored by an increasing ticket). A waiter gets a
+    slot once it is among the oldest tickets that fit in the free slots, so
+    slots go to waiters in arrival order across all nodes.
+
+    Held slots are leases: a background thread renews them every third of
+    ``lease_seconds`` for as long as the query runs, so long queries keep
+    their slot while a killed worker loses it within ``lease_seconds``.
+    Waiters that stopped polling are dropped from the queue. Timestamps
+    come from the Redis server clock, so node clock skew does not matter.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Mapping[str, int]] = None,
+        default_limit: Optional[int] = None,
+        timeout_seconds: float = 600.0,
+        client: Any = None,
+        url: Optional[str] = None,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 0.05,
+        prefix: str = "chainswarm:clickhouse-slots:",
+    ):
+        super().__init__(limits, default_limit, timeout_seconds)
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.prefix = prefix
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._held: Dict[str, str] = {}
+        self._held_lock = threading.Lock()
+        self._held_pid = os.getpid()
+        self._renewer: Optional[threading.Thread] = None
+
+    def _keys(self, workload: str) -> list:
+        base = f"{self.prefix}{{{workload}}}"
+        return [f"{base}:holders", f"{base}:queue", f"{base}:seen", f"{base}:ticket"]
+
+    def acquire(self, workload: str, limit: int, timeout_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        keys = self._keys(workload)
+        # Waiters poll several times within this window; silent ones are dropped from the queue
+        waiter_ttl_ms = int(max(self.poll_interval * 20, 5.0) * 1000)
+        deadline = time.monotonic() + timeout_seconds
+        try:
+            while True:
+                if self._acquire(keys=keys, args=[token, limit, int(self.lease_seconds * 1000), waiter_ttl_ms]):
+                    self._hold(workload, token)
+                    return token
+                if time.monotonic() >= deadline:
+                    self._leave_queue(keys, token)
+                    return None
+                time.sleep(self.poll_interval)
+        except BaseException:
+            self._leave_queue(keys, token)
+            raise
+
+    def _leave_queue(self, keys: list, token: str) -> None:
+        pipeline = self.client.pipeline()
+        pipeline.zrem(keys[1], token)
+        pipeline.zrem(keys[2], token)
+        pipeline.execute()
+
+    def _hold(self, workload: str, token: str) -> None:
+        with self._held_lock:
+            if self._held_pid != os.getpid():
+                # Forked child: neither the parent's slots nor its renewer thread are ours
+                self._held = {}
+                self._held_pid = os.getpid()
+                self._renewer = None
+            self._held[token] = workload
+            if self._renewer is None or not self._renewer.is_alive():
+                self._renewer = threading.Thread(
+                    target=self._renew_held, name="clickhouse-slot-renewer", daemon=True
+                )
+                self._renewer.start()
+
+    def _renew_held(self) -> None:
+        while True:
+            time.sleep(self.lease_seconds / 3)
+            with self._held_lock:
+                held = list(self._held.items())
+            if not held:
+                continue
+            for token, workload in held:
+                try:
+                    renewed = self._renew(keys=self._keys(workload)[:1], args=[token, int(self.lease_seconds * 1000)])
+                except Exception as e:
+                    logger.warning("Concurrency slot renewal failed", extra={"workload": workload, "error": str(e)})
+                    continue
+                if not renewed:
+                    logger.warning("Concurrency slot lease lost", extra={"workload": workload})
+                    with self._held_lock:
+                        self._held.pop(token, None)
+
+    def release(self, workload: str, token: str) -> None:
+        with self._held_lock:
+            self._held.pop(token, None)
+        self.client.zrem(self._keys(workload)[0], token)
+
+
+def _record_wait(workload: str, seconds: float, acquired: bool) -> None:
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is None:
+        return
+    metrics_registry.get_or_create_histogram(
+        "clickhouse_concurrency_wait_seconds",
+        "Time spent waiting for a ClickHouse concurrency slot",
+        labelnames=["workload"],
+    ).labels(workload=workload).observe(seconds)
+    if not acquired:
+        metrics_registry.get_or_create_counter(
+            "clickhouse_concurrency_timeouts_total",
+            "Total number of queries that timed out waiting for a ClickHouse concurrency slot",
+            labelnames=["workload"],
+        ).labels(workload=workload).inc()
+
+
+def get_concurrency_limiter() -> Optional[ConcurrencyLimiter]:
+    return _active_limiter
+
+
+def set_concurrency_limiter(limiter: Optional[ConcurrencyLimiter]) -> None:
+    """Install the limiter used by every ``BaseRepository`` in this process (None disables)."""
+    global _active_limiter
+    _active_limiter = limiter
+
+
+def concurrency_slot(default_workload: str = DEFAULT_WORKLOAD):
+    """
+    Hold a slot of the installed limiter around a single query.
+
+    The workload bound with ``clickhouse_workload`` takes precedence over
+    ``default_workload``. Does nothing when no limiter is installed.
+    """
+    limiter = get_concurrency_limiter()
+    if limiter is None:
+        return nullcontext()
+    return limiter.slot(get_clickhouse_workload() or default_workload)
+
+
+def get_clickhouse_workload() -> Optional[str]:
+    return _workload_context.get()
+
+
+@contextmanager
+def clickhouse_workload(workload: Optional[str]) -> Iterator[Optional[str]]:
+    """
+    Run the queries of the block under ``workload`` instead of the repository's own class.
+
+    Example:
+        >>> with clickhouse_workload("heavy"):
+        ...     repository.export_window_to_parquet(...)
+    """
+    token = _workload_context.set(workload)
+    try:
+        yield workload
+    finally:
+        _workload_context.reset(token)
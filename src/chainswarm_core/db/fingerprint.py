@@ -0,0 +1,50 @@
+"""Stable fingerprints for ClickHouse queries."""
+
+import hashlib
+import json
+import re
+from typing import Any, Optional
+
+# Quoted literals and identifiers (with backslash or doubled-quote escapes), or a whitespace run
+_QUERY_TOKEN = re.compile(
+    r"""('(?:[^'\\]|\\.|'')*'|"(?:[^"\\]|\\.|"")*"|`(?:[^`\\]|\\.|``)*`)|\s+""",
+    re.DOTALL,
+)
+
+
+def normalize_query(query: str) -> str:
+    """
+    Collapse whitespace so formatting differences do not change the fingerprint.
+
+    Whitespace inside quoted literals and identifiers is kept, since it
+    changes the result.
+    """
+    return _QUERY_TOKEN.sub(lambda match: match.group(1) or " ", query).strip()
+
+
+def query_fingerprint(
+    query: str,
+    parameters: Optional[Any] = None,
+    database: Optional[str] = None,
+    **extra: Any,
+) -> str:
+    """
+    Compute a fingerprint identifying a query and its inputs.
+
+    Args:
+        query: Query text
+        parameters: Query parameters
+        database: Database the query runs against
+        **extra: Additional values that change the result (e.g. the
+            ``processing_date`` / ``window_days`` window)
+
+    Returns:
+        Hex encoded SHA-256 digest
+    """
+    payload = json.dumps(
+        [database, normalize_query(query), parameters, extra],
+        sort_keys=True,
+        default=str,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
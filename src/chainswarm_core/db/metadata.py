@@ -0,0 +1,175 @@
+"""
+Process-wide cache of ClickHouse table column metadata.
+
+Column names and types are loaded lazily with one ``system.columns`` query
+per database and kept until DDL is applied through ``apply_schema_content``
+(and therefore ``BaseMigrateSchema``), which invalidates the cache.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from clickhouse_connect.driver import Client
+from loguru import logger
+
+from chainswarm_core.db.concurrency import concurrency_slot
+from chainswarm_core.db.query_tracker import inflight_queries
+
+_WRAPPER_TYPES = re.compile(r"^(?:Nullable|LowCardinality)\((.*)\)$")
+
+
+@dataclass(frozen=True)
+class ColumnMetadata:
+    """Name and ClickHouse type of a table column."""
+
+    name: str
+    type: str
+    position: int
+    default_kind: str = ""
+    is_in_primary_key: bool = False
+
+    @property
+    def base_type(self) -> str:
+        """Type with ``Nullable`` / ``LowCardinality`` wrappers removed."""
+        base = self.type
+        while True:
+            match = _WRAPPER_TYPES.match(base)
+            if not match:
+                return base
+            base = match.group(1)
+
+    @property
+    def is_nullable(self) -> bool:
+        return "Nullable(" in self.type
+
+    @property
+    def is_enum(self) -> bool:
+        return self.base_type.startswith("Enum")
+
+    @property
+    def is_decimal(self) -> bool:
+        return self.base_type.startswith("Decimal")
+
+
+class SchemaMetadataCache:
+    """
+    Cache of column metadata keyed by (database, table).
+
+    Example:
+        >>> columns = schema_cache.get_columns(client, "core_transfers")
+        >>> types = schema_cache.get_column_types(client, "core_transfers")
+    """
+
+    def __init__(self) -> None:
+        self._databases: dict[str, dict[str, list[ColumnMetadata]]] = {}
+        self._lock = threading.Lock()
+        self._load_locks: dict[str, threading.Lock] = {}
+
+    def _load_lock(self, database: str) -> threading.Lock:
+        with self._lock:
+            return self._load_locks.setdefault(database, threading.Lock())
+
+    def is_loaded(self, database: str) -> bool:
+        return database in self._databases
+
+    def load(self, client: Client, database: Optional[str] = None) -> dict[str, list[ColumnMetadata]]:
+        """
+        Load the columns of all tables of a database in one query.
+
+        Args:
+            client: ClickHouse client connection
+            database: Database to load (default: client database)
+
+        Returns:
+            Mapping of table name to its columns in table order
+        """
+        database = database or client.database
+        query = """
+            SELECT table, name, type, position, default_kind, is_in_primary_key
+            FROM system.columns
+            WHERE database = {database:String}
+            ORDER BY table, position
+        """
+        with concurrency_slot(), inflight_queries.track(query, database=database) as query_id:
+            rows = client.query(
+                query,
+                parameters={"database": database},
+                settings={"query_id": query_id},
+            ).result_rows
+
+        tables: dict[str, list[ColumnMetadata]] = {}
+        for table, name, type_, position, default_kind, is_in_primary_key in rows:
+            tables.setdefault(table, []).append(
+                ColumnMetadata(
+                    name=name,
+                    type=type_,
+                    position=int(position),
+                    default_kind=default_kind or "",
+                    is_in_primary_key=bool(is_in_primary_key),
+                )
+            )
+
+        with self._lock:
+            self._databases[database] = tables
+        logger.debug(
+            "Loaded schema metadata",
+            extra={"database": database, "tables": len(tables)}
+        )
+        return tables
+
+    def _get_tables(self, client: Client, database: str, reload: bool) -> dict[str, list[ColumnMetadata]]:
+        tables = self._databases.get(database)
+        if tables is not None and not reload:
+            return tables
+        with self._load_lock(database):
+            tables = self._databases.get(database)
+            if tables is None or reload:
+                tables = self.load(client, database)
+            return tables
+
+    def get_columns(
+        self,
+        client: Client,
+        table: str,
+        database: Optional[str] = None,
+    ) -> list[ColumnMetadata]:
+        """
+        Return the columns of a table.
+
+        A table that is missing from the cached metadata triggers one reload
+        of its database, covering tables created after the cache was filled.
+
+        Raises:
+            ValueError: If the table does not exist
+        """
+        database = database or client.database
+        tables = self._get_tables(client, database, reload=False)
+        if table not in tables:
+            tables = self._get_tables(client, database, reload=True)
+        if table not in tables:
+            raise ValueError(f"Table not found: {database}.{table}")
+        return tables[table]
+
+    def get_column_names(self, client: Client, table: str, database: Optional[str] = None) -> list[str]:
+        return [c.name for c in self.get_columns(client, table, database)]
+
+    def get_column_types(self, client: Client, table: str, database: Optional[str] = None) -> dict[str, str]:
+        return {c.name: c.type for c in self.get_columns(client, table, database)}
+
+    def invalidate(self, database: Optional[str] = None) -> None:
+        """
+        Drop cached metadata.
+
+        Args:
+            database: Database to drop (default: all databases)
+        """
+        with self._lock:
+            if database is None:
+                self._databases.clear()
+            else:
+                self._databases.pop(database, None)
+
+
+schema_cache = SchemaMetadataCache()
@@ -12,6 +12,8 @@ from typing import Iterable
 from clickhouse_connect.driver import Client
 from loguru import logger
 
+from chainswarm_core.db.metadata import schema_cache
+
 
 def _split_clickhouse_sql(sql_text: str) -> Iterable[str]:
     """
@@ -53,12 +55,18 @@ def apply_schema_content(client: Client, sql_content: str) -> None:
     """
     Apply SQL statements from a content string.
     
+    Invalidates the schema metadata cache, since the statements may
+    create or alter tables in any database.
+    
     Args:
         client: ClickHouse client connection
         sql_content: SQL content with possibly multiple statements
     """
-    for stmt in _split_clickhouse_sql(sql_content):
-        client.command(stmt)
+    try:
+        for stmt in _split_clickhouse_sql(sql_content):
+            client.command(stmt)
+    finally:
+        schema_cache.invalidate()
 
 
 def apply_schema_file(client: Client, schema_path: Path) -> None:
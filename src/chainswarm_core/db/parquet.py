@@ -0,0 +1,178 @@
+"""
+Parquet export/import of ClickHouse table data.
+
+ClickHouse encodes and decodes Parquet itself (compressed with zstd via the
+``output_format_parquet_compression_method`` setting), so no Parquet library
+is needed on the client side. Files are streamed to and from disk in fixed
+size chunks, keeping memory bounded regardless of the data size.
+"""
+
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AbstractContextManager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, Sequence
+
+from clickhouse_connect.driver import Client
+from loguru import logger
+
+from chainswarm_core.db.concurrency import concurrency_slot
+from chainswarm_core.db.query_tracker import inflight_queries
+
+DEFAULT_CHUNK_SIZE = 4 * 1024 * 1024
+
+PARQUET_EXPORT_SETTINGS = {
+    'output_format_parquet_compression_method': 'zstd',
+}
+
+ClientContextProvider = Callable[[], AbstractContextManager[Client]]
+
+
+@dataclass
+class ParquetFile:
+    """A Parquet file written or loaded by the export/import helpers."""
+
+    path: Path
+    size_bytes: int
+    rows: Optional[int] = None
+
+
+def export_query_to_parquet(
+    client: Client,
+    query: str,
+    path: str | Path,
+    parameters: Optional[dict[str, Any]] = None,
+    settings: Optional[dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ParquetFile:
+    """
+    Stream the result of a query into a zstd Parquet file.
+
+    The file is written to a temporary name and renamed on success, so a
+    partially written file is never left under the final name.
+
+    Args:
+        client: ClickHouse client connection
+        query: SELECT query to export
+        path: Destination file path
+        parameters: Query parameters
+        settings: Extra ClickHouse settings
+        chunk_size: Size of the chunks read from the response
+
+    Returns:
+        The written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.part")
+
+    with concurrency_slot(), inflight_queries.track(query, database=client.database) as query_id:
+        query_settings = {**PARQUET_EXPORT_SETTINGS, **(settings or {}), 'query_id': query_id}
+        stream = client.raw_stream(query, parameters=parameters, settings=query_settings, fmt='Parquet')
+        try:
+            with open(tmp_path, 'wb') as f:
+                while True:
+                    chunk = stream.read(chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+            os.replace(tmp_path, path)
+        finally:
+            stream.close()
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    exported = ParquetFile(path=path, size_bytes=path.stat().st_size)
+    logger.info(
+        "Exported Parquet file",
+        extra={"path": str(path), "size_bytes": exported.size_bytes}
+    )
+    return exported
+
+
+def _read_chunks(path: Path, chunk_size: int) -> Iterator[bytes]:
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def import_parquet_file(
+    client: Client,
+    table: str,
+    path: str | Path,
+    column_names: Optional[Sequence[str]] = None,
+    settings: Optional[dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ParquetFile:
+    """
+    Stream a Parquet file into a table.
+
+    Args:
+        client: ClickHouse client connection
+        table: Target table (optionally database qualified)
+        path: Parquet file path
+        column_names: Columns present in the file (default: all table columns)
+        settings: Extra ClickHouse settings
+        chunk_size: Size of the chunks sent to the server
+
+    Returns:
+        The loaded file with the number of written rows
+    """
+    path = Path(path)
+    with concurrency_slot(), \
+            inflight_queries.track(f"INSERT INTO {table}", database=client.database) as query_id:
+        summary = client.raw_insert(
+            table,
+            column_names=column_names,
+            insert_block=_read_chunks(path, chunk_size),
+            settings={**(settings or {}), 'query_id': query_id},
+            fmt='Parquet',
+        )
+    return ParquetFile(path=path, size_bytes=path.stat().st_size, rows=summary.written_rows)
+
+
+def import_parquet_files(
+    client_context: ClientContextProvider,
+    table: str,
+    paths: Sequence[str | Path],
+    max_workers: int = 4,
+    column_names: Optional[Sequence[str]] = None,
+    settings: Optional[dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> list[ParquetFile]:
+    """
+    Load several Parquet files in parallel, one insert per file.
+
+    Each worker opens its own client through ``client_context`` (for example
+    ``ClientFactory(params).client_context``) because a single client cannot
+    run concurrent queries.
+
+    Args:
+        client_context: Callable returning a client context manager
+        table: Target table (optionally database qualified)
+        paths: Parquet files to load
+        max_workers: Number of concurrent inserts
+        column_names: Columns present in the files
+        settings: Extra ClickHouse settings
+        chunk_size: Size of the chunks sent to the server
+
+    Returns:
+        Loaded files in the order of ``paths``
+    """
+
+    def load(path: str | Path) -> ParquetFile:
+        with client_context() as client:
+            return import_parquet_file(client, table, path, column_names, settings, chunk_size)
+
+    if max_workers <= 1 or len(paths) <= 1:
+        return [load(path) for path in paths]
+
+    # Each insert runs in a copy of the caller's context, keeping its ClickHouse workload
+    contexts = [contextvars.copy_context() for _ in paths]
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parquet-import") as executor:
+        return list(executor.map(lambda context, path: context.run(load, path), contexts, paths))
@@ -0,0 +1,177 @@
+"""
+In-flight ClickHouse query tracking.
+
+Every query issued through ``BaseRepository`` gets a ``query_id`` that is
+registered here for the duration of the call. On shutdown the registered
+ids are cancelled server-side with ``KILL QUERY`` so long running queries
+do not keep holding memory and threads after the worker has exited.
+"""
+
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from clickhouse_connect import get_client
+from loguru import logger
+
+from chainswarm_core.db.connection import get_connection_params
+from chainswarm_core.observability import (
+    get_default_metrics_registry,
+    register_shutdown_callback,
+)
+
+DEFAULT_KILL_TIMEOUT = 5.0
+
+
+@dataclass
+class InFlightQuery:
+    """A query that has been sent to ClickHouse and has not returned yet."""
+
+    query_id: str
+    database: str | None = None
+    query: str | None = None
+    started_at: float = field(default_factory=time.time)
+
+
+class InFlightQueryRegistry:
+    """
+    Thread-safe, process-wide registry of in-flight query ids.
+
+    Example:
+        >>> with inflight_queries.track(query="SELECT 1") as query_id:
+        ...     client.query("SELECT 1", settings={"query_id": query_id})
+    """
+
+    def __init__(self) -> None:
+        self._queries: dict[str, InFlightQuery] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._queries)
+
+    def register(self, query: InFlightQuery) -> None:
+        with self._lock:
+            self._queries[query.query_id] = query
+            count = len(self._queries)
+        _set_inflight_gauge(count)
+
+    def unregister(self, query_id: str) -> None:
+        with self._lock:
+            self._queries.pop(query_id, None)
+            count = len(self._queries)
+        _set_inflight_gauge(count)
+
+    def snapshot(self) -> list[InFlightQuery]:
+        with self._lock:
+            return list(self._queries.values())
+
+    @contextmanager
+    def track(
+        self,
+        query: str | None = None,
+        database: str | None = None,
+        query_id: str | None = None,
+    ) -> Iterator[str]:
+        """
+        Register a query for the duration of the block.
+
+        Args:
+            query: Query text, kept for logging only
+            database: Database the query runs against
+            query_id: Explicit query id (generated when omitted)
+
+        Yields:
+            The query id to pass to ClickHouse in the ``query_id`` setting
+        """
+        entry = InFlightQuery(
+            query_id=query_id or generate_query_id(),
+            database=database,
+            query=query,
+        )
+        self.register(entry)
+        try:
+            yield entry.query_id
+        finally:
+            self.unregister(entry.query_id)
+
+
+inflight_queries = InFlightQueryRegistry()
+
+
+def generate_query_id() -> str:
+    return f"cs_{uuid.uuid4().hex}"
+
+
+def _set_inflight_gauge(count: int) -> None:
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is None:
+        return
+    metrics_registry.get_or_create_gauge(
+        "clickhouse_inflight_queries",
+        "Number of ClickHouse queries currently running from this process",
+    ).set(count)
+
+
+def cancel_inflight_queries(
+    connection_params: dict[str, Any] | None = None,
+    timeout: float = DEFAULT_KILL_TIMEOUT,
+) -> int:
+    """
+    Issue ``KILL QUERY`` for every query still in flight in this process.
+
+    A separate client is used because the clients running the queries are
+    blocked waiting for their results. The kill is sent with ``ASYNC`` and
+    the client timeouts are bounded by ``timeout``, so shutdown never waits
+    longer than the deadline.
+
+    Args:
+        connection_params: Connection params of the ClickHouse server
+            (default: ``get_connection_params()``)
+        timeout: Deadline in seconds for connecting and sending the kill
+
+    Returns:
+        Number of query ids the kill was issued for
+    """
+    queries = inflight_queries.snapshot()
+    if not queries:
+        return 0
+
+    params = connection_params or get_connection_params()
+    query_ids = [q.query_id for q in queries]
+
+    try:
+        client = get_client(
+            host=params['host'],
+            port=int(params['port']),
+            username=params['user'],
+            password=params['password'],
+            database='default',
+            connect_timeout=timeout,
+            send_receive_timeout=timeout,
+            autogenerate_session_id=False,
+        )
+        try:
+            client.command(
+                "KILL QUERY WHERE query_id IN %(query_ids)s ASYNC",
+                parameters={"query_ids": query_ids},
+            )
+        finally:
+            client.close()
+    except Exception as e:
+        logger.error(
+            "Failed to cancel in-flight ClickHouse queries",
+            extra={"error": str(e), "query_count": len(query_ids)}
+        )
+        return 0
+
+    logger.info(
+        "Cancelled in-flight ClickHouse queries",
+        extra={"query_count": len(query_ids)}
+    )
+    return len(query_ids)
+
+
+register_shutdown_callback(cancel_inflight_queries)
@@ -0,0 +1,245 @@
+"""
+Disk-backed cache of query results for immutable historical windows.
+
+Results are stored as Arrow IPC files and read back through a memory map,
+so a cache hit costs no ClickHouse scan and no copy of the data. Entries
+are keyed by the query fingerprint (query, parameters, settings, server
+and database) plus the ``processing_date`` / ``window_days`` window and
+evicted least-recently-used once the cache
+directory grows beyond ``max_bytes``.
+
+Requires ``pyarrow`` (``pip install chainswarm-core[arrow]``).
+"""
+
+import os
+import threading
+import uuid
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from clickhouse_connect.driver import Client
+from loguru import logger
+
+from chainswarm_core.db.fingerprint import query_fingerprint
+from chainswarm_core.db.concurrency import concurrency_slot
+from chainswarm_core.db.query_tracker import inflight_queries
+from chainswarm_core.observability import get_default_metrics_registry
+
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+CACHE_FILE_SUFFIX = ".arrow"
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+    except ImportError as e:
+        raise ImportError(
+            "ResultCache requires pyarrow. Install it with: pip install chainswarm-core[arrow]"
+        ) from e
+    return pyarrow
+
+
+def is_closed_window(processing_date: Optional[str | date], today: Optional[date] = None) -> bool:
+    """
+    Check whether a window ending on ``processing_date`` can no longer change.
+
+    A window is closed once its processing date lies strictly before the
+    current UTC day.
+    """
+    if processing_date is None:
+        return False
+    if isinstance(processing_date, str):
+        processing_date = date.fromisoformat(processing_date[:10])
+    today = today or datetime.now(timezone.utc).date()
+    return processing_date < today
+
+
+class ResultCache:
+    """
+    Size-capped, memory-mapped result cache on local disk.
+
+    Example:
+        >>> cache = ResultCache("/var/cache/analytics", max_bytes=50 * 1024 ** 3)
+        >>> table = cache.get_or_query(
+        ...     client,
+        ...     "SELECT * FROM features WHERE processing_date = {d:Date}",
+        ...     parameters={"d": "2025-01-01"},
+        ...     processing_date="2025-01-01",
+        ...     window_days=7,
+        ... )
+    """
+
+    def __init__(self, directory: str | Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def key(
+        self,
+        query: str,
+        parameters: Optional[Any] = None,
+        database: Optional[str] = None,
+        processing_date: Optional[str] = None,
+        window_days: Optional[int] = None,
+        settings: Optional[dict[str, Any]] = None,
+        host: Optional[str] = None,
+    ) -> str:
+        # query_id differs per run and does not change the result
+        settings = {k: v for k, v in (settings or {}).items() if k != 'query_id'}
+        return query_fingerprint(
+            query,
+            parameters,
+            database,
+            processing_date=processing_date,
+            window_days=window_days,
+            settings=settings,
+            host=host,
+        )
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{CACHE_FILE_SUFFIX}"
+
+    def get(self, key: str):
+        """
+        Return the cached table for ``key`` or None.
+
+        The returned ``pyarrow.Table`` references the memory-mapped file
+        directly; no data is copied into process memory.
+        """
+        pa = _import_pyarrow()
+        path = self._path(key)
+        try:
+            source = pa.memory_map(str(path), 'r')
+        except FileNotFoundError:
+            self._record("miss")
+            return None
+
+        table = pa.ipc.open_file(source).read_all()
+        # Bump mtime so eviction is least-recently-used
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self._record("hit")
+        return table
+
+    def put(self, key: str, table) -> Path:
+        """Store a ``pyarrow.Table`` under ``key`` and evict old entries if needed."""
+        pa = _import_pyarrow()
+        path = self._path(key)
+        tmp_path = self.directory / f".{key}.{uuid.uuid4().hex}.part"
+        try:
+            with pa.OSFile(str(tmp_path), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        self.evict()
+        return path
+
+    def get_or_query(
+        self,
+        client: Client,
+        query: str,
+        parameters: Optional[dict[str, Any]] = None,
+        settings: Optional[dict[str, Any]] = None,
+        processing_date: Optional[str] = None,
+        window_days: Optional[int] = None,
+        cache_open_windows: bool = False,
+    ):
+        """
+        Return the query result from the cache, querying ClickHouse on a miss.
+
+        Windows that are still open (``processing_date`` is today or later)
+        bypass the cache unless ``cache_open_windows`` is set, because their
+        data may still change.
+
+        Returns:
+            ``pyarrow.Table`` with the query result
+        """
+        cacheable = cache_open_windows or is_closed_window(processing_date)
+        key = None
+        if cacheable:
+            key = self.key(
+                query,
+                parameters,
+                client.database,
+                processing_date,
+                window_days,
+                settings=settings,
+                host=getattr(client, 'url', None),
+            )
+            table = self.get(key)
+            if table is not None:
+                return table
+        else:
+            self._record("bypass")
+
+        with concurrency_slot(), inflight_queries.track(query, database=client.database) as query_id:
+            table = client.query_arrow(
+                query,
+                parameters=parameters,
+                settings={**(settings or {}), 'query_id': query_id},
+            )
+
+        if key is not None:
+            self.put(key, table)
+        return table
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in self.directory.glob(f"*{CACHE_FILE_SUFFIX}"))
+
+    def evict(self) -> int:
+        """
+        Remove least-recently-used entries until the cache fits ``max_bytes``.
+
+        Returns:
+            Number of removed entries
+        """
+        with self._lock:
+            entries = []
+            for path in self.directory.glob(f"*{CACHE_FILE_SUFFIX}"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            removed = 0
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                # Open memory maps keep working after unlink on POSIX
+                path.unlink(missing_ok=True)
+                total -= size
+                removed += 1
+
+        if removed:
+            logger.debug(
+                "Evicted result cache entries",
+                extra={"removed": removed, "size_bytes": total}
+            )
+        return removed
+
+    def invalidate(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        for path in self.directory.glob(f"*{CACHE_FILE_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+    def _record(self, result: str) -> None:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is None:
+            return
+        metrics_registry.get_or_create_counter(
+            "result_cache_requests_total",
+            "Total number of result cache lookups by result (hit, miss, bypass)",
+            labelnames=["result"],
+        ).labels(result=result).inc()
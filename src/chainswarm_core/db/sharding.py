@@ -0,0 +1,265 @@
+"""
+Address sharding that matches ClickHouse hashing.
+
+Addresses are assigned to shards with ``cityHash64`` (CityHash v1.0.2, the
+version used by ClickHouse) followed by either jump consistent hashing
+(``jumpConsistentHash``, the default, which moves only ~1/N of the
+addresses when the shard count changes) or a plain modulo. The Python
+partitioner and the SQL predicates produce identical assignments, so work
+split in Python lines up with shard-restricted scans on the server.
+"""
+
+import struct
+from dataclasses import dataclass
+from typing import Iterable
+
+SHARD_STRATEGY_JUMP = "jump"
+SHARD_STRATEGY_MODULO = "modulo"
+SHARD_STRATEGIES = (SHARD_STRATEGY_JUMP, SHARD_STRATEGY_MODULO)
+
+_MASK = 0xFFFFFFFFFFFFFFFF
+_K0 = 0xC3A5C85C97CB3127
+_K1 = 0xB492B66FBE98F273
+_K2 = 0x9AE16A3B2F90404F
+_K3 = 0xC949D7C7509E6557
+_KMUL = 0x9DDFEA08EB382D69
+
+_unpack64 = struct.Struct("<Q").unpack_from
+_unpack32 = struct.Struct("<I").unpack_from
+
+
+def _fetch64(s: bytes, i: int) -> int:
+    return _unpack64(s, i)[0]
+
+
+def _fetch32(s: bytes, i: int) -> int:
+    return _unpack32(s, i)[0]
+
+
+def _rotate(val: int, shift: int) -> int:
+    if shift == 0:
+        return val
+    return ((val >> shift) | (val << (64 - shift))) & _MASK
+
+
+def _shift_mix(val: int) -> int:
+    return val ^ (val >> 47)
+
+
+def _hash_len16(u: int, v: int) -> int:
+    a = ((u ^ v) * _KMUL) & _MASK
+    a ^= a >> 47
+    b = ((v ^ a) * _KMUL) & _MASK
+    b ^= b >> 47
+    return (b * _KMUL) & _MASK
+
+
+def _hash_len0to16(s: bytes, length: int) -> int:
+    if length > 8:
+        a = _fetch64(s, 0)
+        b = _fetch64(s, length - 8)
+        return _hash_len16(a, _rotate((b + length) & _MASK, length)) ^ b
+    if length >= 4:
+        a = _fetch32(s, 0)
+        return _hash_len16((length + (a << 3)) & _MASK, _fetch32(s, length - 4))
+    if length > 0:
+        a = s[0]
+        b = s[length >> 1]
+        c = s[length - 1]
+        y = (a + (b << 8)) & 0xFFFFFFFF
+        z = (length + (c << 2)) & 0xFFFFFFFF
+        return (_shift_mix(((y * _K2) ^ (z * _K3)) & _MASK) * _K2) & _MASK
+    return _K2
+
+
+def _hash_len17to32(s: bytes, length: int) -> int:
+    a = (_fetch64(s, 0) * _K1) & _MASK
+    b = _fetch64(s, 8)
+    c = (_fetch64(s, length - 8) * _K2) & _MASK
+    d = (_fetch64(s, length - 16) * _K0) & _MASK
+    return _hash_len16(
+        (_rotate((a - b) & _MASK, 43) + _rotate(c, 30) + d) & _MASK,
+        (a + _rotate(b ^ _K3, 20) - c + length) & _MASK,
+    )
+
+
+def _weak_hash_len32_with_seeds(s: bytes, i: int, a: int, b: int) -> tuple[int, int]:
+    w = _fetch64(s, i)
+    x = _fetch64(s, i + 8)
+    y = _fetch64(s, i + 16)
+    z = _fetch64(s, i + 24)
+    a = (a + w) & _MASK
+    b = _rotate((b + a + z) & _MASK, 21)
+    c = a
+    a = (a + x + y) & _MASK
+    b = (b + _rotate(a, 44)) & _MASK
+    return (a + z) & _MASK, (b + c) & _MASK
+
+
+def _hash_len33to64(s: bytes, length: int) -> int:
+    z = _fetch64(s, 24)
+    a = (_fetch64(s, 0) + (length + _fetch64(s, length - 16)) * _K0) & _MASK
+    b = _rotate((a + z) & _MASK, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, 8)) & _MASK
+    c = (c + _rotate(a, 7)) & _MASK
+    a = (a + _fetch64(s, 16)) & _MASK
+    vf = (a + z) & _MASK
+    vs = (b + _rotate(a, 31) + c) & _MASK
+    a = (_fetch64(s, 16) + _fetch64(s, length - 32)) & _MASK
+    z = _fetch64(s, length - 8)
+    b = _rotate((a + z) & _MASK, 52)
+    c = _rotate(a, 37)
+    a = (a + _fetch64(s, length - 24)) & _MASK
+    c = (c + _rotate(a, 7)) & _MASK
+    a = (a + _fetch64(s, length - 16)) & _MASK
+    wf = (a + z) & _MASK
+    ws = (b + _rotate(a, 31) + c) & _MASK
+    r = _shift_mix(((vf + ws) * _K2 + (wf + vs) * _K0) & _MASK)
+    return (_shift_mix((r * _K0 + vs) & _MASK) * _K2) & _MASK
+
+
+def city_hash64(data: str | bytes) -> int:
+    """
+    Compute CityHash64 v1.0.2, identical to ClickHouse ``cityHash64(s)``.
+
+    Args:
+        data: String (UTF-8 encoded) or bytes
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    s = data.encode("utf-8") if isinstance(data, str) else bytes(data)
+    length = len(s)
+    if length <= 32:
+        if length <= 16:
+            return _hash_len0to16(s, length)
+        return _hash_len17to32(s, length)
+    if length <= 64:
+        return _hash_len33to64(s, length)
+
+    x = _fetch64(s, 0)
+    y = _fetch64(s, length - 16) ^ _K1
+    z = _fetch64(s, length - 56) ^ _K0
+    v = _weak_hash_len32_with_seeds(s, length - 64, length, y)
+    w = _weak_hash_len32_with_seeds(s, length - 32, (length * _K1) & _MASK, _K0)
+    z = (z + _shift_mix(v[1]) * _K1) & _MASK
+    x = (_rotate((z + x) & _MASK, 39) * _K1) & _MASK
+    y = (_rotate(y, 33) * _K1) & _MASK
+
+    remaining = (length - 1) & ~63
+    i = 0
+    while True:
+        x = (_rotate((x + y + v[0] + _fetch64(s, i + 16)) & _MASK, 37) * _K1) & _MASK
+        y = (_rotate((y + v[1] + _fetch64(s, i + 48)) & _MASK, 42) * _K1) & _MASK
+        x ^= w[1]
+        y ^= v[0]
+        z = _rotate(z ^ w[0], 33)
+        v = _weak_hash_len32_with_seeds(s, i, (v[1] * _K1) & _MASK, (x + w[0]) & _MASK)
+        w = _weak_hash_len32_with_seeds(s, i + 32, (z + w[1]) & _MASK, y)
+        z, x = x, z
+        i += 64
+        remaining -= 64
+        if remaining == 0:
+            break
+
+    return _hash_len16(
+        (_hash_len16(v[0], w[0]) + _shift_mix(y) * _K1 + z) & _MASK,
+        (_hash_len16(v[1], w[1]) + x) & _MASK,
+    )
+
+
+def jump_consistent_hash(key: int, buckets: int) -> int:
+    """
+    Jump consistent hash (Lamping & Veach), identical to ClickHouse
+    ``jumpConsistentHash(key, buckets)``.
+    """
+    if buckets <= 0:
+        raise ValueError(f"buckets must be positive, got {buckets}")
+    b, j = -1, 0
+    key &= _MASK
+    while j < buckets:
+        b = j
+        key = (key * 2862933555777941757 + 1) & _MASK
+        j = int((b + 1) * (float(1 << 31) / float((key >> 33) + 1)))
+    return b
+
+
+def _validate_strategy(strategy: str) -> None:
+    if strategy not in SHARD_STRATEGIES:
+        raise ValueError(f"Unknown shard strategy: {strategy}. Available: {', '.join(SHARD_STRATEGIES)}")
+
+
+def shard_for_address(address: str, shard_count: int, strategy: str = SHARD_STRATEGY_JUMP) -> int:
+    """Return the shard index of an address."""
+    _validate_strategy(strategy)
+    key = city_hash64(address)
+    if strategy == SHARD_STRATEGY_MODULO:
+        return key % shard_count
+    return jump_consistent_hash(key, shard_count)
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """
+    One shard out of ``count``.
+
+    Example:
+        >>> shard = ShardSpec(index=2, count=8)
+        >>> shard.contains("5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY")
+        >>> query = f"SELECT ... FROM transfers WHERE {shard.condition('from_address')}"
+    """
+
+    index: int
+    count: int
+    strategy: str = SHARD_STRATEGY_JUMP
+
+    def __post_init__(self):
+        _validate_strategy(self.strategy)
+        if self.count <= 0:
+            raise ValueError(f"Shard count must be positive, got {self.count}")
+        if not 0 <= self.index < self.count:
+            raise ValueError(f"Shard index {self.index} out of range for {self.count} shards")
+
+    @classmethod
+    def all(cls, count: int, strategy: str = SHARD_STRATEGY_JUMP) -> list["ShardSpec"]:
+        return [cls(index, count, strategy) for index in range(count)]
+
+    def contains(self, address: str) -> bool:
+        return shard_for_address(address, self.count, self.strategy) == self.index
+
+    def condition(self, column: str = "address") -> str:
+        """Return a SQL predicate restricting a scan to this shard."""
+        if self.strategy == SHARD_STRATEGY_MODULO:
+            return f"cityHash64({column}) % {self.count} = {self.index}"
+        return f"jumpConsistentHash(cityHash64({column}), {self.count}) = {self.index}"
+
+
+class AddressPartitioner:
+    """
+    Consistent-hash partitioner assigning addresses to shards.
+
+    Example:
+        >>> partitioner = AddressPartitioner(shard_count=8)
+        >>> by_shard = partitioner.partition(addresses)
+    """
+
+    def __init__(self, shard_count: int, strategy: str = SHARD_STRATEGY_JUMP):
+        _validate_strategy(strategy)
+        if shard_count <= 0:
+            raise ValueError(f"Shard count must be positive, got {shard_count}")
+        self.shard_count = shard_count
+        self.strategy = strategy
+
+    def shard_for(self, address: str) -> int:
+        return shard_for_address(address, self.shard_count, self.strategy)
+
+    def partition(self, addresses: Iterable[str]) -> dict[int, list[str]]:
+        """Group addresses by shard index (only non-empty shards are returned)."""
+        shards: dict[int, list[str]] = {}
+        for address in addresses:
+            shards.setdefault(self.shard_for(address), []).append(address)
+        return shards
+
+    def shards(self) -> list[ShardSpec]:
+        return ShardSpec.all(self.shard_count, self.strategy)
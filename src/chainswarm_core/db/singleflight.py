@@ -0,0 +1,126 @@
+"""
+In-process coalescing of identical concurrent queries.
+
+When several threads (or coroutines) ask for the same result at the same
+time, only the first caller runs the query; the others wait for it and get
+the same result object. Results are shared, so callers must treat them as
+read-only.
+"""
+
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from chainswarm_core.observability import get_default_metrics_registry
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Call:
+    done: threading.Event = field(default_factory=threading.Event)
+    result: Any = None
+    error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Deduplicate concurrent calls sharing the same key.
+
+    Example:
+        >>> flight = SingleFlight("labels")
+        >>> labels = flight.do(("labels", network), repository.get_current_labels)
+    """
+
+    def __init__(self, name: str = "default"):
+        self.name = name
+        self._calls: dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._async_calls: dict[tuple[int, Hashable], asyncio.Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run ``fn`` once for all concurrent callers with the same ``key``.
+
+        Exceptions raised by ``fn`` are re-raised in every waiting caller.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            self._record_shared()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    async def do_async(self, key: Hashable, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """
+        Coroutine variant of ``do`` for callers sharing one event loop.
+
+        Waiting callers are shielded, so cancelling one of them does not
+        cancel the shared execution. When the caller running ``fn`` is
+        cancelled, the waiting callers elect a new one instead of being
+        cancelled with it.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        while (future := self._async_calls.get(loop_key)) is not None:
+            self._record_shared()
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only retry when the leader was cancelled, not this caller
+                if future.cancelled() and not asyncio.current_task().cancelling():
+                    continue
+                raise
+
+        future = loop.create_future()
+        self._async_calls[loop_key] = future
+        try:
+            result = await fn(*args, **kwargs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception without waiters is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._async_calls.pop(loop_key, None)
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._async_calls)
+
+    def _record_shared(self) -> None:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is None:
+            return
+        metrics_registry.get_or_create_counter(
+            "singleflight_shared_total",
+            "Total number of calls served by an identical in-flight call",
+            labelnames=["group"],
+        ).labels(group=self.name).inc()
+
+
+query_singleflight = SingleFlight("clickhouse_query")
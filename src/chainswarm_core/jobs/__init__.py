@@ -5,7 +5,63 @@ from chainswarm_core.jobs.celery import (
     run_dev_worker,
 )
 from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.async_task import AsyncBaseTask, bounded_gather, get_worker_event_loop
+from chainswarm_core.jobs.batching import AdaptiveBatchSizer, BatchMeasurement
+from chainswarm_core.jobs.checkpoints import (
+    CheckpointStore,
+    ClickHouseCheckpointStore,
+    FileCheckpointStore,
+    InMemoryCheckpointStore,
+    RedisCheckpointStore,
+    checkpoint_key,
+    context_fingerprint,
+)
+from chainswarm_core.jobs.instrumentation import PUBLISHED_AT_HEADER, TaskMeasurement, measure_task
+from chainswarm_core.jobs.locks import (
+    InMemoryTaskLock,
+    LeaseRenewer,
+    LockLostError,
+    RedisTaskLock,
+    TaskLock,
+    ensure_lease_held,
+    hold_lock,
+)
 from chainswarm_core.jobs.models import BaseTaskContext, BaseTaskResult
+from chainswarm_core.jobs.offload import (
+    BlobStore,
+    ClickHouseBlobStore,
+    LazyResult,
+    LocalBlobStore,
+    ResultOffloader,
+    is_result_reference,
+    resolve_result,
+)
+from chainswarm_core.jobs.parallel import EXECUTOR_PROCESS, EXECUTOR_THREAD, parallel_map
+from chainswarm_core.jobs.pipeline import BatchPipeline, PipelineStats, StageStats
+from chainswarm_core.jobs.profiling import PROFILE_HEADER, ProfilingConfig, StackSampler, profile
+from chainswarm_core.jobs.routing import (
+    LANE_HEADER,
+    PRIORITY_HIGH,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    NetworkRouter,
+    configure_network_lanes,
+    lane_for_network,
+)
+from chainswarm_core.jobs.serialization import (
+    MSGPACK_SERIALIZER,
+    TaskPayloadCodec,
+    register_msgpack_serializer,
+)
+from chainswarm_core.jobs.sharding import fan_out_shards, get_context_shard, shard_contexts
+from chainswarm_core.jobs.warmup import WorkerWarmup
+from chainswarm_core.jobs.watchdog import MemoryWatchdog, get_memory_watchdog
+from chainswarm_core.jobs.watermarks import (
+    ClickHouseWatermarkStore,
+    InMemoryWatermarkStore,
+    WatermarkStore,
+)
+from chainswarm_core.jobs.windows import merge_window_results, split_date_range, window_contexts
 
 __all__ = [
     "InterceptHandler",
@@ -13,6 +69,67 @@ __all__ = [
     "load_beat_schedule",
     "run_dev_worker",
     "BaseTask",
+    "AsyncBaseTask",
+    "bounded_gather",
+    "get_worker_event_loop",
     "BaseTaskContext",
     "BaseTaskResult",
+    "AdaptiveBatchSizer",
+    "BatchMeasurement",
+    "CheckpointStore",
+    "ClickHouseCheckpointStore",
+    "FileCheckpointStore",
+    "InMemoryCheckpointStore",
+    "RedisCheckpointStore",
+    "checkpoint_key",
+    "context_fingerprint",
+    "PUBLISHED_AT_HEADER",
+    "TaskMeasurement",
+    "measure_task",
+    "InMemoryTaskLock",
+    "LeaseRenewer",
+    "LockLostError",
+    "RedisTaskLock",
+    "TaskLock",
+    "ensure_lease_held",
+    "hold_lock",
+    "BlobStore",
+    "ClickHouseBlobStore",
+    "LazyResult",
+    "LocalBlobStore",
+    "ResultOffloader",
+    "is_result_reference",
+    "resolve_result",
+    "EXECUTOR_PROCESS",
+    "EXECUTOR_THREAD",
+    "parallel_map",
+    "BatchPipeline",
+    "PipelineStats",
+    "StageStats",
+    "PROFILE_HEADER",
+    "ProfilingConfig",
+    "StackSampler",
+    "profile",
+    "LANE_HEADER",
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
+    "PRIORITY_NORMAL",
+    "NetworkRouter",
+    "configure_network_lanes",
+    "lane_for_network",
+    "MSGPACK_SERIALIZER",
+    "TaskPayloadCodec",
+    "register_msgpack_serializer",
+    "fan_out_shards",
+    "get_context_shard",
+    "shard_contexts",
+    "WorkerWarmup",
+    "MemoryWatchdog",
+    "get_memory_watchdog",
+    "ClickHouseWatermarkStore",
+    "InMemoryWatermarkStore",
+    "WatermarkStore",
+    "merge_window_results",
+    "split_date_range",
+    "window_contexts",
 ]
\ No newline at end of file
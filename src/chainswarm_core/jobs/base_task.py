@@ -1,18 +1,359 @@
+import uuid
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from contextvars import ContextVar
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from celery import Task
+from loguru import logger
 
+from chainswarm_core.db.budget import QueryBudget, query_budget
+from chainswarm_core.jobs.batching import AdaptiveBatchSizer
+from chainswarm_core.jobs.checkpoints import CheckpointStore, checkpoint_key, context_fingerprint
+from chainswarm_core.jobs.instrumentation import PUBLISHED_AT_HEADER, measure_task
+from chainswarm_core.jobs.locks import (
+    LOCK_COLLISION_RETRY,
+    LOCK_COLLISION_SKIP,
+    TaskLock,
+    ensure_lease_held,
+    hold_lock,
+    record_lock_collision,
+)
+from chainswarm_core.jobs.models import BaseTaskResult
+from chainswarm_core.jobs.offload import ResultOffloader
+from chainswarm_core.jobs.profiling import PROFILE_HEADER, ProfilingConfig, profile
+from chainswarm_core.jobs.watchdog import get_memory_watchdog
+from chainswarm_core.jobs.watermarks import WatermarkStore
+from chainswarm_core.jobs.windows import (
+    WINDOW_ALIGN_MONTH,
+    WINDOW_PART_HEADER,
+    build_window_chord,
+    split_date_range,
+    window_contexts,
+)
 from chainswarm_core.observability import log_errors
 
 
+# Checkpoint key of the running task, built from the context as delivered:
+# resolved watermarks (e.g. a moving to_watermark) must not change it between deliveries
+_checkpoint_key: ContextVar[Optional[str]] = ContextVar("chainswarm_checkpoint_key", default=None)
+
+
+def _context_value(context, key: str) -> Any:
+    if isinstance(context, dict):
+        return context.get(key)
+    return getattr(context, key, None)
+
+
+def _context_dict(context) -> Dict[str, Any]:
+    """Return a task context dict or ``BaseTaskContext`` (e.g. decoded by msgpack) as a new dict."""
+    return asdict(context) if is_dataclass(context) else dict(context)
+
+
 class BaseTask(Task, ABC):
 
+    # Bounds for the adaptive batch sizer used when batch_size is None
+    batch_size_initial: int = 10_000
+    batch_size_min: int = 1_000
+    batch_size_max: int = 500_000
+    batch_target_seconds: float = 10.0
+    batch_max_rss_bytes: Optional[int] = None
+
+    # Window splitting: when set, a start_date..end_date range is split into
+    # sub-windows of at most this many days and run as a Celery chord
+    window_split_days: Optional[int] = None
+    window_split_align: str = WINDOW_ALIGN_MONTH
+    window_max_parallel: int = 4
+
+    # Incremental processing: when set, runs process (from_watermark, to_watermark]
+    watermark_store: Optional[WatermarkStore] = None
+
+    # Resumable runs: completed batches of run_batches are checkpointed here
+    checkpoint_store: Optional[CheckpointStore] = None
+
+    # Overlap prevention: only one run per (task, context) holds the lock;
+    # duplicates are skipped or retried after lock_retry_countdown seconds
+    task_lock: Optional[TaskLock] = None
+    lock_ttl_seconds: float = 300.0
+    lock_on_collision: str = LOCK_COLLISION_SKIP
+    lock_retry_countdown: int = 60
+    lock_max_retries: Optional[int] = None
+
+    # Results larger than the offloader threshold are stored outside the result backend
+    result_offloader: Optional[ResultOffloader] = None
+
+    # Profiling of execute_task; None reads the CHAINSWARM_PROFILE* environment variables
+    profiling: Optional[ProfilingConfig] = None
+
     @log_errors
     @abstractmethod
     def execute_task(self, context) -> Dict[str, Any]:
         pass
 
-    @log_errors
     def run(self, context) -> Dict[str, Any]:
-        return self.execute_task(context)
\ No newline at end of file
+        watchdog = get_memory_watchdog()
+        if watchdog is not None:
+            watchdog.check_admission(self.name)
+        if self.should_split_window(context):
+            return self.replace(self.build_window_chord(context))
+        return self.offload_result(self._run_measured(context))
+
+    def _run_measured(self, context) -> Dict[str, Any]:
+        published_at = self.get_request_header(PUBLISHED_AT_HEADER)
+        eta = getattr(self.request, "eta", None)
+        with measure_task(self.name, _context_value(context, "network"), published_at, eta) as measurement:
+            measurement.result = self._run_exclusive(context)
+        return measurement.result
+
+    def _run_exclusive(self, context) -> Dict[str, Any]:
+        if self.task_lock is None:
+            return self._execute(context)
+
+        with hold_lock(self.task_lock, self.get_lock_key(context), self.lock_ttl_seconds) as acquired:
+            if acquired:
+                return self._execute(context)
+        return self.handle_lock_collision(context)
+
+    @log_errors
+    def _execute(self, context) -> Dict[str, Any]:
+        key_token = _checkpoint_key.set(checkpoint_key(self.name, context))
+        try:
+            return self._execute_resolved(context)
+        finally:
+            _checkpoint_key.reset(key_token)
+
+    def _execute_resolved(self, context) -> Dict[str, Any]:
+        store = None
+        if not self.get_request_header(WINDOW_PART_HEADER):
+            store = self.get_watermark_store(context)
+        if store is not None:
+            context = self.resolve_watermarks(context, store)
+
+        profiling = self.profiling or ProfilingConfig.from_env()
+        profiler = profiling.select(self.get_request_header(PROFILE_HEADER))
+        with query_budget(QueryBudget.from_context(context)), \
+                profile(profiler, self.name, profiling.directory, profiling.interval):
+            result = self._call_execute_task(context)
+
+        # A run whose lock was taken over must not advance the watermark
+        ensure_lease_held()
+        if store is not None:
+            self.commit_watermark(context, result, store)
+        if self.checkpoint_store is not None and isinstance(result, dict) and result.get("status") == "success":
+            self.checkpoint_store.clear(_checkpoint_key.get())
+        return result
+
+    def _call_execute_task(self, context) -> Dict[str, Any]:
+        return self.execute_task(context)
+
+    def run_batches(self, context, batches: Iterable[Any], process: Callable[[Any], Any]) -> List[Any]:
+        """
+        Process numbered batches, skipping batches completed by an earlier delivery.
+
+        ``batches`` must yield the same batches in the same order for the
+        same context. After each batch its index and the (JSON serializable)
+        return value of ``process`` are saved to ``checkpoint_store``;
+        checkpoints are cleared once the task finishes successfully.
+
+        The checkpoint key is built from the context as delivered, before
+        watermark resolution, so a redelivery finds the checkpoints even if
+        ``get_watermark_upper_bound`` has moved on in between.
+
+        Args:
+            context: Task context, used to build the checkpoint key when
+                called outside of a task run
+            batches: Batches to process
+            process: Called with each batch that is not yet completed
+
+        Returns:
+            Partial results of all batches in order, restored ones included
+
+        Raises:
+            LockLostError: If the ``task_lock`` lease was lost before a batch
+        """
+        if self.checkpoint_store is None:
+            results = []
+            for batch in batches:
+                ensure_lease_held()
+                results.append(process(batch))
+            return results
+
+        key = _checkpoint_key.get() or checkpoint_key(self.name, context)
+        completed = self.checkpoint_store.load(key)
+        if completed:
+            logger.info(
+                "Resuming task from checkpoint",
+                extra={"task": self.name, "checkpoint_key": key, "completed_batches": len(completed)}
+            )
+
+        results = []
+        for index, batch in enumerate(batches):
+            if index in completed:
+                results.append(completed[index])
+                continue
+            ensure_lease_held()
+            result = process(batch)
+            self.checkpoint_store.save(key, index, result)
+            results.append(result)
+        return results
+
+    def get_watermark_store(self, context) -> Optional[WatermarkStore]:
+        return self.watermark_store
+
+    def get_watermark_upper_bound(self, context: Dict[str, Any]) -> Optional[int]:
+        """
+        Return the newest position available for processing.
+
+        Override to return e.g. the latest indexed block height; it becomes
+        ``to_watermark`` unless the context already sets one.
+        """
+        return None
+
+    def resolve_watermarks(self, context, store: WatermarkStore) -> Dict[str, Any]:
+        """
+        Fill ``from_watermark`` / ``to_watermark`` of a context.
+
+        ``from_watermark`` is the stored watermark (exclusive) and stays None
+        on the first run, in which case the task processes its full window.
+        Bounds already present in the context take precedence.
+        """
+        context = _context_dict(context)
+        if context.get("from_watermark") is None:
+            context["from_watermark"] = store.get(self.name, context["network"])
+        if context.get("to_watermark") is None:
+            context["to_watermark"] = self.get_watermark_upper_bound(context)
+        return context
+
+    def commit_watermark(self, context: Dict[str, Any], result: Dict[str, Any], store: WatermarkStore) -> None:
+        """Advance the watermark to ``to_watermark`` after a successful run."""
+        to_watermark = context.get("to_watermark")
+        if to_watermark is None or not isinstance(result, dict) or result.get("status") != "success":
+            return
+        store.set(self.name, context["network"], to_watermark)
+
+    def reset_watermark(self, network: str, value: Optional[int] = None) -> None:
+        """
+        Reset the watermark of this task so the next run reprocesses data.
+
+        Args:
+            network: Network to reset
+            value: Position to restart after; None reprocesses the full window
+        """
+        store = self.get_watermark_store({"network": network})
+        if store is None:
+            raise ValueError(f"Task {self.name} has no watermark store")
+        store.reset(self.name, network, value)
+
+    def offload_result(self, result: Any) -> Any:
+        """Replace a large result by a blob store reference when ``result_offloader`` is set."""
+        if self.result_offloader is None:
+            return result
+        task_id = getattr(self.request, "id", None) or uuid.uuid4().hex
+        return self.result_offloader.offload(result, key=f"{self.name}/{task_id}")
+
+    def resolve_result(self, value: Any) -> Any:
+        """Load the full result behind a reference produced by ``offload_result``."""
+        if self.result_offloader is None:
+            return value
+        return self.result_offloader.resolve(value)
+
+    def get_lock_key(self, context) -> str:
+        return f"{self.name}:{context_fingerprint(context)}"
+
+    def handle_lock_collision(self, context) -> Dict[str, Any]:
+        """
+        Handle a run whose (task, context) is already running elsewhere.
+
+        With ``lock_on_collision="skip"`` a ``skipped`` result is returned;
+        with ``"retry"`` the task is retried after ``lock_retry_countdown``.
+        """
+        record_lock_collision(self.name, self.lock_on_collision)
+        logger.warning(
+            "Task already running, duplicate run not started",
+            extra={"task": self.name, "network": _context_value(context, "network"), "action": self.lock_on_collision}
+        )
+        if self.lock_on_collision == LOCK_COLLISION_RETRY:
+            raise self.retry(countdown=self.lock_retry_countdown, max_retries=self.lock_max_retries)
+        return asdict(BaseTaskResult(
+            network=_context_value(context, "network"),
+            status="skipped",
+            processing_date=_context_value(context, "processing_date"),
+            window_days=_context_value(context, "window_days"),
+        ))
+
+    def get_request_header(self, name: str, default: Any = None) -> Any:
+        headers = getattr(self.request, "headers", None) or {}
+        if name in headers:
+            return headers[name]
+        return getattr(self.request, name, default)
+
+    def should_split_window(self, context) -> bool:
+        if not self.window_split_days or not (isinstance(context, dict) or is_dataclass(context)):
+            return False
+        if not _context_value(context, "start_date") or not _context_value(context, "end_date"):
+            return False
+        if self.request.called_directly or self.get_request_header(WINDOW_PART_HEADER):
+            return False
+        return len(self.split_window(_context_dict(context))) > 1
+
+    def split_window(self, context: Dict[str, Any]):
+        return split_date_range(
+            context["start_date"],
+            context["end_date"],
+            self.window_split_days,
+            self.window_split_align,
+        )
+
+    def build_window_chord(self, context):
+        """
+        Build the chord running ``context`` as partition-aligned sub-windows.
+
+        Sub-window tasks receive the context with ``start_date`` / ``end_date``
+        narrowed to their window; ``merge_window_results`` reduces their
+        results once all of them are done.
+        """
+        context = _context_dict(context)
+        pending = window_contexts(context, self.split_window(context))
+        return build_window_chord(self.name, context, pending, self.window_max_parallel)
+
+    def merge_window_results(self, context: Dict[str, Any], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-window results into the result of the whole range.
+
+        Override to combine domain specific fields; the default reports
+        success only if every window succeeded and sums ``rows_processed``.
+        """
+        failed = [r for r in results if not r or r.get("status") != "success"]
+        rows = [r["rows_processed"] for r in results if r and r.get("rows_processed") is not None]
+        merged = asdict(BaseTaskResult(
+            network=context.get("network"),
+            status="success" if not failed else "failed",
+            processing_date=context.get("processing_date"),
+            window_days=context.get("window_days"),
+            rows_processed=sum(rows) if rows else None,
+        ))
+        merged["windows"] = len(results)
+        merged["failed_windows"] = len(failed)
+        return merged
+
+    def get_batch_sizer(self, context) -> AdaptiveBatchSizer:
+        """
+        Return the batch sizer for a task run.
+
+        A ``batch_size`` in the context pins the size; with ``batch_size=None``
+        the size adapts to observed latency, throughput and memory.
+        """
+        labels = {"task": self.name or type(self).__name__, "network": _context_value(context, "network") or "unknown"}
+
+        batch_size = _context_value(context, "batch_size")
+        if batch_size:
+            return AdaptiveBatchSizer.fixed(batch_size, metric_labels=labels)
+
+        return AdaptiveBatchSizer(
+            initial_size=self.batch_size_initial,
+            min_size=self.batch_size_min,
+            max_size=self.batch_size_max,
+            target_seconds=self.batch_target_seconds,
+            max_rss_bytes=self.batch_max_rss_bytes,
+            metric_labels=labels,
+        )
@@ -0,0 +1,161 @@
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, Optional
+
+from loguru import logger
+
+from chainswarm_core.observability import get_default_metrics_registry
+from chainswarm_core.observability.memory import get_rss_bytes
+
+
+@dataclass
+class BatchMeasurement:
+    size: int
+    rows: Optional[int] = None
+    duration: float = 0.0
+    rss_bytes: int = 0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.duration <= 0:
+            return 0.0
+        return (self.rows if self.rows is not None else self.size) / self.duration
+
+
+class AdaptiveBatchSizer:
+    """
+    AIMD batch size controller driven by observed batch latency and memory.
+
+    After each batch the size grows by ``increase_step`` while batches stay
+    under ``target_seconds``, RSS stays under ``max_rss_bytes`` and
+    throughput does not drop. When a batch is too slow or memory is too
+    high, the size is multiplied by ``decrease_factor``.
+
+    Example:
+        >>> sizer = AdaptiveBatchSizer(initial_size=10_000, min_size=1_000, max_size=200_000)
+        >>> while not done:
+        ...     with sizer.measure() as batch:
+        ...         rows = repository.fetch_batch(offset, batch.size)
+        ...         batch.rows = len(rows)
+    """
+
+    def __init__(
+        self,
+        initial_size: int = 10_000,
+        min_size: int = 1_000,
+        max_size: int = 500_000,
+        target_seconds: float = 10.0,
+        max_rss_bytes: Optional[int] = None,
+        increase_step: Optional[int] = None,
+        decrease_factor: float = 0.5,
+        throughput_tolerance: float = 0.1,
+        metric_labels: Optional[Dict[str, str]] = None,
+    ):
+        if min_size <= 0 or min_size > max_size:
+            raise ValueError(f"Invalid batch size bounds: min={min_size}, max={max_size}")
+        if not 0 < decrease_factor < 1:
+            raise ValueError(f"decrease_factor must be between 0 and 1, got {decrease_factor}")
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.target_seconds = target_seconds
+        self.max_rss_bytes = max_rss_bytes
+        self.increase_step = increase_step or max(min_size, initial_size // 10)
+        self.decrease_factor = decrease_factor
+        self.throughput_tolerance = throughput_tolerance
+        self.metric_labels = metric_labels or {}
+        self.last: Optional[BatchMeasurement] = None
+        self._size = self._clamp(initial_size)
+        self._publish_size()
+
+    @classmethod
+    def fixed(cls, size: int, metric_labels: Optional[Dict[str, str]] = None) -> "AdaptiveBatchSizer":
+        """Create a sizer that always returns ``size``."""
+        return cls(initial_size=size, min_size=size, max_size=size, metric_labels=metric_labels)
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def is_fixed(self) -> bool:
+        return self.min_size == self.max_size
+
+    def _clamp(self, size: int) -> int:
+        return max(self.min_size, min(self.max_size, int(size)))
+
+    def record(self, measurement: BatchMeasurement) -> int:
+        """
+        Feed the measurement of a finished batch and compute the next size.
+
+        Partial batches (fewer rows than requested, typically the last one)
+        are recorded but do not change the size.
+
+        Returns:
+            Size to use for the next batch
+        """
+        previous = self.last
+        self.last = measurement
+
+        if self.is_fixed:
+            return self._size
+        if measurement.rows is not None and measurement.rows < measurement.size:
+            return self._size
+
+        too_slow = measurement.duration > self.target_seconds
+        too_big = self.max_rss_bytes is not None and measurement.rss_bytes > self.max_rss_bytes
+
+        if too_slow or too_big:
+            new_size = self._clamp(self._size * self.decrease_factor)
+            logger.debug(
+                "Decreasing batch size",
+                extra={
+                    "from": self._size,
+                    "to": new_size,
+                    "duration": measurement.duration,
+                    "rss_bytes": measurement.rss_bytes,
+                }
+            )
+        elif (
+            previous is not None
+            and measurement.rows_per_second < previous.rows_per_second * (1 - self.throughput_tolerance)
+        ):
+            # Larger batches stopped paying off, hold the current size
+            new_size = self._size
+        else:
+            new_size = self._clamp(self._size + self.increase_step)
+
+        self._size = new_size
+        self._publish_size()
+        return self._size
+
+    @contextmanager
+    def measure(self) -> Iterator[BatchMeasurement]:
+        """
+        Measure one batch of the current size.
+
+        Set ``rows`` on the yielded measurement to the number of rows
+        actually processed. The measurement is only recorded when the block
+        completes without an exception.
+        """
+        measurement = BatchMeasurement(size=self._size)
+        started = time.perf_counter()
+        yield measurement
+        measurement.duration = time.perf_counter() - started
+        measurement.rss_bytes = get_rss_bytes()
+        self.record(measurement)
+
+    def _publish_size(self) -> None:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is None:
+            return
+        gauge = metrics_registry.get_or_create_gauge(
+            "task_batch_size",
+            "Batch size chosen for the next batch",
+            labelnames=["task", "network"],
+        )
+        gauge.labels(
+            task=self.metric_labels.get("task", "unknown"),
+            network=self.metric_labels.get("network", "unknown"),
+        ).set(self._size)
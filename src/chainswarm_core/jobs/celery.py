@@ -1,13 +1,20 @@
 import os
 import json
 import logging
-from typing import List, Optional, Dict, Any
+import random
+from typing import List, Optional, Dict, Any, Tuple
 
 from celery import Celery
 from celery.schedules import crontab
 from celery.signals import setup_logging
 from loguru import logger
 
+from chainswarm_core.constants import networks as all_networks
+from chainswarm_core.jobs.routing import configure_network_lanes
+from chainswarm_core.jobs.serialization import MSGPACK_SERIALIZER, register_msgpack_serializer
+from chainswarm_core.jobs.warmup import WorkerWarmup
+from chainswarm_core.jobs.watchdog import MemoryWatchdog
+
 
 class InterceptHandler(logging.Handler):
     def emit(self, record):
@@ -33,7 +40,170 @@ def _setup_loguru(**kwargs):
         logging.getLogger(name).propagate = True
 
 
+STAGGER_EVEN = "even"
+STAGGER_JITTER = "jitter"
+
+# Longest countdown used for staggering. Redis redelivers unacked messages
+# after visibility_timeout (3600s by default) and task_acks_late keeps ETA
+# messages unacked until they run, so longer countdowns would run twice.
+MAX_STAGGER_COUNTDOWN = 600
+
+_DAY_MINUTES = 24 * 60
+_WEEK_MINUTES = 7 * _DAY_MINUTES
+
+
+def _is_cron(schedule: Any) -> bool:
+    return isinstance(schedule, str) and len(schedule.split()) == 5
+
+
+def _daily_runs(minute: str, hour: str) -> List[int]:
+    cron = crontab(minute=minute, hour=hour)
+    return sorted(h * 60 + m for h in cron.hour for m in cron.minute)
+
+
+def _min_gap(runs: List[int], period: Optional[int]) -> int:
+    """Shortest gap between sorted ``runs``; wraps around ``period`` unless it is None."""
+    gaps = [b - a for a, b in zip(runs, runs[1:])]
+    gaps.append(runs[0] + period - runs[-1] if period else _DAY_MINUTES - runs[-1])
+    return min(gaps)
+
+
+def _schedule_interval_seconds(schedule: Any) -> int:
+    """
+    Return the interval a schedule repeats at, used as the default stagger window.
+
+    For cron strings this is the shortest gap between two runs: within a
+    day for daily schedules, within a week for day-of-week schedules, and
+    up to midnight for day-of-month or month schedules (their runs are not
+    moved to another day). Interval schedules use their number of seconds;
+    anything else falls back to 60 seconds.
+    """
+    if isinstance(schedule, (int, float)):
+        return int(schedule)
+    if not _is_cron(schedule):
+        return 60
+    minute, hour, day_of_month, month, day_of_week = schedule.split()
+    runs = _daily_runs(minute, hour)
+    if day_of_month != "*" or month != "*":
+        return _min_gap(runs, None) * 60
+    if day_of_week != "*":
+        days = sorted(crontab(day_of_week=day_of_week).day_of_week)
+        return _min_gap([d * _DAY_MINUTES + r for d in days for r in runs], _WEEK_MINUTES) * 60
+    return _min_gap(runs, _DAY_MINUTES) * 60
+
+
+def _cron_field(values: List[int], size: int) -> str:
+    return "*" if len(values) == size else ",".join(map(str, values))
+
+
+def _shift_cron(schedule: str, offset_seconds: int) -> Optional[Tuple[str, int]]:
+    """
+    Move a cron schedule later by ``offset_seconds``.
+
+    Every run is moved by the whole minutes of the offset and the minute
+    and hour fields are rewritten, moving the day of week along for runs
+    that cross midnight. Returns the new schedule and the remaining seconds
+    as a countdown, or None when the shifted runs cannot be expressed in
+    one cron entry (e.g. only some runs cross the hour, or runs of a
+    day-of-month schedule cross midnight).
+    """
+    minute, hour, day_of_month, month, day_of_week = schedule.split()
+    minutes, seconds = divmod(offset_seconds, 60)
+    if minutes == 0:
+        return schedule, seconds
+
+    shifted = [run + minutes for run in _daily_runs(minute, hour)]
+    in_day = {run % _DAY_MINUTES for run in shifted}
+    new_minutes = sorted({run % 60 for run in in_day})
+    new_hours = sorted({run // 60 for run in in_day})
+    if len(new_minutes) * len(new_hours) != len(in_day):
+        return None
+
+    days = {run // _DAY_MINUTES for run in shifted}
+    if day_of_month != "*" or month != "*":
+        if days != {0}:
+            return None
+    elif day_of_week != "*" and days != {0}:
+        if len(days) != 1:
+            return None
+        days_later = days.pop()
+        week_days = sorted((d + days_later) % 7 for d in crontab(day_of_week=day_of_week).day_of_week)
+        day_of_week = _cron_field(week_days, 7)
+
+    fields = [_cron_field(new_minutes, 60), _cron_field(new_hours, 24), day_of_month, month, day_of_week]
+    return " ".join(fields), seconds
+
+
+def _stagger_countdown(offset_seconds: int, stagger_seconds: float) -> int:
+    """Scale an offset within ``stagger_seconds`` into a countdown of at most ``MAX_STAGGER_COUNTDOWN``."""
+    if stagger_seconds <= MAX_STAGGER_COUNTDOWN:
+        return offset_seconds
+    return int(offset_seconds * MAX_STAGGER_COUNTDOWN / stagger_seconds)
+
+
+def _expand_networks(task_name: str, task_config: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """
+    Expand an entry declaring ``networks`` into one entry per network.
+
+    Each network's context (the first positional arg) gets its ``network``
+    set, and its run is moved later by an offset within ``stagger_seconds``
+    (default: the schedule interval): evenly spread with ``"stagger": "even"``,
+    random with ``"stagger": "jitter"``. Cron schedules are shifted in their
+    fields; other schedules, and shifts cron cannot express, get a countdown
+    scaled down to at most ``MAX_STAGGER_COUNTDOWN``.
+    """
+    task_config = dict(task_config)
+    networks = task_config.pop('networks')
+    stagger = task_config.pop('stagger', STAGGER_EVEN)
+    if networks == "all":
+        networks = list(all_networks)
+    elif not isinstance(networks, list) or not all(isinstance(network, str) for network in networks):
+        raise ValueError(f"networks of schedule entry {task_name} must be a list of names or \"all\", got {networks!r}")
+    if stagger not in (STAGGER_EVEN, STAGGER_JITTER, None):
+        raise ValueError(f"Unknown stagger {stagger!r} for schedule entry {task_name}")
+
+    schedule = task_config.get('schedule')
+    stagger_seconds = task_config.pop('stagger_seconds', None)
+    if stagger_seconds is None:
+        stagger_seconds = _schedule_interval_seconds(schedule)
+
+    args = list(task_config.get('args') or [{}])
+    if not isinstance(args[0], dict):
+        raise ValueError(
+            f"First argument of schedule entry {task_name} must be a context dict to set the network in, got {args[0]!r}"
+        )
+    expanded = {}
+    for index, network in enumerate(networks):
+        if stagger == STAGGER_EVEN:
+            offset = int(index * stagger_seconds / len(networks))
+        elif stagger == STAGGER_JITTER:
+            offset = random.randrange(max(1, int(stagger_seconds)))
+        else:
+            offset = 0
+
+        entry = dict(task_config)
+        entry['args'] = [{**args[0], 'network': network}, *args[1:]]
+
+        shifted = _shift_cron(schedule, offset) if _is_cron(schedule) else None
+        if shifted is not None:
+            entry['schedule'], countdown = shifted
+        else:
+            countdown = _stagger_countdown(offset, stagger_seconds)
+        if countdown:
+            entry['options'] = {**entry.get('options', {}), 'countdown': countdown}
+        expanded[f"{task_name}:{network}"] = entry
+    return expanded
+
+
 def load_beat_schedule(schedule_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load a JSON beat schedule.
+
+    Cron strings become ``crontab`` objects. An entry with a ``networks`` list
+    (or ``"all"``) expands into ``<name>:<network>`` entries whose runs are
+    staggered over the schedule interval, so networks do not all start at
+    the same second. Invalid network entries are logged and skipped.
+    """
 
     env_path = os.getenv('CELERY_BEAT_SCHEDULE_PATH')
     if env_path and os.path.exists(env_path):
@@ -53,8 +223,21 @@ def load_beat_schedule(schedule_path: Optional[str] = None) -> Dict[str, Any]:
         with open(schedule_path, 'r') as f:
             schedule = json.load(f)
 
-        filtered_schedule = {}
+        expanded_schedule = {}
         for task_name, task_config in schedule.items():
+            if isinstance(task_config, dict) and 'networks' in task_config:
+                try:
+                    expanded_schedule.update(_expand_networks(task_name, task_config))
+                except ValueError as e:
+                    logger.error(
+                        "Skipping invalid beat schedule entry",
+                        extra={"task_name": task_name, "error": str(e), "schedule_path": schedule_path}
+                    )
+            else:
+                expanded_schedule[task_name] = task_config
+
+        filtered_schedule = {}
+        for task_name, task_config in expanded_schedule.items():
             if not isinstance(task_config, dict):
                 continue
                 
@@ -96,12 +279,28 @@ def load_beat_schedule(schedule_path: Optional[str] = None) -> Dict[str, Any]:
         return {}
 
 
+def _merge_config(config: Dict[str, Any], updates: Dict[str, Any]) -> None:
+    """Update ``config``, merging ``broker_transport_options`` instead of replacing them."""
+    transport_options = updates.get('broker_transport_options')
+    if transport_options is not None:
+        updates = {
+            **updates,
+            'broker_transport_options': {**config.get('broker_transport_options', {}), **transport_options},
+        }
+    config.update(updates)
+
+
 def create_celery_app(
     name: str,
     autodiscover: List[str],
     beat_schedule_path: Optional[str] = None,
     broker_url: Optional[str] = None,
     result_backend: Optional[str] = None,
+    network_lanes: Optional[str] = None,
+    lane_queue_prefix: str = '',
+    serializer: str = 'json',
+    memory_watchdog: Optional[MemoryWatchdog] = None,
+    warmup: Optional[WorkerWarmup] = None,
     **config_overrides
 ) -> Celery:
     setup_logging.connect(_setup_loguru)
@@ -128,8 +327,35 @@ def create_celery_app(
         'worker_hijack_root_logger': False,
         'worker_log_color': False,
     }
+
+    # Per-network queues ('network') or per network type ('network_type')
+    if network_lanes:
+        _merge_config(config, configure_network_lanes(network_lanes, queue_prefix=lane_queue_prefix))
+
+    # msgpack (+ zstd above a size threshold); json stays accepted for messages already queued
+    if serializer == 'msgpack':
+        register_msgpack_serializer()
+        config.update({
+            'task_serializer': MSGPACK_SERIALIZER,
+            'result_serializer': MSGPACK_SERIALIZER,
+            'accept_content': ['json', MSGPACK_SERIALIZER],
+            'result_accept_content': ['json', MSGPACK_SERIALIZER],
+        })
+    elif serializer != 'json':
+        raise ValueError(f"Unknown serializer: {serializer}. Available: json, msgpack")
+
+    # Soft limit recycles the child between tasks, hard limit rejects new tasks
+    memory_watchdog = memory_watchdog or MemoryWatchdog.from_env()
+    if memory_watchdog is not None:
+        config.update(memory_watchdog.celery_config())
+        memory_watchdog.install()
+
+    # Warm-up runs in worker_process_init, so the alive timeout must cover its budget
+    if warmup is not None:
+        config.update(warmup.celery_config())
+        warmup.install()
     
-    config.update(config_overrides)
+    _merge_config(config, config_overrides)
     celery_app.config_from_object(config)
     
     celery_app.autodiscover_tasks(autodiscover)
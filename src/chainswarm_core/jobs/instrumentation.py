@@ -0,0 +1,191 @@
+"""
+Per-task performance metrics recorded by ``BaseTask``.
+
+Every published task is stamped with its publish time in the
+``chainswarm_published_at`` header; when it runs, ``BaseTask`` records the
+time spent in the queue (counted from its ``eta`` / ``countdown`` when one
+was set, since waiting for it is intended), the execution duration, the peak RSS growth and
+the ``rows_processed`` of its result, labelled by task name and network.
+
+The peak RSS is per process, so it is only reset and attributed to a task
+that ran alone (prefork with one task per child). Tasks that overlapped
+with others in the process (threads, gevent, async) report the growth of
+the current RSS instead.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, Optional
+
+from celery.exceptions import Ignore, Reject, Retry
+from celery.signals import before_task_publish
+
+from chainswarm_core.observability import get_default_metrics_registry
+from chainswarm_core.observability.memory import get_peak_rss_bytes, get_rss_bytes, reset_peak_rss
+
+PUBLISHED_AT_HEADER = "chainswarm_published_at"
+
+_DURATION_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600, 7200)
+_QUEUE_WAIT_BUCKETS = (0.01, 0.1, 0.5, 1, 5, 15, 30, 60, 300, 900, 3600)
+_RSS_BUCKETS = tuple(2 ** power for power in range(20, 36, 2))  # 1 MiB .. 32 GiB
+
+# Tasks being measured in this process and a counter bumped whenever tasks overlap
+_running_lock = threading.Lock()
+_running = 0
+_overlaps = 0
+
+
+@before_task_publish.connect(weak=False, dispatch_uid="chainswarm_published_at_header")
+def _stamp_published_at(sender: Any = None, headers: Optional[Dict[str, Any]] = None, **kwargs: Any) -> None:
+    if headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Convert a Celery ``eta`` (ISO string or datetime) or epoch seconds to epoch seconds."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value.timestamp()
+    return None
+
+
+@dataclass
+class TaskMeasurement:
+    task: str
+    network: str
+    queue_wait: Optional[float] = None
+    duration: float = 0.0
+    peak_rss_delta: int = 0
+    rows_processed: Optional[int] = None
+    status: str = "success"
+    result: Any = None
+
+
+def _metrics() -> Optional[Dict[str, Any]]:
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is None:
+        return None
+    labels = ["task", "network"]
+    return {
+        "queue_wait": metrics_registry.get_or_create_histogram(
+            "task_queue_wait_seconds",
+            "Time between publishing a task and the start of its execution",
+            labelnames=labels,
+            buckets=_QUEUE_WAIT_BUCKETS,
+        ),
+        "duration": metrics_registry.get_or_create_histogram(
+            "task_duration_seconds",
+            "Task execution duration",
+            labelnames=labels + ["status"],
+            buckets=_DURATION_BUCKETS,
+        ),
+        "rss": metrics_registry.get_or_create_histogram(
+            "task_peak_rss_delta_bytes",
+            "Growth of the worker peak RSS over the start of the task (current RSS for overlapping tasks)",
+            labelnames=labels,
+            buckets=_RSS_BUCKETS,
+        ),
+        "rows": metrics_registry.get_or_create_counter(
+            "task_rows_processed_total",
+            "Total number of rows processed by tasks",
+            labelnames=labels,
+        ),
+    }
+
+
+def _start_running() -> Optional[int]:
+    """Register a running task; return the overlap count if it runs alone, else None."""
+    global _running, _overlaps
+    with _running_lock:
+        _running += 1
+        if _running > 1:
+            _overlaps += 1
+            return None
+        return _overlaps
+
+
+def _stop_running(alone_since: Optional[int]) -> bool:
+    """Unregister a running task; return whether it ran alone throughout."""
+    global _running
+    with _running_lock:
+        _running -= 1
+        return alone_since is not None and alone_since == _overlaps
+
+
+def _status(result: Any) -> str:
+    if isinstance(result, dict) and result.get("status"):
+        return str(result["status"])
+    return "success"
+
+
+@contextmanager
+def measure_task(
+    task: str,
+    network: Optional[str],
+    published_at: Optional[float] = None,
+    eta: Any = None,
+) -> Iterator[TaskMeasurement]:
+    """
+    Measure one task execution and record it in the default metrics registry.
+
+    The queue wait is counted from ``published_at``, or from ``eta`` when the
+    task was scheduled for later (``eta`` / ``countdown``).
+
+    The caller assigns the task result to ``measurement.result``; its
+    ``status`` and ``rows_processed`` are recorded. Exceptions are recorded
+    with status ``error`` (``retry`` for Celery retries and rejections).
+    """
+    measurement = TaskMeasurement(task=task, network=network or "unknown")
+    started = time.time()
+    if published_at is not None:
+        ready_at = max(float(published_at), _timestamp(eta) or 0.0)
+        measurement.queue_wait = max(0.0, started - ready_at)
+
+    alone_since = _start_running()
+    # Resetting the process-wide peak would corrupt the peaks of concurrent tasks
+    peak_reset = alone_since is not None and reset_peak_rss()
+    rss_before = get_rss_bytes()
+    perf_started = time.perf_counter()
+    try:
+        yield measurement
+        measurement.status = _status(measurement.result)
+    except (Retry, Reject, Ignore):
+        measurement.status = "retry"
+        raise
+    except BaseException:
+        measurement.status = "error"
+        raise
+    finally:
+        measurement.duration = time.perf_counter() - perf_started
+        ran_alone = _stop_running(alone_since)
+        rss_after = get_peak_rss_bytes() if peak_reset and ran_alone else get_rss_bytes()
+        measurement.peak_rss_delta = max(0, rss_after - rss_before)
+        if isinstance(measurement.result, dict):
+            measurement.rows_processed = measurement.result.get("rows_processed")
+        _record(measurement)
+
+
+def _record(measurement: TaskMeasurement) -> None:
+    metrics = _metrics()
+    if metrics is None:
+        return
+    labels = {"task": measurement.task, "network": measurement.network}
+    if measurement.queue_wait is not None:
+        metrics["queue_wait"].labels(**labels).observe(measurement.queue_wait)
+    metrics["duration"].labels(status=measurement.status, **labels).observe(measurement.duration)
+    metrics["rss"].labels(**labels).observe(measurement.peak_rss_delta)
+    if measurement.rows_processed:
+        metrics["rows"].labels(**labels).inc(measurement.rows_processed)
@@ -0,0 +1,218 @@
+"""
+Distributed locks preventing overlapping runs of the same task.
+
+A lock is a lease: it expires after ``ttl_seconds`` unless the holder renews
+it, so a worker killed mid-run cannot block the task forever. While a task
+runs, a ``LeaseRenewer`` thread keeps extending the lease; once the lease
+is lost another worker may take the lock, so the holder checks
+``ensure_lease_held()`` before further writes.
+"""
+
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from loguru import logger
+
+from chainswarm_core.observability import get_default_metrics_registry
+
+LOCK_COLLISION_SKIP = "skip"
+LOCK_COLLISION_RETRY = "retry"
+LOCK_COLLISION_ACTIONS = (LOCK_COLLISION_SKIP, LOCK_COLLISION_RETRY)
+
+_active_lease: ContextVar[Optional["LeaseRenewer"]] = ContextVar("chainswarm_task_lease", default=None)
+
+_RENEW_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('pexpire', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+class LockLostError(RuntimeError):
+    """Raised when the lock lease of a running task was lost."""
+
+
+class TaskLock(ABC):
+    """Lease-based mutual exclusion keyed by string."""
+
+    @abstractmethod
+    def acquire(self, key: str, ttl_seconds: float) -> Optional[str]:
+        """Try to take the lock; return the owner token, or None when it is held."""
+
+    @abstractmethod
+    def renew(self, key: str, token: str, ttl_seconds: float) -> bool:
+        """Extend the lease; False when the lock is no longer owned by ``token``."""
+
+    @abstractmethod
+    def release(self, key: str, token: str) -> bool:
+        """Release the lock if it is still owned by ``token``."""
+
+
+class InMemoryTaskLock(TaskLock):
+    """Process-local lock for tests and single-worker runs."""
+
+    def __init__(self):
+        self._leases: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def _owner(self, key: str) -> Optional[str]:
+        lease = self._leases.get(key)
+        if lease is None or lease[1] <= time.monotonic():
+            self._leases.pop(key, None)
+            return None
+        return lease[0]
+
+    def acquire(self, key: str, ttl_seconds: float) -> Optional[str]:
+        with self._lock:
+            if self._owner(key) is not None:
+                return None
+            token = uuid.uuid4().hex
+            self._leases[key] = (token, time.monotonic() + ttl_seconds)
+            return token
+
+    def renew(self, key: str, token: str, ttl_seconds: float) -> bool:
+        with self._lock:
+            if self._owner(key) != token:
+                return False
+            self._leases[key] = (token, time.monotonic() + ttl_seconds)
+            return True
+
+    def release(self, key: str, token: str) -> bool:
+        with self._lock:
+            if self._owner(key) != token:
+                return False
+            del self._leases[key]
+            return True
+
+
+class RedisTaskLock(TaskLock):
+    """
+    Redis lock using ``SET NX PX`` with token-checked renew and release.
+
+    Renew and release run as Lua scripts so a holder whose lease expired
+    cannot extend or delete a lock taken over by another worker.
+    """
+
+    def __init__(self, client: Any = None, url: Optional[str] = None, prefix: str = "chainswarm:lock:"):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url or os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+        self.client = client
+        self.prefix = prefix
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+
+    def acquire(self, key: str, ttl_seconds: float) -> Optional[str]:
+        token = uuid.uuid4().hex
+        if self.client.set(self.prefix + key, token, nx=True, px=int(ttl_seconds * 1000)):
+            return token
+        return None
+
+    def renew(self, key: str, token: str, ttl_seconds: float) -> bool:
+        return bool(self._renew(keys=[self.prefix + key], args=[token, int(ttl_seconds * 1000)]))
+
+    def release(self, key: str, token: str) -> bool:
+        return bool(self._release(keys=[self.prefix + key], args=[token]))
+
+
+class LeaseRenewer(threading.Thread):
+    """Daemon thread renewing a lock every ``ttl_seconds / 3`` until stopped."""
+
+    def __init__(self, lock: TaskLock, key: str, token: str, ttl_seconds: float):
+        super().__init__(name=f"lease-{key}", daemon=True)
+        self.lock = lock
+        self.key = key
+        self.token = token
+        self.ttl_seconds = ttl_seconds
+        self.lost = False
+        self.renewed_at = time.monotonic()
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.ttl_seconds / 3):
+            try:
+                renewed = self.lock.renew(self.key, self.token, self.ttl_seconds)
+            except Exception as e:
+                logger.warning("Lock renewal failed", extra={"lock_key": self.key, "error": str(e)})
+                continue
+            if not renewed:
+                self.lost = True
+                logger.warning("Lock lease lost", extra={"lock_key": self.key})
+                return
+            self.renewed_at = time.monotonic()
+
+    @property
+    def held(self) -> bool:
+        """False once renewal was refused or failed for longer than the lease lasts."""
+        return not self.lost and time.monotonic() - self.renewed_at < self.ttl_seconds
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+
+@contextmanager
+def hold_lock(lock: TaskLock, key: str, ttl_seconds: float) -> Iterator[bool]:
+    """
+    Hold ``key`` for the duration of the block, renewing the lease.
+
+    Yields:
+        True when the lock was acquired, False when another holder has it
+    """
+    token = lock.acquire(key, ttl_seconds)
+    if token is None:
+        yield False
+        return
+
+    renewer = LeaseRenewer(lock, key, token, ttl_seconds)
+    renewer.start()
+    lease_token = _active_lease.set(renewer)
+    try:
+        yield True
+    finally:
+        _active_lease.reset(lease_token)
+        renewer.stop()
+        try:
+            lock.release(key, token)
+        except Exception as e:
+            logger.warning("Lock release failed", extra={"lock_key": key, "error": str(e)})
+
+
+def ensure_lease_held() -> None:
+    """
+    Check the lock of the running task (if any) is still held.
+
+    Raises:
+        LockLostError: If the lease expired or was taken over, i.e. another
+            worker may now run the same task
+    """
+    renewer = _active_lease.get()
+    if renewer is not None and not renewer.held:
+        raise LockLostError(f"Lock {renewer.key} was lost while the task ran")
+
+
+def record_lock_collision(task: str, action: str) -> None:
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is None:
+        return
+    metrics_registry.get_or_create_counter(
+        "task_lock_collisions_total",
+        "Total number of task runs that found the same run already in progress",
+        labelnames=["task", "action"],
+    ).labels(task=task, action=action).inc()
@@ -10,6 +10,14 @@ class BaseTaskContext:
     start_date: Optional[str] = None
     end_date: Optional[str] = None
     batch_size: Optional[int] = None
+    max_memory_usage: Optional[int] = None
+    max_threads: Optional[int] = None
+    max_execution_time: Optional[int] = None
+    priority: Optional[int] = None
+    shard_index: Optional[int] = None
+    shard_count: Optional[int] = None
+    from_watermark: Optional[int] = None
+    to_watermark: Optional[int] = None
 
 
 @dataclass
@@ -17,4 +25,5 @@ class BaseTaskResult:
     network: str
     status: str
     processing_date: Optional[str] = None
-    window_days: Optional[int] = None
\ No newline at end of file
+    window_days: Optional[int] = None
+    rows_processed: Optional[int] = None
@@ -0,0 +1,263 @@
+"""
+Offloading of large task results out of the Celery result backend.
+
+Results whose encoded size exceeds a limit are written to a blob store
+(local directory or ClickHouse table) and the result backend only keeps a
+small reference dict. The reference keeps ``network`` and ``status`` so
+monitoring and chained tasks can inspect it without fetching the blob;
+``resolve_result`` / ``LazyResult`` load the full result on demand.
+
+Results are encoded with Kombu's JSON codec, the one Celery's ``json``
+serializer uses, so dates, decimals, UUIDs and bytes come back with their
+type. Blobs expire like the result backend entries referencing them
+(``result_expires``, one day by default).
+"""
+
+import os
+import time
+import uuid
+import zlib
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import clickhouse_connect
+from kombu.utils import json as kombu_json
+from loguru import logger
+
+RESULT_REFERENCE_MARKER = "__chainswarm_result_ref__"
+
+DEFAULT_OFFLOAD_THRESHOLD = 256 * 1024
+
+# Matches the result_expires default of create_celery_app
+DEFAULT_BLOB_TTL_SECONDS = 86400
+
+# Result fields copied into the reference and served by LazyResult without loading the blob
+REFERENCE_FIELDS = ("network", "status", "processing_date", "window_days")
+
+
+class BlobStore(ABC):
+    """Key/value storage of encoded results."""
+
+    name: str = "blob"
+
+    @abstractmethod
+    def put(self, key: str, data: bytes) -> None:
+        pass
+
+    @abstractmethod
+    def get(self, key: str) -> bytes:
+        """Return the blob stored under ``key``; raise KeyError when it is missing."""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+
+class LocalBlobStore(BlobStore):
+    """
+    Blobs stored as files in a local (or shared) directory.
+
+    Blobs older than ``ttl_seconds`` are treated as missing and removed by
+    ``purge``, which ``put`` runs at most every ``purge_interval_seconds``;
+    set ``ttl_seconds`` to the app's ``result_expires``. None keeps blobs
+    until purged manually.
+    """
+
+    name = "local"
+
+    def __init__(self, directory: str | Path, ttl_seconds: Optional[float] = DEFAULT_BLOB_TTL_SECONDS,
+                 purge_interval_seconds: float = 3600.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._purged_at = float("-inf")
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key.replace('/', '-')}.blob"
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        tmp_path = self.directory / f".{path.name}.{uuid.uuid4().hex}.part"
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        if self.ttl_seconds is not None and time.monotonic() - self._purged_at >= self.purge_interval_seconds:
+            self._purged_at = time.monotonic()
+            self.purge(self.ttl_seconds)
+
+    def get(self, key: str) -> bytes:
+        path = self._path(key)
+        try:
+            if self.ttl_seconds is not None and path.stat().st_mtime < time.time() - self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                raise KeyError(key)
+            return path.read_bytes()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def purge(self, max_age_seconds: float) -> int:
+        """Delete blobs older than ``max_age_seconds``; returns the number removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in self.directory.glob("*.blob"):
+            try:
+                expired = path.stat().st_mtime < cutoff
+            except FileNotFoundError:
+                continue
+            if expired:
+                path.unlink(missing_ok=True)
+                removed += 1
+        return removed
+
+
+class ClickHouseBlobStore(BlobStore):
+    """Blobs stored in a ClickHouse table, expired by TTL."""
+
+    name = "clickhouse"
+
+    def __init__(self, client: clickhouse_connect.driver.Client, table: str = "task_result_blobs",
+                 ttl_days: int = 1):
+        self.client = client
+        self.table = table
+        self.ttl_days = ttl_days
+
+    def ensure_table(self) -> None:
+        self.client.command(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                key String,
+                data String CODEC(ZSTD(3)),
+                created_at DateTime DEFAULT now()
+            )
+            ENGINE = ReplacingMergeTree(created_at)
+            ORDER BY key
+            TTL created_at + INTERVAL {self.ttl_days} DAY
+        """)
+
+    def put(self, key: str, data: bytes) -> None:
+        self.client.insert(self.table, [[key, data]], column_names=["key", "data"])
+
+    def get(self, key: str) -> bytes:
+        result = self.client.query(
+            f"SELECT argMax(data, created_at) FROM {self.table} WHERE key = %(key)s HAVING count() > 0",
+            parameters={"key": key},
+            query_formats={"String": "bytes"},
+        )
+        if not result.result_rows:
+            raise KeyError(key)
+        return result.result_rows[0][0]
+
+    def delete(self, key: str) -> None:
+        self.client.command(
+            f"DELETE FROM {self.table} WHERE key = %(key)s",
+            parameters={"key": key},
+        )
+
+
+def is_result_reference(value: Any) -> bool:
+    return isinstance(value, dict) and RESULT_REFERENCE_MARKER in value
+
+
+def _encode(result: Any) -> bytes:
+    return kombu_json.dumps(result, separators=(",", ":")).encode("utf-8")
+
+
+class ResultOffloader:
+    """
+    Replace results larger than ``threshold_bytes`` by a blob store reference.
+
+    Example:
+        >>> offloader = ResultOffloader(LocalBlobStore("/data/task-results"))
+        >>> stored = offloader.offload(result, key=f"{task.name}/{task.request.id}")
+        >>> offloader.resolve(stored) == result
+        True
+    """
+
+    def __init__(self, store: BlobStore, threshold_bytes: int = DEFAULT_OFFLOAD_THRESHOLD):
+        self.store = store
+        self.threshold_bytes = threshold_bytes
+
+    def offload(self, result: Any, key: Optional[str] = None) -> Any:
+        """Return ``result`` unchanged when small, otherwise store it and return a reference."""
+        if is_result_reference(result):
+            return result
+        # One encoding (C encoder) serves as both size measurement and blob
+        try:
+            data = _encode(result)
+        except TypeError as e:
+            # Stringifying would not round-trip; leave such results to the result backend
+            logger.warning("Result cannot be offloaded, keeping it in the result backend", extra={"error": str(e)})
+            return result
+        size = len(data)
+        if size < self.threshold_bytes:
+            return result
+
+        key = key or uuid.uuid4().hex
+        self.store.put(key, zlib.compress(data, 3))
+        reference = {RESULT_REFERENCE_MARKER: 1, "store": self.store.name, "key": key, "size": size}
+        if isinstance(result, dict):
+            for field in REFERENCE_FIELDS:
+                if field in result:
+                    reference[field] = result[field]
+        return reference
+
+    def resolve(self, value: Any) -> Any:
+        """Return the full result of a reference; other values are returned as is."""
+        if not is_result_reference(value):
+            return value
+        return kombu_json.loads(zlib.decompress(self.store.get(value["key"])))
+
+    def lazy(self, value: Any) -> Any:
+        """Wrap a reference in a ``LazyResult``; other values are returned as is."""
+        if not is_result_reference(value):
+            return value
+        return LazyResult(value, self)
+
+
+class LazyResult(Mapping):
+    """
+    Read-only mapping loading an offloaded result on first access.
+
+    The summary fields copied into the reference (``REFERENCE_FIELDS``:
+    ``network``, ``status``, ...) are served without loading the blob; any
+    other key, including the reference's own ``key`` / ``size`` / ``store``,
+    is read from the full result.
+    """
+
+    def __init__(self, reference: Dict[str, Any], offloader: ResultOffloader):
+        self.reference = reference
+        self._offloader = offloader
+        self._result: Optional[Dict[str, Any]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._result is not None
+
+    def load(self) -> Dict[str, Any]:
+        if self._result is None:
+            self._result = self._offloader.resolve(self.reference)
+        return self._result
+
+    def __getitem__(self, key: str) -> Any:
+        if self._result is None and key in REFERENCE_FIELDS and key in self.reference:
+            return self.reference[key]
+        return self.load()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.load())
+
+    def __len__(self) -> int:
+        return len(self.load())
+
+
+def resolve_result(value: Any, store: BlobStore) -> Any:
+    """Resolve a result fetched from the result backend against ``store``."""
+    return ResultOffloader(store).resolve(value)
@@ -0,0 +1,176 @@
+"""
+Bounded parallel map for fan-out inside a task.
+
+``parallel_map`` replaces ad-hoc ``ThreadPoolExecutor`` code for work such
+as processing every network or many address chunks. Concurrency is capped
+by the ClickHouse HTTP connection pool so workers never wait on (or open
+past) the pool, at most ``max_workers`` items are in flight at a time, and
+the map stops early when ``terminate_event`` is set.
+
+Thread pool items run in a copy of the caller's context, so the query
+budget and ClickHouse workload bound to the task apply to their queries.
+Process pool items get the budget and workload passed along explicitly.
+"""
+
+import contextvars
+import os
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from chainswarm_core.db.budget import QueryBudget, get_query_budget, query_budget
+from chainswarm_core.db.concurrency import clickhouse_workload, get_clickhouse_workload
+from chainswarm_core.observability import get_default_metrics_registry, terminate_event
+
+EXECUTOR_THREAD = "thread"
+EXECUTOR_PROCESS = "process"
+
+# clickhouse-connect keeps at most 8 connections per host unless configured otherwise
+DEFAULT_CLICKHOUSE_POOL_SIZE = 8
+
+_POLL_INTERVAL = 0.1
+
+
+def clickhouse_pool_size() -> int:
+    """Return the ClickHouse connection pool size (``CLICKHOUSE_POOL_SIZE``, default 8)."""
+    return int(os.getenv("CLICKHOUSE_POOL_SIZE", DEFAULT_CLICKHOUSE_POOL_SIZE))
+
+
+def _timed_call(func: Callable[[Any], Any], item: Any) -> Tuple[Any, float]:
+    started = time.perf_counter()
+    result = func(item)
+    return result, time.perf_counter() - started
+
+
+def _timed_call_in_process(
+    func: Callable[[Any], Any],
+    item: Any,
+    budget: Optional[QueryBudget],
+    workload: Optional[str],
+) -> Tuple[Any, float]:
+    with query_budget(budget), clickhouse_workload(workload):
+        return _timed_call(func, item)
+
+
+def _submit(pool: Executor, executor: str, func: Callable[[Any], Any], item: Any) -> Future:
+    if executor == EXECUTOR_PROCESS:
+        return pool.submit(_timed_call_in_process, func, item, get_query_budget(), get_clickhouse_workload())
+    # One copy per item: a context cannot be entered by two threads at once
+    return pool.submit(contextvars.copy_context().run, _timed_call, func, item)
+
+
+def _resolve_max_workers(max_workers: Optional[int], executor: str, limit_to_clickhouse_pool: bool, items: int) -> int:
+    if max_workers is None:
+        max_workers = clickhouse_pool_size() if executor == EXECUTOR_THREAD else (os.cpu_count() or 1)
+    if max_workers < 1:
+        raise ValueError(f"max_workers must be at least 1, got {max_workers}")
+    if limit_to_clickhouse_pool:
+        max_workers = min(max_workers, clickhouse_pool_size())
+    return max(1, min(max_workers, items))
+
+
+def _create_executor(executor: str, max_workers: int) -> Executor:
+    if executor == EXECUTOR_THREAD:
+        return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="parallel_map")
+    if executor == EXECUTOR_PROCESS:
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor {executor!r}, expected {EXECUTOR_THREAD!r} or {EXECUTOR_PROCESS!r}")
+
+
+def _item_histogram():
+    metrics_registry = get_default_metrics_registry()
+    if metrics_registry is None:
+        return None
+    return metrics_registry.get_or_create_histogram(
+        "parallel_map_item_duration_seconds",
+        "Duration of a successfully processed parallel_map item",
+        labelnames=["name"],
+    )
+
+
+def parallel_map(
+    func: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: Optional[int] = None,
+    executor: str = EXECUTOR_THREAD,
+    ordered: bool = True,
+    limit_to_clickhouse_pool: bool = True,
+    cancel_event: Optional[threading.Event] = None,
+    name: str = "parallel_map",
+) -> List[Any]:
+    """
+    Apply ``func`` to every item with bounded concurrency.
+
+    Args:
+        func: Called once per item; must be picklable with ``executor="process"``
+        items: Items to process
+        max_workers: Concurrency; defaults to the ClickHouse pool size for
+            threads and the CPU count for processes
+        executor: ``"thread"`` for I/O bound work, ``"process"`` for CPU bound work
+        ordered: Return results in input order; otherwise in completion order
+        limit_to_clickhouse_pool: Cap ``max_workers`` at the ClickHouse pool size
+        cancel_event: Stops the map when set; defaults to ``terminate_event``
+        name: ``name`` label of the per-item duration metric
+
+    Returns:
+        One result per item
+
+    Raises:
+        CancelledError: If ``cancel_event`` was set before all items finished
+        Exception: The first exception raised by ``func``; remaining items are cancelled
+
+    Example:
+        >>> results = parallel_map(compute_network_features, networks, name="features")
+    """
+    items = list(items)
+    if not items:
+        return []
+    cancel_event = cancel_event if cancel_event is not None else terminate_event
+    max_workers = _resolve_max_workers(max_workers, executor, limit_to_clickhouse_pool, len(items))
+    histogram = _item_histogram()
+
+    results: Dict[int, Any] = {}
+    completion_order: List[int] = []
+    pending: Dict[Future, int] = {}
+    next_index = 0
+
+    with _create_executor(executor, max_workers) as pool:
+        try:
+            while next_index < len(items) or pending:
+                if cancel_event.is_set():
+                    raise CancelledError(f"{name} cancelled after {len(results)} of {len(items)} items")
+
+                while next_index < len(items) and len(pending) < max_workers:
+                    pending[_submit(pool, executor, func, items[next_index])] = next_index
+                    next_index += 1
+
+                done, _ = wait(pending, timeout=_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    result, duration = future.result()
+                    if histogram is not None:
+                        histogram.labels(name=name).observe(duration)
+                    results[index] = result
+                    completion_order.append(index)
+        except BaseException as e:
+            for future in pending:
+                future.cancel()
+            logger.warning(
+                "parallel_map stopped early",
+                extra={"name": name, "completed": len(results), "items": len(items), "error": str(e)}
+            )
+            raise
+
+    order = range(len(items)) if ordered else completion_order
+    return [results[index] for index in order]
@@ -0,0 +1,288 @@
+import contextvars
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+
+from chainswarm_core.observability import get_default_metrics_registry, terminate_event
+
+_END = object()
+
+
+@dataclass
+class StageStats:
+    blocks: int = 0
+    rows: int = 0
+    busy_seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        if self.busy_seconds <= 0:
+            return 0.0
+        return self.rows / self.busy_seconds
+
+
+@dataclass
+class PipelineStats:
+    source: StageStats = field(default_factory=StageStats)
+    transform: StageStats = field(default_factory=StageStats)
+    sink: StageStats = field(default_factory=StageStats)
+    duration: float = 0.0
+    cancelled: bool = False
+
+
+def _count_rows(block: Any) -> int:
+    try:
+        return len(block)
+    except TypeError:
+        return 1
+
+
+class _StopPipeline(Exception):
+    pass
+
+
+class BatchPipeline:
+    """
+    Read -> transform -> write pipeline running each stage on its own thread.
+
+    The source and transform stages run on worker threads connected to the
+    sink (the calling thread) by bounded queues, so the next block is fetched
+    while the current one is transformed and written. ``queue_size`` bounds
+    how many blocks are buffered between stages, which bounds memory.
+
+    Blocks are sequences of rows. With ``sink_buffer_rows`` set, transformed
+    rows are accumulated and the sink is called with at least that many rows
+    (the last call may be smaller).
+
+    Example:
+        >>> pipeline = BatchPipeline(
+        ...     source=repository.stream_transfers(start_date, end_date),
+        ...     transform=compute_features,
+        ...     sink=features_repository.insert_features,
+        ...     sink_buffer_rows=100_000,
+        ...     name="features",
+        ... )
+        >>> stats = pipeline.run()
+    """
+
+    def __init__(
+        self,
+        source: Iterable[Sequence[Any]],
+        transform: Callable[[Sequence[Any]], Sequence[Any]],
+        sink: Callable[[List[Any]], None],
+        queue_size: int = 2,
+        sink_buffer_rows: Optional[int] = None,
+        name: str = "pipeline",
+        cancel_event: Optional[threading.Event] = None,
+    ):
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+        self.source = source
+        self.transform = transform
+        self.sink = sink
+        self.queue_size = queue_size
+        self.sink_buffer_rows = sink_buffer_rows
+        self.name = name
+        self.cancel_event = cancel_event if cancel_event is not None else terminate_event
+        self.stats = PipelineStats()
+        self._stop = threading.Event()
+        self._errors: List[BaseException] = []
+        self._metrics = self._init_metrics()
+
+    def _init_metrics(self) -> Optional[Dict[str, Any]]:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is None:
+            return None
+        return {
+            "rows": metrics_registry.get_or_create_counter(
+                "pipeline_stage_rows_total",
+                "Total number of rows processed by a pipeline stage",
+                labelnames=["pipeline", "stage"],
+            ),
+            "busy": metrics_registry.get_or_create_counter(
+                "pipeline_stage_busy_seconds_total",
+                "Total time a pipeline stage spent working",
+                labelnames=["pipeline", "stage"],
+            ),
+            "depth": metrics_registry.get_or_create_gauge(
+                "pipeline_queue_depth",
+                "Number of blocks waiting in a pipeline queue",
+                labelnames=["pipeline", "queue"],
+            ),
+        }
+
+    def _record(self, stage: str, stats: StageStats, rows: int, seconds: float) -> None:
+        stats.blocks += 1
+        stats.rows += rows
+        stats.busy_seconds += seconds
+        if self._metrics is not None:
+            self._metrics["rows"].labels(pipeline=self.name, stage=stage).inc(rows)
+            self._metrics["busy"].labels(pipeline=self.name, stage=stage).inc(seconds)
+
+    def _record_depth(self, name: str, q: queue.Queue) -> None:
+        if self._metrics is not None:
+            self._metrics["depth"].labels(pipeline=self.name, queue=name).set(q.qsize())
+
+    def _should_stop(self) -> bool:
+        return self._stop.is_set() or self.cancel_event.is_set()
+
+    def _put(self, name: str, q: queue.Queue, item: Any) -> None:
+        while True:
+            if self._stop.is_set():
+                raise _StopPipeline()
+            try:
+                q.put(item, timeout=0.1)
+                self._record_depth(name, q)
+                return
+            except queue.Full:
+                continue
+
+    def _get(self, name: str, q: queue.Queue) -> Any:
+        while True:
+            if self._stop.is_set():
+                raise _StopPipeline()
+            try:
+                item = q.get(timeout=0.1)
+                self._record_depth(name, q)
+                return item
+            except queue.Empty:
+                continue
+
+    def _fail(self, error: BaseException) -> None:
+        self._errors.append(error)
+        self._stop.set()
+
+    def _run_source(self, out_q: queue.Queue) -> None:
+        iterator = None
+        try:
+            iterator = iter(self.source)
+            while not self._should_stop():
+                started = time.perf_counter()
+                try:
+                    block = next(iterator)
+                except StopIteration:
+                    break
+                self._record("source", self.stats.source, _count_rows(block), time.perf_counter() - started)
+                self._put("source", out_q, block)
+            if self.cancel_event.is_set():
+                self.stats.cancelled = True
+            self._put("source", out_q, _END)
+        except _StopPipeline:
+            pass
+        except BaseException as e:
+            self._fail(e)
+        finally:
+            self._close_source(iterator)
+
+    def _close_source(self, iterator: Any) -> None:
+        # Closing a generator such as BaseRepository._stream ends its query
+        # (and releases the HTTP stream) instead of leaving that to the GC
+        close = getattr(iterator, "close", None)
+        if close is None:
+            return
+        try:
+            close()
+        except BaseException as e:
+            self._fail(e)
+
+    def _run_transform(self, in_q: queue.Queue, out_q: queue.Queue) -> None:
+        try:
+            while True:
+                block = self._get("source", in_q)
+                if block is _END:
+                    self._put("transform", out_q, _END)
+                    return
+                started = time.perf_counter()
+                transformed = self.transform(block)
+                self._record("transform", self.stats.transform, _count_rows(transformed), time.perf_counter() - started)
+                self._put("transform", out_q, transformed)
+        except _StopPipeline:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def _write(self, rows: List[Any]) -> None:
+        started = time.perf_counter()
+        self.sink(rows)
+        self._record("sink", self.stats.sink, len(rows), time.perf_counter() - started)
+
+    def _run_sink(self, in_q: queue.Queue) -> None:
+        buffer: List[Any] = []
+        try:
+            while True:
+                block = self._get("transform", in_q)
+                if block is _END:
+                    break
+                if self.sink_buffer_rows is None:
+                    self._write(list(block))
+                    continue
+                buffer.extend(block)
+                if len(buffer) >= self.sink_buffer_rows:
+                    self._write(buffer)
+                    buffer = []
+            if buffer:
+                self._write(buffer)
+        except _StopPipeline:
+            pass
+        except BaseException as e:
+            self._fail(e)
+
+    def run(self) -> PipelineStats:
+        """
+        Run the pipeline to completion.
+
+        Returns:
+            Per-stage statistics; ``cancelled`` is set when the run stopped
+            early because ``cancel_event`` was set
+
+        Raises:
+            The first exception raised by any stage
+        """
+        source_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        transform_q: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        # Stage threads run in copies of the caller's context so the query
+        # budget and ClickHouse workload bound to the task apply to them
+        threads = [
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._run_source, source_q),
+                name=f"{self.name}-source",
+                daemon=True,
+            ),
+            threading.Thread(
+                target=contextvars.copy_context().run,
+                args=(self._run_transform, source_q, transform_q),
+                name=f"{self.name}-transform",
+                daemon=True,
+            ),
+        ]
+
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            self._run_sink(transform_q)
+        finally:
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+            self.stats.duration = time.perf_counter() - started
+
+        if self._errors:
+            raise self._errors[0]
+
+        logger.info(
+            "Pipeline finished",
+            extra={
+                "pipeline": self.name,
+                "duration": self.stats.duration,
+                "source_rows": self.stats.source.rows,
+                "sink_rows": self.stats.sink.rows,
+                "cancelled": self.stats.cancelled,
+            }
+        )
+        return self.stats
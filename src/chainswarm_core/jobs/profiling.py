@@ -0,0 +1,201 @@
+"""
+Opt-in profiling of task executions.
+
+Profiling is enabled per process with environment variables or per task
+with the ``chainswarm_profile`` message header:
+
+    CHAINSWARM_PROFILE=cprofile|sampler   profiler to use (unset: disabled)
+    CHAINSWARM_PROFILE_RATE=0.01          fraction of executions to profile
+    CHAINSWARM_PROFILE_DIR=/tmp/profiles  output directory
+    CHAINSWARM_PROFILE_INTERVAL=0.005     sampler interval in seconds
+
+``cprofile`` writes a ``.pstats`` file (``python -m pstats``, snakeviz);
+``sampler`` is a low-overhead wall-clock stack sampler writing collapsed
+stacks (``.collapsed``) that ``flamegraph.pl`` or speedscope render
+directly. Files are named after the task and the correlation id.
+"""
+
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from loguru import logger
+
+from chainswarm_core.observability import get_correlation_id
+
+PROFILE_HEADER = "chainswarm_profile"
+
+PROFILER_CPROFILE = "cprofile"
+PROFILER_SAMPLER = "sampler"
+PROFILERS = (PROFILER_CPROFILE, PROFILER_SAMPLER)
+
+DEFAULT_PROFILE_DIR = "/tmp/chainswarm-profiles"
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except ValueError:
+        logger.warning("Invalid profiling setting, using the default", extra={"variable": name, "value": value})
+        return default
+
+
+@dataclass(frozen=True)
+class ProfilingConfig:
+    mode: Optional[str] = None
+    sample_rate: float = 1.0
+    directory: str = DEFAULT_PROFILE_DIR
+    interval: float = 0.005
+
+    @classmethod
+    def from_env(cls) -> "ProfilingConfig":
+        mode = os.getenv("CHAINSWARM_PROFILE") or None
+        if mode is not None and mode not in PROFILERS:
+            logger.warning("Unknown profiler, profiling disabled", extra={"profiler": mode})
+            mode = None
+        return cls(
+            mode=mode,
+            sample_rate=_env_float("CHAINSWARM_PROFILE_RATE", 1.0),
+            directory=os.getenv("CHAINSWARM_PROFILE_DIR", DEFAULT_PROFILE_DIR),
+            interval=_env_float("CHAINSWARM_PROFILE_INTERVAL", 0.005),
+        )
+
+    def select(self, header: Any = None) -> Optional[str]:
+        """
+        Return the profiler for one execution, or None to run unprofiled.
+
+        A truthy header forces profiling (its value may name the profiler);
+        otherwise the configured profiler runs for ``sample_rate`` of the
+        executions.
+        """
+        if header:
+            return header if header in PROFILERS else (self.mode or PROFILER_SAMPLER)
+        if self.mode is None or self.sample_rate <= 0:
+            return None
+        if self.sample_rate >= 1 or random.random() < self.sample_rate:
+            return self.mode
+        return None
+
+
+class StackSampler(threading.Thread):
+    """
+    Sample the stack of one thread at a fixed interval.
+
+    Stacks are aggregated in collapsed format (``frame;frame;frame count``),
+    root first, one line per distinct stack.
+    """
+
+    def __init__(self, thread_id: Optional[int] = None, interval: float = 0.005):
+        super().__init__(name="stack-sampler", daemon=True)
+        self.target_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.target_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self.is_alive():
+            self.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def profile_path(directory: str | Path, task_name: str, extension: str) -> Path:
+    correlation_id = get_correlation_id() or "none"
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]", "_", task_name)
+    return Path(directory) / f"{safe_name}-{correlation_id}-{int(time.time() * 1000)}.{extension}"
+
+
+@contextmanager
+def profile(mode: Optional[str], task_name: str, directory: str | Path = DEFAULT_PROFILE_DIR,
+            interval: float = 0.005) -> Iterator[Optional[Path]]:
+    """
+    Profile the enclosed block with ``mode`` and write the profile file.
+
+    When cProfile cannot be enabled because another profiler is active in
+    the process, the block is profiled with the sampler instead. Profiling
+    problems (an unwritable directory, a failed write) are logged and never
+    fail the block.
+
+    Yields:
+        Path the profile will be written to, or None when ``mode`` is None
+        or the directory cannot be created
+    """
+    if mode is None:
+        yield None
+        return
+    if mode not in PROFILERS:
+        raise ValueError(f"Unknown profiler: {mode}. Available: {', '.join(PROFILERS)}")
+
+    try:
+        Path(directory).mkdir(parents=True, exist_ok=True)
+    except OSError as e:
+        logger.warning(
+            "Profile directory not writable, running unprofiled",
+            extra={"task": task_name, "directory": str(directory), "error": str(e)}
+        )
+        yield None
+        return
+
+    profiler = None
+    if mode == PROFILER_CPROFILE:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one cProfile per process (sys.monitoring), so a
+            # concurrent task on another thread or coroutine is sampled instead
+            logger.warning(
+                "cProfile already active in this process, using the sampling profiler",
+                extra={"task": task_name, "error": str(e)}
+            )
+            profiler = None
+            mode = PROFILER_SAMPLER
+
+    sampler = None
+    if profiler is None:
+        sampler = StackSampler(interval=interval)
+        sampler.start()
+
+    path = profile_path(directory, task_name, "pstats" if profiler is not None else "collapsed")
+    try:
+        yield path
+    finally:
+        try:
+            if profiler is not None:
+                profiler.disable()
+                profiler.dump_stats(str(path))
+            else:
+                sampler.stop()
+                path.write_text(sampler.collapsed())
+        except OSError as e:
+            logger.warning("Task profile could not be written", extra={"task": task_name, "path": str(path), "error": str(e)})
+        else:
+            logger.info("Task profile written", extra={"task": task_name, "profiler": mode, "path": str(path)})
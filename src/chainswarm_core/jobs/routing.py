@@ -0,0 +1,155 @@
+"""
+Per-network queue lanes.
+
+Each network (or network type) gets its own queue so a slow backfill on one
+network cannot block latency-sensitive tasks on another; worker pools are
+then sized per lane with ``celery worker -Q <queue>``. Tasks are routed by
+the ``network`` of their context and carry the lane in the
+``chainswarm_lane`` message header.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+from celery.signals import before_task_publish
+from kombu import Queue
+
+from chainswarm_core.constants.networks import Network
+from chainswarm_core.constants.networks import networks as supported_networks
+
+LANE_HEADER = "chainswarm_lane"
+
+LANES_BY_NETWORK = "network"
+LANES_BY_NETWORK_TYPE = "network_type"
+LANE_STRATEGIES = (LANES_BY_NETWORK, LANES_BY_NETWORK_TYPE)
+
+DEFAULT_QUEUE = "default"
+
+# Redis transport semantics: 0 is the highest priority
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 9
+PRIORITY_STEPS = list(range(PRIORITY_LOW + 1))
+
+# queue name -> lane, filled by configure_network_lanes
+_lane_queues: Dict[str, str] = {}
+
+
+def lane_for_network(network: str, strategy: str = LANES_BY_NETWORK) -> Optional[str]:
+    """Return the lane of a network, or None when it has no lane."""
+    if strategy not in LANE_STRATEGIES:
+        raise ValueError(f"Unknown lane strategy: {strategy}. Available: {', '.join(LANE_STRATEGIES)}")
+    network = network.lower()
+    if strategy == LANES_BY_NETWORK:
+        return network if network in supported_networks else None
+    try:
+        return Network.get_node_type(network)
+    except ValueError:
+        return None
+
+
+def lane_queue_name(lane: str, prefix: str = "") -> str:
+    return f"{prefix}{lane}"
+
+
+def network_lanes(strategy: str = LANES_BY_NETWORK, networks: Optional[Iterable[str]] = None) -> List[str]:
+    """Return the lanes of ``networks``, defaulting to all supported networks."""
+    result = []
+    for network in networks if networks is not None else supported_networks:
+        lane = lane_for_network(network, strategy)
+        if lane is not None and lane not in result:
+            result.append(lane)
+    return result
+
+
+def _context_network(args: Any, kwargs: Optional[Dict[str, Any]]) -> Optional[str]:
+    kwargs = kwargs or {}
+    context = kwargs.get("context")
+    if context is None and args:
+        context = args[0]
+    if isinstance(context, dict):
+        return context.get("network")
+    if context is not None and hasattr(context, "network"):
+        return context.network
+    return kwargs.get("network")
+
+
+class NetworkRouter:
+    """
+    Celery router sending a task to the queue of its context's network.
+
+    Tasks without a network (or with a network outside the configured
+    lanes) fall through to the default queue.
+    """
+
+    def __init__(self, strategy: str = LANES_BY_NETWORK, queue_prefix: str = "",
+                 networks: Optional[Iterable[str]] = None):
+        self.strategy = strategy
+        self.queue_prefix = queue_prefix
+        self.lanes = set(network_lanes(strategy, networks))
+
+    def __call__(self, name: str, args: Any, kwargs: Optional[Dict[str, Any]], options: Dict[str, Any],
+                 task: Any = None, **kw: Any) -> Optional[Dict[str, Any]]:
+        if options.get("queue"):
+            return None
+        network = _context_network(args, kwargs)
+        if not isinstance(network, str):
+            return None
+        lane = lane_for_network(network, self.strategy)
+        if lane not in self.lanes:
+            return None
+        queue = lane_queue_name(lane, self.queue_prefix)
+        return {"queue": queue, "routing_key": queue}
+
+
+def build_lane_queues(lanes: Iterable[str], queue_prefix: str = "", default_queue: str = DEFAULT_QUEUE) -> List[Queue]:
+    queues = [Queue(default_queue, routing_key=default_queue)]
+    for lane in lanes:
+        name = lane_queue_name(lane, queue_prefix)
+        queues.append(Queue(name, routing_key=name, queue_arguments={"x-max-priority": PRIORITY_LOW}))
+    return queues
+
+
+def configure_network_lanes(
+    strategy: str = LANES_BY_NETWORK,
+    queue_prefix: str = "",
+    networks: Optional[Iterable[str]] = None,
+    default_queue: str = DEFAULT_QUEUE,
+) -> Dict[str, Any]:
+    """
+    Build the Celery config for per-network lanes with priority levels.
+
+    Args:
+        strategy: One lane per network (``network``) or per ``NetworkType``
+            (``network_type``)
+        queue_prefix: Prefix of the lane queue names
+        networks: Networks to create lanes for, defaults to all supported networks
+        default_queue: Queue of tasks without a lane
+
+    Returns:
+        Celery config with ``task_queues``, ``task_routes`` and priority settings
+    """
+    lane_names = network_lanes(strategy, networks)
+    for lane in lane_names:
+        _lane_queues[lane_queue_name(lane, queue_prefix)] = lane
+    before_task_publish.connect(_stamp_lane_header, weak=False, dispatch_uid="chainswarm_lane_header")
+
+    return {
+        "task_queues": build_lane_queues(lane_names, queue_prefix, default_queue),
+        "task_routes": (NetworkRouter(strategy, queue_prefix, networks),),
+        "task_default_queue": default_queue,
+        "task_default_priority": PRIORITY_NORMAL,
+        "task_queue_max_priority": PRIORITY_LOW,
+        # queue_order_strategy stays round robin: "priority" would drain the
+        # lanes of a multi-lane worker in order and starve the later ones
+        "broker_transport_options": {
+            "priority_steps": PRIORITY_STEPS,
+            "sep": ":",
+        },
+    }
+
+
+def _stamp_lane_header(sender: Any = None, headers: Optional[Dict[str, Any]] = None,
+                       routing_key: Optional[str] = None, **kwargs: Any) -> None:
+    if headers is None or routing_key not in _lane_queues:
+        return
+    headers.setdefault(LANE_HEADER, _lane_queues[routing_key])
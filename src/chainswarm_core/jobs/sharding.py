@@ -0,0 +1,62 @@
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, List, Optional
+
+from celery import Task, group
+from celery.result import GroupResult
+
+from chainswarm_core.db.sharding import SHARD_STRATEGY_JUMP, ShardSpec
+
+
+def _context_dict(context: Any) -> Dict[str, Any]:
+    if is_dataclass(context):
+        return asdict(context)
+    return dict(context)
+
+
+def shard_contexts(context: Any, shard_count: int) -> List[Dict[str, Any]]:
+    """
+    Split a task context into one context per shard.
+
+    Args:
+        context: ``BaseTaskContext`` or context dict
+        shard_count: Number of shards
+
+    Returns:
+        Context dicts with ``shard_index`` / ``shard_count`` set
+    """
+    if shard_count <= 0:
+        raise ValueError(f"Shard count must be positive, got {shard_count}")
+    base = _context_dict(context)
+    return [
+        {**base, "shard_index": index, "shard_count": shard_count}
+        for index in range(shard_count)
+    ]
+
+
+def fan_out_shards(task: Task, context: Any, shard_count: int, **options: Any) -> GroupResult:
+    """
+    Dispatch ``task`` once per shard as a Celery group.
+
+    Each shard task receives the original context with ``shard_index`` and
+    ``shard_count`` set and can build its repositories with
+    ``partition_id=ctx.shard_index, shard_count=ctx.shard_count``.
+
+    Args:
+        task: Registered task to run per shard
+        context: ``BaseTaskContext`` or context dict
+        shard_count: Number of shards
+        **options: Passed to ``apply_async`` (e.g. ``queue``)
+
+    Returns:
+        GroupResult of the shard tasks
+    """
+    return group(task.s(ctx) for ctx in shard_contexts(context, shard_count)).apply_async(**options)
+
+
+def get_context_shard(context: Any, strategy: str = SHARD_STRATEGY_JUMP) -> Optional[ShardSpec]:
+    """Return the shard of a context, or None when it is not sharded."""
+    data = context if isinstance(context, dict) else _context_dict(context)
+    shard_count = data.get("shard_count")
+    if shard_count is None:
+        return None
+    return ShardSpec(data.get("shard_index") or 0, shard_count, strategy)
@@ -0,0 +1,146 @@
+"""
+Worker warm-up run in each fresh worker child.
+
+The first task in a new child otherwise pays for module imports, client
+creation, the first connection to ClickHouse and the schema metadata load.
+``WorkerWarmup`` runs these steps on ``worker_process_init`` instead, i.e.
+before the child accepts work, and records how long each step took.
+
+The prefork parent kills a child that has not finished
+``worker_process_init`` within ``worker_proc_alive_timeout`` (4s by
+default) and starts a new one, so a slow warm-up would restart children
+in a loop. ``create_celery_app`` raises that timeout to cover the
+warm-up's ``time_budget_seconds``, and steps left when the budget runs out
+are skipped.
+"""
+
+import importlib
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from celery.signals import worker_process_init
+from loguru import logger
+
+from chainswarm_core.db.client_factory import ClientFactory
+from chainswarm_core.db.connection import get_connection_params
+from chainswarm_core.db.metadata import schema_cache
+from chainswarm_core.observability import get_default_metrics_registry
+
+_active_warmup: Optional["WorkerWarmup"] = None
+
+# Time left for the child itself on top of the warm-up budget (Celery's default alive timeout)
+ALIVE_TIMEOUT_MARGIN_SECONDS = 4.0
+
+
+class WorkerWarmup:
+    """
+    Declarative warm-up of a worker child.
+
+    Steps run in order: imports, ClickHouse connections (one per network,
+    priming the HTTP connection pool and optionally the schema metadata
+    cache), then custom callbacks. A failing step is logged and skipped so
+    a warm-up problem never prevents the child from starting; once
+    ``time_budget_seconds`` is used up the remaining steps are skipped too.
+
+    Example:
+        >>> warmup = WorkerWarmup(
+        ...     imports=["packages.jobs.tasks"],
+        ...     networks=["torus", "bitcoin"],
+        ...     database_prefix="analytics",
+        ...     callbacks=[load_label_cache],
+        ... )
+        >>> app = create_celery_app("analytics", ["packages.jobs"], warmup=warmup)
+    """
+
+    def __init__(
+        self,
+        imports: Iterable[str] = (),
+        networks: Iterable[str] = (),
+        database_prefix: Optional[str] = None,
+        load_schema: bool = True,
+        callbacks: Sequence[Callable[[], Any]] = (),
+        time_budget_seconds: float = 30.0,
+    ):
+        self.imports = list(imports)
+        self.networks = list(networks)
+        self.database_prefix = database_prefix
+        self.load_schema = load_schema
+        self.callbacks = list(callbacks)
+        self.time_budget_seconds = time_budget_seconds
+        self.durations: Dict[str, float] = {}
+
+    def _connect(self, network: str) -> None:
+        params = get_connection_params(network, self.database_prefix)
+        with ClientFactory(params).client_context() as client:
+            client.query("SELECT 1")
+            if self.load_schema:
+                schema_cache.load(client, params["database"])
+
+    def steps(self) -> List[Tuple[str, Callable[[], Any]]]:
+        steps: List[Tuple[str, Callable[[], Any]]] = []
+        for module in self.imports:
+            steps.append((f"import:{module}", lambda module=module: importlib.import_module(module)))
+        for network in self.networks:
+            steps.append((f"clickhouse:{network}", lambda network=network: self._connect(network)))
+        for callback in self.callbacks:
+            steps.append((f"callback:{getattr(callback, '__name__', repr(callback))}", callback))
+        return steps
+
+    def run(self) -> Dict[str, float]:
+        """
+        Run all warm-up steps.
+
+        Returns:
+            Duration in seconds per step, plus ``total``
+        """
+        self.durations = {}
+        started = time.perf_counter()
+        for name, step in self.steps():
+            if time.perf_counter() - started > self.time_budget_seconds:
+                logger.warning(
+                    "Worker warm-up budget exhausted, skipping step",
+                    extra={"step": name, "budget": self.time_budget_seconds}
+                )
+                continue
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning("Worker warm-up step failed", extra={"step": name, "error": str(e)})
+            self.durations[name] = time.perf_counter() - step_started
+        self.durations["total"] = time.perf_counter() - started
+
+        self._record()
+        logger.info(
+            "Worker warm-up finished",
+            extra={"duration": self.durations["total"], "steps": len(self.durations) - 1}
+        )
+        return self.durations
+
+    def _record(self) -> None:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is None:
+            return
+        histogram = metrics_registry.get_or_create_histogram(
+            "worker_warmup_duration_seconds",
+            "Duration of worker child warm-up steps",
+            labelnames=["step"],
+        )
+        for name, duration in self.durations.items():
+            histogram.labels(step=name).observe(duration)
+
+    def celery_config(self) -> Dict[str, Any]:
+        # Keep the parent from killing children that are still warming up
+        return {"worker_proc_alive_timeout": self.time_budget_seconds + ALIVE_TIMEOUT_MARGIN_SECONDS}
+
+    def install(self) -> "WorkerWarmup":
+        """Run the warm-up in every worker child on ``worker_process_init``."""
+        global _active_warmup
+        _active_warmup = self
+        worker_process_init.connect(_on_process_init, weak=False, dispatch_uid="chainswarm_worker_warmup")
+        return self
+
+
+def _on_process_init(**kwargs: Any) -> None:
+    if _active_warmup is not None:
+        _active_warmup.run()
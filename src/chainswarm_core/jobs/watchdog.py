@@ -0,0 +1,148 @@
+"""
+Memory watchdog for prefork worker children.
+
+Children keep growing from fragmentation and cached data until the kernel
+OOM-kills them mid-task. The watchdog samples RSS after every task and:
+
+- above the soft limit, lets the child finish its task and be replaced
+  (Celery's ``worker_max_memory_per_child``, checked between tasks);
+- above the hard limit, refuses new work: ``BaseTask.run`` rejects the
+  task with requeue, so another child picks it up, and the child is
+  replaced right after (a child above the hard limit is also above
+  ``worker_max_memory_per_child``, which falls back to the hard limit when
+  no soft limit is set).
+
+With ``worker_prefetch_multiplier=1`` a child holds at most one reserved
+message, so a rejection requeues a single task.
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from celery.exceptions import Reject
+from celery.signals import task_postrun
+from loguru import logger
+
+from chainswarm_core.observability import get_default_metrics_registry
+from chainswarm_core.observability.memory import get_rss_bytes
+
+_active_watchdog: Optional["MemoryWatchdog"] = None
+
+
+def _env_limit_bytes(name: str) -> Optional[int]:
+    value = os.getenv(name)
+    if not value:
+        return None
+    return int(float(value) * 1024 * 1024)
+
+
+class MemoryWatchdog:
+    """
+    Soft/hard RSS limits for worker children.
+
+    Example:
+        >>> watchdog = MemoryWatchdog(soft_limit_bytes=3 * 1024 ** 3)
+        >>> app = create_celery_app("analytics", ["tasks"], memory_watchdog=watchdog)
+    """
+
+    def __init__(self, soft_limit_bytes: Optional[int] = None, hard_limit_bytes: Optional[int] = None):
+        if soft_limit_bytes is not None and hard_limit_bytes is None:
+            hard_limit_bytes = int(soft_limit_bytes * 1.25)
+        if soft_limit_bytes is not None and hard_limit_bytes is not None and hard_limit_bytes < soft_limit_bytes:
+            raise ValueError(f"Hard limit {hard_limit_bytes} is below soft limit {soft_limit_bytes}")
+        self.soft_limit_bytes = soft_limit_bytes
+        self.hard_limit_bytes = hard_limit_bytes
+        self.last_rss_bytes: Optional[int] = None
+
+    @classmethod
+    def from_env(cls) -> Optional["MemoryWatchdog"]:
+        """
+        Build a watchdog from ``WORKER_MEMORY_SOFT_LIMIT_MB`` / ``WORKER_MEMORY_HARD_LIMIT_MB``.
+
+        Returns None when neither is set.
+        """
+        soft = _env_limit_bytes("WORKER_MEMORY_SOFT_LIMIT_MB")
+        hard = _env_limit_bytes("WORKER_MEMORY_HARD_LIMIT_MB")
+        if soft is None and hard is None:
+            return None
+        return cls(soft, hard)
+
+    @property
+    def recycle_limit_bytes(self) -> Optional[int]:
+        """RSS above which the child is replaced: the soft limit, else the hard limit."""
+        return self.soft_limit_bytes if self.soft_limit_bytes is not None else self.hard_limit_bytes
+
+    def celery_config(self) -> Dict[str, Any]:
+        if self.recycle_limit_bytes is None:
+            return {}
+        # Celery expects KiB
+        return {"worker_max_memory_per_child": max(1, self.recycle_limit_bytes // 1024)}
+
+    def sample(self) -> int:
+        rss = get_rss_bytes()
+        self.last_rss_bytes = rss
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is not None:
+            metrics_registry.get_or_create_gauge(
+                "worker_child_rss_bytes",
+                "Resident set size of a worker child, sampled after each task",
+                labelnames=["pid"],
+            ).labels(pid=str(os.getpid())).set(rss)
+        return rss
+
+    def over_soft_limit(self, rss: Optional[int] = None) -> bool:
+        if self.soft_limit_bytes is None:
+            return False
+        return (rss if rss is not None else get_rss_bytes()) > self.soft_limit_bytes
+
+    def over_hard_limit(self, rss: Optional[int] = None) -> bool:
+        if self.hard_limit_bytes is None:
+            return False
+        return (rss if rss is not None else get_rss_bytes()) > self.hard_limit_bytes
+
+    def check_admission(self, task_name: str) -> None:
+        """
+        Refuse a new task when the child is above the hard limit.
+
+        Raises:
+            Reject: With ``requeue=True`` so another child runs the task
+        """
+        rss = get_rss_bytes()
+        if not self.over_hard_limit(rss):
+            return
+        self._count("worker_memory_rejections_total", "Total number of tasks rejected above the hard memory limit")
+        logger.warning(
+            "Worker child above hard memory limit, rejecting task",
+            extra={"task": task_name, "rss_bytes": rss, "hard_limit_bytes": self.hard_limit_bytes}
+        )
+        raise Reject(f"Worker child RSS {rss} above hard limit {self.hard_limit_bytes}", requeue=True)
+
+    def after_task(self, **kwargs: Any) -> None:
+        rss = self.sample()
+        if self.recycle_limit_bytes is not None and rss > self.recycle_limit_bytes:
+            self._count("worker_memory_recycles_total", "Total number of worker children recycled above the memory limit")
+            logger.info(
+                "Worker child above memory limit, recycling",
+                extra={"rss_bytes": rss, "limit_bytes": self.recycle_limit_bytes}
+            )
+
+    def _count(self, name: str, description: str) -> None:
+        metrics_registry = get_default_metrics_registry()
+        if metrics_registry is not None:
+            metrics_registry.get_or_create_counter(name, description).inc()
+
+    def install(self) -> "MemoryWatchdog":
+        """Activate the watchdog for ``BaseTask`` and sample RSS after every task."""
+        global _active_watchdog
+        _active_watchdog = self
+        task_postrun.connect(_after_task, weak=False, dispatch_uid="chainswarm_memory_watchdog")
+        return self
+
+
+def get_memory_watchdog() -> Optional[MemoryWatchdog]:
+    return _active_watchdog
+
+
+def _after_task(**kwargs: Any) -> None:
+    if _active_watchdog is not None:
+        _active_watchdog.after_task(**kwargs)
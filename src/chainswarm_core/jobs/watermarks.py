@@ -0,0 +1,123 @@
+"""
+Incremental processing watermarks.
+
+A watermark is the last block height (or timestamp) a task has fully
+processed for a network. Periodic tasks read it as the lower bound of their
+next run and only process the delta ``(from_watermark, to_watermark]``
+instead of recomputing their whole window.
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Optional, Tuple
+
+import clickhouse_connect
+
+
+class WatermarkStore(ABC):
+    """Storage of per (task, network) watermarks."""
+
+    @abstractmethod
+    def get(self, task: str, network: str) -> Optional[int]:
+        """Return the watermark, or None when nothing was processed yet."""
+
+    @abstractmethod
+    def set(self, task: str, network: str, value: int) -> None:
+        """Record ``value`` as the last processed position."""
+
+    @abstractmethod
+    def reset(self, task: str, network: str, value: Optional[int] = None) -> None:
+        """
+        Reset the watermark for reprocessing.
+
+        With ``value=None`` the next run processes its full window; otherwise
+        processing restarts after ``value``.
+        """
+
+
+class InMemoryWatermarkStore(WatermarkStore):
+    """Process-local store for tests and local runs."""
+
+    def __init__(self):
+        self._values: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, task: str, network: str) -> Optional[int]:
+        with self._lock:
+            return self._values.get((task, network))
+
+    def set(self, task: str, network: str, value: int) -> None:
+        with self._lock:
+            self._values[(task, network)] = value
+
+    def reset(self, task: str, network: str, value: Optional[int] = None) -> None:
+        with self._lock:
+            if value is None:
+                self._values.pop((task, network), None)
+            else:
+                self._values[(task, network)] = value
+
+
+class ClickHouseWatermarkStore(WatermarkStore):
+    """
+    Watermarks kept in a ClickHouse ``ReplacingMergeTree`` table.
+
+    Every update is an insert with a newer ``version``; reads take the value
+    of the latest version with ``argMax`` so they are correct before merges.
+
+    Example:
+        >>> store = ClickHouseWatermarkStore(client)
+        >>> store.ensure_table()
+        >>> store.set("build_features", "torus", 4_200_000)
+    """
+
+    def __init__(self, client: clickhouse_connect.driver.Client, table: str = "task_watermarks"):
+        self.client = client
+        self.table = table
+
+    def ensure_table(self) -> None:
+        self.client.command(f"""
+            CREATE TABLE IF NOT EXISTS {self.table} (
+                task String,
+                network String,
+                value Int64,
+                is_reset UInt8,
+                version UInt64,
+                updated_at DateTime64(3) DEFAULT now64(3)
+            )
+            ENGINE = ReplacingMergeTree(version)
+            ORDER BY (task, network)
+        """)
+
+    def _write(self, task: str, network: str, value: int, is_reset: int) -> None:
+        self.client.insert(
+            self.table,
+            [[task, network, value, is_reset, time.time_ns() // 1000]],
+            column_names=["task", "network", "value", "is_reset", "version"],
+        )
+
+    def get(self, task: str, network: str) -> Optional[int]:
+        result = self.client.query(
+            f"""
+            SELECT argMax(value, version), argMax(is_reset, version), count()
+            FROM {self.table}
+            WHERE task = %(task)s AND network = %(network)s
+            """,
+            parameters={"task": task, "network": network},
+        )
+        if not result.result_rows:
+            return None
+        value, is_reset, rows = result.result_rows[0]
+        if not rows or is_reset:
+            return None
+        return int(value)
+
+    def set(self, task: str, network: str, value: int) -> None:
+        self._write(task, network, value, 0)
+
+    def reset(self, task: str, network: str, value: Optional[int] = None) -> None:
+        if value is None:
+            self._write(task, network, 0, 1)
+        else:
+            self._write(task, network, value, 0)
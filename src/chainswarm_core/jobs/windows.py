@@ -0,0 +1,109 @@
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from celery import chord, current_app, shared_task
+
+WINDOW_PART_HEADER = "chainswarm_window_part"
+
+WINDOW_ALIGN_DAY = "day"
+WINDOW_ALIGN_MONTH = "month"
+WINDOW_ALIGNMENTS = (WINDOW_ALIGN_DAY, WINDOW_ALIGN_MONTH)
+
+DateWindow = Tuple[date, date]
+
+
+def _parse_date(value: str | date) -> date:
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value[:10])
+
+
+def _next_month(day: date) -> date:
+    if day.month == 12:
+        return date(day.year + 1, 1, 1)
+    return date(day.year, day.month + 1, 1)
+
+
+def split_date_range(
+    start: str | date,
+    end: str | date,
+    max_days: int,
+    align: str = WINDOW_ALIGN_MONTH,
+) -> List[DateWindow]:
+    """
+    Split an inclusive date range into sub-windows of at most ``max_days``.
+
+    With ``align="month"`` no sub-window crosses a month boundary, matching
+    tables partitioned by ``toYYYYMM(date)`` so every sub-window reads from a
+    single partition.
+
+    Returns:
+        Inclusive (start, end) pairs covering the range in order
+    """
+    if max_days <= 0:
+        raise ValueError(f"max_days must be positive, got {max_days}")
+    if align not in WINDOW_ALIGNMENTS:
+        raise ValueError(f"Unknown window alignment: {align}. Available: {', '.join(WINDOW_ALIGNMENTS)}")
+
+    start, end = _parse_date(start), _parse_date(end)
+    if end < start:
+        raise ValueError(f"end {end} is before start {start}")
+
+    windows = []
+    current = start
+    while current <= end:
+        window_end = min(end, current + timedelta(days=max_days - 1))
+        if align == WINDOW_ALIGN_MONTH:
+            window_end = min(window_end, _next_month(current) - timedelta(days=1))
+        windows.append((current, window_end))
+        current = window_end + timedelta(days=1)
+    return windows
+
+
+def window_contexts(context: Dict[str, Any], windows: Sequence[DateWindow]) -> List[Dict[str, Any]]:
+    return [
+        {**context, "start_date": start.isoformat(), "end_date": end.isoformat()}
+        for start, end in windows
+    ]
+
+
+def build_window_chord(
+    task_name: str,
+    context: Dict[str, Any],
+    pending: List[Dict[str, Any]],
+    max_parallel: int,
+    collected: Optional[List[Dict[str, Any]]] = None,
+):
+    """
+    Build the chord for the next wave of sub-window tasks.
+
+    At most ``max_parallel`` sub-windows run at once; the reducer starts the
+    following wave when the current one is done and merges all results once
+    nothing is pending.
+    """
+    task = current_app.tasks[task_name]
+    wave, rest = pending[:max_parallel], pending[max_parallel:]
+    header = [
+        task.signature((window_context,), headers={WINDOW_PART_HEADER: True})
+        for window_context in wave
+    ]
+    body = merge_window_results.s(task_name, context, rest, max_parallel, collected or [])
+    return chord(header, body)
+
+
+@shared_task(bind=True, name="chainswarm_core.jobs.merge_window_results")
+def merge_window_results(
+    self,
+    results: List[Dict[str, Any]],
+    task_name: str,
+    context: Dict[str, Any],
+    pending: List[Dict[str, Any]],
+    max_parallel: int,
+    collected: List[Dict[str, Any]],
+):
+    collected = list(collected) + list(results)
+    if pending:
+        return self.replace(build_window_chord(task_name, context, pending, max_parallel, collected))
+    task = current_app.tasks[task_name]
+    merged = task.merge_window_results(context, [task.resolve_result(result) for result in collected])
+    return task.offload_result(merged)
@@ -7,19 +7,24 @@ from chainswarm_core.observability.logging import (
 from chainswarm_core.observability.shutdown import (
     async_wait_for_termination,
     install_shutdown_handlers,
+    register_shutdown_callback,
+    run_shutdown_callbacks,
     shutdown_handler,
     terminate_event,
+    unregister_shutdown_callback,
 )
 from chainswarm_core.observability.metrics import (
     COUNT_BUCKETS,
     DURATION_BUCKETS,
     SIZE_BUCKETS,
     MetricsRegistry,
+    get_default_metrics_registry,
     get_metrics_registry,
     setup_metrics,
     shutdown_metrics_servers,
 )
 from chainswarm_core.observability.decorators import log_errors, manage_metrics
+from chainswarm_core.observability.memory import get_peak_rss_bytes, get_rss_bytes, reset_peak_rss
 
 __all__ = [
     "generate_correlation_id",
@@ -28,15 +33,22 @@ __all__ = [
     "setup_logger",
     "async_wait_for_termination",
     "install_shutdown_handlers",
+    "register_shutdown_callback",
+    "run_shutdown_callbacks",
     "shutdown_handler",
     "terminate_event",
+    "unregister_shutdown_callback",
     "COUNT_BUCKETS",
     "DURATION_BUCKETS",
     "SIZE_BUCKETS",
     "MetricsRegistry",
+    "get_default_metrics_registry",
     "get_metrics_registry",
     "setup_metrics",
     "shutdown_metrics_servers",
     "log_errors",
     "manage_metrics",
+    "get_peak_rss_bytes",
+    "get_rss_bytes",
+    "reset_peak_rss",
 ]
\ No newline at end of file
@@ -0,0 +1,55 @@
+import os
+import resource
+import sys
+
+_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def get_peak_rss_bytes() -> int:
+    """
+    Return the peak resident set size of the current process in bytes.
+
+    Reads ``VmHWM`` from ``/proc/self/status`` where available, so the value
+    follows ``reset_peak_rss()``; falls back to ``ru_maxrss`` elsewhere.
+    """
+    try:
+        with open('/proc/self/status', 'rb') as f:
+            for line in f:
+                if line.startswith(b'VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, IndexError, ValueError):
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    if sys.platform == 'darwin':
+        return peak
+    return peak * 1024
+
+
+def get_rss_bytes() -> int:
+    """
+    Return the current resident set size of the process in bytes.
+
+    Reads ``/proc/self/statm`` where available (cheap, no syscalls beyond a
+    small read) and falls back to the peak RSS on other platforms.
+    """
+    try:
+        with open('/proc/self/statm', 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return get_peak_rss_bytes()
+
+
+def reset_peak_rss() -> bool:
+    """
+    Reset the peak RSS of the process to its current RSS (Linux only).
+
+    Returns:
+        True when the peak was reset, False when the platform does not support it
+    """
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
@@ -17,6 +17,7 @@ from prometheus_client import (
 _service_registries: Dict[str, "MetricsRegistry"] = {}
 _metrics_servers: Dict[str, Any] = {}
 _metrics_lock = threading.Lock()
+_default_service_name: Optional[str] = None
 
 DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0, float('inf'))
 SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, float('inf'))
@@ -38,6 +39,8 @@ class MetricsRegistry:
         self._port_mapping = port_mapping or {}
         self._label_extractor = label_extractor or self._default_label_extractor
         self._common_labels = self._label_extractor(service_name)
+        self._shared_metrics: Dict[str, Any] = {}
+        self._shared_metrics_lock = threading.Lock()
         self._init_common_metrics()
 
     def _default_label_extractor(self, service_name: str) -> Dict[str, str]:
@@ -109,6 +112,32 @@ class MetricsRegistry:
             registry=self.registry
         )
 
+    def _get_or_create(self, name: str, factory: Callable[[], Any]) -> Any:
+        metric = self._shared_metrics.get(name)
+        if metric is not None:
+            return metric
+        with self._shared_metrics_lock:
+            metric = self._shared_metrics.get(name)
+            if metric is None:
+                metric = factory()
+                self._shared_metrics[name] = metric
+            return metric
+
+    def get_or_create_counter(self, name: str, description: str, labelnames: Optional[list] = None) -> Counter:
+        return self._get_or_create(name, lambda: self.create_counter(name, description, labelnames))
+
+    def get_or_create_histogram(
+        self,
+        name: str,
+        description: str,
+        labelnames: Optional[list] = None,
+        buckets: Optional[tuple] = None,
+    ) -> Histogram:
+        return self._get_or_create(name, lambda: self.create_histogram(name, description, labelnames, buckets))
+
+    def get_or_create_gauge(self, name: str, description: str, labelnames: Optional[list] = None) -> Gauge:
+        return self._get_or_create(name, lambda: self.create_gauge(name, description, labelnames))
+
     def start_metrics_server(self, port: Optional[int] = None) -> bool:
         if self.server is not None:
             logger.warning(f"Metrics server already running for {self.service_name}")
@@ -167,6 +196,8 @@ def setup_metrics(
     port_mapping: Optional[Dict[str, int]] = None,
     start_server: bool = True,
 ) -> MetricsRegistry:
+    global _default_service_name
+
     with _metrics_lock:
         if service_name in _service_registries:
             logger.debug(f"Metrics already setup for {service_name}")
@@ -174,6 +205,8 @@ def setup_metrics(
 
         metrics_registry = MetricsRegistry(service_name, port, port_mapping)
         _service_registries[service_name] = metrics_registry
+        if _default_service_name is None:
+            _default_service_name = service_name
 
         if start_server:
             success = metrics_registry.start_metrics_server()
@@ -188,6 +221,20 @@ def get_metrics_registry(service_name: str) -> Optional[MetricsRegistry]:
     return _service_registries.get(service_name)
 
 
+def get_default_metrics_registry() -> Optional[MetricsRegistry]:
+    """
+    Return the registry of the first service set up in this process.
+
+    Library components (db layer, task base classes) record their metrics
+    here so they show up next to the service metrics without extra wiring.
+    Returns None when metrics were never set up, in which case callers
+    should skip recording.
+    """
+    if _default_service_name is None:
+        return None
+    return _service_registries.get(_default_service_name)
+
+
 def shutdown_metrics_servers():
     with _metrics_lock:
         for service_name, server in _metrics_servers.items():
@@ -2,15 +2,55 @@ import asyncio
 import signal
 import threading
 import time
+from typing import Callable, List
 
 from loguru import logger
 
 terminate_event = threading.Event()
 
+_shutdown_callbacks: List[Callable[[], None]] = []
+_shutdown_callbacks_lock = threading.Lock()
+
+
+def register_shutdown_callback(callback: Callable[[], None]) -> None:
+    """
+    Register a callback to run when a shutdown signal is received.
+
+    Callbacks run in registration order right after ``terminate_event`` is
+    set. Registering the same callback twice has no effect.
+    """
+    with _shutdown_callbacks_lock:
+        if callback not in _shutdown_callbacks:
+            _shutdown_callbacks.append(callback)
+
+
+def unregister_shutdown_callback(callback: Callable[[], None]) -> None:
+    with _shutdown_callbacks_lock:
+        if callback in _shutdown_callbacks:
+            _shutdown_callbacks.remove(callback)
+
+
+def run_shutdown_callbacks() -> None:
+    with _shutdown_callbacks_lock:
+        callbacks = list(_shutdown_callbacks)
+
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception as e:
+            logger.error(
+                "Shutdown callback failed",
+                extra={
+                    "callback": getattr(callback, "__qualname__", repr(callback)),
+                    "error": str(e),
+                }
+            )
+
 
 def shutdown_handler(signum, frame):
     logger.info(f"Shutdown signal received (signal={signum}). Waiting for current processing to complete...")
     terminate_event.set()
+    run_shutdown_callbacks()
     time.sleep(2)
 
 
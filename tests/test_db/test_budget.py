@@ -0,0 +1,122 @@
+"""Tests for chainswarm_core.db.budget module."""
+
+from clickhouse_connect.driver.exceptions import DatabaseError
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.budget import (
+    QueryBudget,
+    get_budget_error_limit,
+    get_query_budget,
+    query_budget,
+)
+from chainswarm_core.jobs.models import BaseTaskContext
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "test_table"
+
+
+class TestQueryBudget:
+    """Tests for QueryBudget class."""
+
+    def test_from_context_dict(self):
+        """Test budget is read from a context dict, ignoring other keys."""
+        budget = QueryBudget.from_context(
+            {"network": "torus", "max_threads": 4, "priority": 2}
+        )
+        assert budget == QueryBudget(max_threads=4, priority=2)
+
+    def test_from_task_context(self):
+        """Test budget is read from a BaseTaskContext."""
+        ctx = BaseTaskContext(network="torus", max_memory_usage=1024)
+        assert QueryBudget.from_context(ctx).max_memory_usage == 1024
+
+    def test_to_settings_skips_unset(self):
+        """Test only set limits become settings."""
+        assert QueryBudget(max_execution_time=60).to_settings() == {"max_execution_time": 60}
+
+    def test_apply_caps_existing_settings(self):
+        """Test limits keep the lower value and fill missing settings."""
+        budget = QueryBudget(max_threads=4, max_memory_usage=1000, priority=1)
+        merged = budget.apply({"max_threads": 16, "max_memory_usage": 500, "priority": 5})
+
+        assert merged == {"max_threads": 4, "max_memory_usage": 500, "priority": 1}
+
+    def test_apply_treats_zero_as_unlimited(self):
+        """Test a zero (unlimited) setting is replaced by the budget."""
+        assert QueryBudget(max_threads=4).apply({"max_threads": 0}) == {"max_threads": 4}
+
+    def test_apply_caps_client_settings(self):
+        """Test a budget above the client-level limit does not loosen it."""
+        budget = QueryBudget(max_execution_time=7200, max_threads=2)
+        merged = budget.apply({}, client_settings={"max_execution_time": "3600", "max_threads": "8"})
+
+        assert merged == {"max_execution_time": 3600, "max_threads": 2}
+
+
+class TestQueryBudgetContext:
+    """Tests for the thread-bound budget."""
+
+    def test_context_restores_previous(self):
+        """Test nested budgets restore the outer one."""
+        outer = QueryBudget(max_threads=8)
+        with query_budget(outer):
+            with query_budget(QueryBudget(max_threads=2)):
+                assert get_query_budget().max_threads == 2
+            assert get_query_budget() is outer
+        assert get_query_budget() is None
+
+    def test_empty_budget_is_not_bound(self):
+        """Test an empty budget leaves settings untouched."""
+        with query_budget(QueryBudget()):
+            assert get_query_budget() is None
+
+    def test_repository_applies_budget(self, mock_clickhouse_client):
+        """Test repository queries carry the active budget."""
+        repo = ConcreteRepository(mock_clickhouse_client)
+        with query_budget(QueryBudget(max_threads=2, priority=3)):
+            repo._query("SELECT 1")
+
+        settings = mock_clickhouse_client.query.call_args.kwargs["settings"]
+        assert settings["max_threads"] == 2
+        assert settings["priority"] == 3
+
+    def test_repository_keeps_client_execution_time(self, mock_clickhouse_client):
+        """Test the client's max_execution_time caps a larger budget."""
+        mock_clickhouse_client.get_client_setting.side_effect = {"max_execution_time": "3600"}.get
+        repo = ConcreteRepository(mock_clickhouse_client)
+        with query_budget(QueryBudget(max_execution_time=7200)):
+            repo._query("SELECT 1")
+
+        settings = mock_clickhouse_client.query.call_args.kwargs["settings"]
+        assert settings["max_execution_time"] == 3600
+
+
+class TestBudgetErrors:
+    """Tests for budget error classification."""
+
+    @pytest.mark.parametrize(
+        "message, limit",
+        [
+            ("Code: 241. DB::Exception: Memory limit (for query) exceeded", "max_memory_usage"),
+            ("Code: 159. DB::Exception: Timeout exceeded: elapsed 61 seconds", "max_execution_time"),
+            ("Code: 60. DB::Exception: Table default.x does not exist", None),
+        ],
+    )
+    def test_get_budget_error_limit(self, message, limit):
+        """Test limits are recognised from the ClickHouse error code."""
+        assert get_budget_error_limit(DatabaseError(message)) == limit
+
+    def test_repository_reraises_budget_errors(self, mock_clickhouse_client):
+        """Test budget errors are re-raised after being recorded."""
+        mock_clickhouse_client.query.side_effect = DatabaseError("Code: 241. Memory limit exceeded")
+        repo = ConcreteRepository(mock_clickhouse_client)
+
+        with pytest.raises(DatabaseError):
+            repo._query("SELECT 1")
@@ -0,0 +1,114 @@
+"""Tests for chainswarm_core.db.checksum module."""
+
+from functools import reduce
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.checksum import MAX_HASH, diff_tables
+
+
+class FakeChecksumClient:
+    """In-memory stand-in answering the checksum aggregate queries."""
+
+    def __init__(self, partitions: dict[str, list[int]]):
+        self.partitions = partitions
+        self.database = "test"
+        self.queries = 0
+
+    @staticmethod
+    def _aggregate(hashes):
+        return (
+            len(hashes),
+            reduce(lambda a, b: a ^ b, hashes, 0),
+            sum(hashes) % (MAX_HASH + 1),
+        )
+
+    def query(self, query, parameters=None, settings=None):
+        self.queries += 1
+        if "GROUP BY _partition_id" in query:
+            rows = [(p, *self._aggregate(h)) for p, h in self.partitions.items() if h]
+        else:
+            lo, hi, step = parameters["hash_from"], parameters["hash_to"], parameters["step"]
+            buckets: dict[int, list[int]] = {}
+            for h in self.partitions.get(parameters["partition_id"], []):
+                if lo <= h <= hi:
+                    buckets.setdefault((h - lo) // step, []).append(h)
+            rows = [(b, *self._aggregate(h)) for b, h in buckets.items()]
+        return MagicMock(result_rows=rows)
+
+
+def _hashes(count: int, seed: int = 7) -> list[int]:
+    return [(i * 0x9E3779B97F4A7C15 + seed) % (MAX_HASH + 1) for i in range(count)]
+
+
+class TestDiffTables:
+    """Tests for diff_tables function."""
+
+    def test_equal_tables(self):
+        """Test identical tables need only the partition queries."""
+        data = {"202501": _hashes(1000), "202502": _hashes(500, seed=3)}
+        diff = diff_tables(FakeChecksumClient(data), "t", target_client=FakeChecksumClient(dict(data)))
+
+        assert diff.is_equal
+        assert diff.partitions_compared == 2
+        assert diff.queries == 2
+
+    def test_finds_single_changed_row(self):
+        """Test a single changed row is narrowed down to a small range."""
+        source = {"202501": _hashes(5000), "202502": _hashes(5000, seed=3)}
+        changed = list(source["202502"])
+        changed[1234] = 42
+        target = {"202501": list(source["202501"]), "202502": changed}
+
+        diff = diff_tables(
+            FakeChecksumClient(source), "t",
+            target_client=FakeChecksumClient(target),
+            fanout=8, leaf_rows=50,
+        )
+
+        assert not diff.is_equal
+        assert diff.partitions_differing == 1
+        assert {r.partition_id for r in diff.ranges} == {"202502"}
+        assert all(max(r.source_rows, r.target_rows) <= 50 for r in diff.ranges)
+        assert any(r.hash_from <= 42 <= r.hash_to for r in diff.ranges)
+        assert any(r.hash_from <= source["202502"][1234] <= r.hash_to for r in diff.ranges)
+        assert diff.queries < 30
+
+    def test_missing_partition(self):
+        """Test a partition missing on one side is reported whole."""
+        source = {"202501": _hashes(100), "202502": _hashes(100, seed=3)}
+        target = {"202501": list(source["202501"])}
+
+        diff = diff_tables(FakeChecksumClient(source), "t", target_client=FakeChecksumClient(target))
+
+        assert len(diff.ranges) == 1
+        assert diff.ranges[0].partition_id == "202502"
+        assert diff.ranges[0].target_rows == 0
+        assert diff.ranges[0].hash_from == 0
+        assert diff.ranges[0].hash_to == MAX_HASH
+
+    def test_qualified_names(self):
+        """Test databases are used to qualify table names."""
+        client = FakeChecksumClient({})
+        diff = diff_tables(
+            client, "transfers",
+            source_database="analytics_torus", target_database="benchmark_torus",
+            columns=["id", "amount"],
+        )
+        assert diff.source_table == "analytics_torus.transfers"
+        assert diff.target_table == "benchmark_torus.transfers"
+        assert diff.row_hash == "cityHash64(id, amount)"
+
+    def test_range_condition(self):
+        """Test range condition selects partition and hash range."""
+        source = {"p'1": _hashes(10)}
+        diff = diff_tables(FakeChecksumClient(source), "t", target_client=FakeChecksumClient({}))
+        condition = diff.ranges[0].condition(diff.row_hash)
+        assert condition.startswith("_partition_id = 'p\\'1'")
+        assert f"BETWEEN 0 AND {MAX_HASH}" in condition
+
+    def test_rejects_small_fanout(self):
+        """Test fanout below 2 raises ValueError."""
+        with pytest.raises(ValueError, match="fanout"):
+            diff_tables(FakeChecksumClient({}), "t", fanout=1)
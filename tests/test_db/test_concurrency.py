@@ -0,0 +1,256 @@
+"""Tests for chainswarm_core.db.concurrency module."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db import concurrency as concurrency_module
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.concurrency import (
+    LocalConcurrencyLimiter,
+    RedisConcurrencyLimiter,
+    clickhouse_workload,
+    get_concurrency_limiter,
+    set_concurrency_limiter,
+)
+from chainswarm_core.observability.metrics import MetricsRegistry
+
+
+class HeavyRepository(BaseRepository):
+    """Repository running heavy queries."""
+
+    workload_class = "heavy"
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "heavy_table"
+
+
+@pytest.fixture
+def limiter():
+    limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=1.0)
+    set_concurrency_limiter(limiter)
+    yield limiter
+    set_concurrency_limiter(None)
+
+
+class TestLocalConcurrencyLimiter:
+    """Tests for LocalConcurrencyLimiter class."""
+
+    def test_bounds_concurrency(self):
+        """Test no more than the limit of holders run at once."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 2})
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def work():
+            with limiter.slot("heavy"):
+                with lock:
+                    state["running"] += 1
+                    state["peak"] = max(state["peak"], state["running"])
+                time.sleep(0.01)
+                with lock:
+                    state["running"] -= 1
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert state["peak"] == 2
+
+    def test_waiters_served_in_arrival_order(self):
+        """Test slots are handed to waiters first come, first served."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1})
+        order = []
+        token = limiter.acquire("heavy", 1, 1.0)
+
+        def wait(i):
+            with limiter.slot("heavy"):
+                order.append(i)
+
+        threads = []
+        for i in range(4):
+            thread = threading.Thread(target=wait, args=(i,))
+            thread.start()
+            threads.append(thread)
+            time.sleep(0.01)
+        limiter.release("heavy", token)
+        for thread in threads:
+            thread.join()
+
+        assert order == [0, 1, 2, 3]
+
+    def test_timeout(self):
+        """Test waiting past timeout_seconds raises TimeoutError."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=0.01)
+        limiter.acquire("heavy", 1, 1.0)
+        with pytest.raises(TimeoutError):
+            with limiter.slot("heavy"):
+                pass
+
+    def test_unlimited_workload(self):
+        """Test workloads without a limit never wait."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=0.01)
+        with limiter.slot("light"), limiter.slot("light"):
+            pass
+
+    def test_nested_slot_is_reused(self):
+        """Test a nested block of the same workload does not deadlock."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=0.1)
+        with limiter.slot("heavy"):
+            with limiter.slot("heavy"):
+                pass
+        with limiter.slot("heavy"):
+            pass
+
+    def test_nested_slots_exiting_out_of_order(self):
+        """Test the slot is released by its owner when nested blocks exit out of order."""
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=0.1)
+        outer = limiter.slot("heavy")
+        inner = limiter.slot("heavy")
+        outer.__enter__()
+        inner.__enter__()
+        outer.__exit__(None, None, None)
+        assert limiter._workloads["heavy"].in_use == 0
+        inner.__exit__(None, None, None)
+        assert limiter._workloads["heavy"].in_use == 0
+
+        with limiter.slot("heavy"):
+            assert limiter._workloads["heavy"].in_use == 1
+        assert limiter._workloads["heavy"].in_use == 0
+
+    def test_invalid_limit(self):
+        """Test a limit below one raises ValueError."""
+        with pytest.raises(ValueError, match="at least 1"):
+            LocalConcurrencyLimiter(limits={"heavy": 0})
+
+    def test_records_wait_metrics(self, monkeypatch):
+        """Test waits and timeouts are recorded per workload."""
+        metrics_registry = MetricsRegistry("test-concurrency")
+        monkeypatch.setattr(concurrency_module, "get_default_metrics_registry", lambda: metrics_registry)
+        limiter = LocalConcurrencyLimiter(limits={"heavy": 1}, timeout_seconds=0.01)
+
+        with limiter.slot("heavy"):
+            pass
+        limiter.acquire("heavy", 1, 1.0)
+        with pytest.raises(TimeoutError):
+            with limiter.slot("heavy"):
+                pass
+
+        registry = metrics_registry.registry
+        assert registry.get_sample_value("clickhouse_concurrency_wait_seconds_count", {"workload": "heavy"}) == 2
+        assert registry.get_sample_value("clickhouse_concurrency_timeouts_total", {"workload": "heavy"}) == 1
+
+
+class TestRedisConcurrencyLimiter:
+    """Tests for RedisConcurrencyLimiter class."""
+
+    def test_acquire_polls_until_granted(self):
+        """Test acquire retries the script until a slot is granted."""
+        client = MagicMock()
+        script = MagicMock(side_effect=[0, 0, 1])
+        client.register_script.return_value = script
+        limiter = RedisConcurrencyLimiter(limits={"heavy": 2}, client=client, poll_interval=0.001)
+
+        token = limiter.acquire("heavy", 2, 1.0)
+
+        assert token is not None
+        assert script.call_count == 3
+        keys = script.call_args.kwargs["keys"]
+        assert keys[0] == "chainswarm:clickhouse-slots:{heavy}:holders"
+        assert script.call_args.kwargs["args"][:2] == [token, 2]
+
+    def test_timeout_leaves_queue(self):
+        """Test a timed out waiter removes itself from the queue."""
+        client = MagicMock()
+        client.register_script.return_value = MagicMock(return_value=0)
+        limiter = RedisConcurrencyLimiter(limits={"heavy": 1}, client=client, poll_interval=0.001)
+
+        assert limiter.acquire("heavy", 1, 0.005) is None
+        pipeline = client.pipeline.return_value
+        assert pipeline.zrem.call_count == 2
+        pipeline.execute.assert_called_once()
+
+    def test_held_slot_is_renewed(self):
+        """Test a held slot's lease is renewed until it is released."""
+        client = MagicMock()
+        acquire, renew = MagicMock(return_value=1), MagicMock(return_value=1)
+        client.register_script.side_effect = [acquire, renew]
+        limiter = RedisConcurrencyLimiter(limits={"heavy": 1}, client=client, lease_seconds=0.03)
+
+        token = limiter.acquire("heavy", 1, 1.0)
+        time.sleep(0.05)
+        limiter.release("heavy", token)
+        renewals = renew.call_count
+        time.sleep(0.03)
+
+        assert renewals >= 1
+        assert renew.call_args.kwargs["args"] == [token, 30]
+        assert renew.call_count <= renewals + 1
+
+    def test_release(self):
+        """Test release removes the holder."""
+        client = MagicMock()
+        limiter = RedisConcurrencyLimiter(limits={"heavy": 1}, client=client)
+        limiter.release("heavy", "t")
+        client.zrem.assert_called_once_with("chainswarm:clickhouse-slots:{heavy}:holders", "t")
+
+
+class TestRepositoryIntegration:
+    """Tests for slot acquisition in BaseRepository."""
+
+    def test_query_holds_slot_of_workload_class(self, limiter, mock_clickhouse_client):
+        """Test a repository query runs inside a slot of its workload class."""
+        def query(*args, **kwargs):
+            assert limiter._workloads["heavy"].in_use == 1
+
+        mock_clickhouse_client.query.side_effect = query
+        HeavyRepository(mock_clickhouse_client)._query("SELECT 1")
+
+        assert limiter._workloads["heavy"].in_use == 0
+
+    def test_bound_workload_overrides_class(self, limiter, mock_clickhouse_client):
+        """Test clickhouse_workload overrides the repository's workload class."""
+        with clickhouse_workload("light"):
+            HeavyRepository(mock_clickhouse_client)._query("SELECT 1")
+
+        assert "heavy" not in limiter._workloads
+        assert get_concurrency_limiter() is limiter
+
+    def test_export_takes_slot(self, limiter, mock_clickhouse_client, tmp_path):
+        """Test Parquet exports wait for a slot of the bound workload."""
+        def raw_stream(*args, **kwargs):
+            assert limiter._workloads["heavy"].in_use == 1
+            stream = MagicMock()
+            stream.read.side_effect = [b"PAR1", b""]
+            return stream
+
+        mock_clickhouse_client.raw_stream.side_effect = raw_stream
+        repo = HeavyRepository(mock_clickhouse_client)
+        repo.workload_class = "light"
+        with clickhouse_workload("heavy"):
+            repo.export_window_to_parquet(tmp_path / "x.parquet", "ts", "2024-01-01", "2024-01-02")
+
+        mock_clickhouse_client.raw_stream.assert_called_once()
+        assert limiter._workloads["heavy"].in_use == 0
+
+    def test_export_uses_repository_workload(self, limiter, mock_clickhouse_client, tmp_path):
+        """Test exports default to the repository's workload class."""
+        def raw_stream(*args, **kwargs):
+            assert limiter._workloads["heavy"].in_use == 1
+            stream = MagicMock()
+            stream.read.side_effect = [b""]
+            return stream
+
+        mock_clickhouse_client.raw_stream.side_effect = raw_stream
+        HeavyRepository(mock_clickhouse_client).export_partition_to_parquet(tmp_path / "p.parquet", "202401")
+        mock_clickhouse_client.raw_stream.assert_called_once()
+
+    def test_no_limiter(self, mock_clickhouse_client):
+        """Test queries run without a limiter installed."""
+        HeavyRepository(mock_clickhouse_client)._query("SELECT 1")
+        mock_clickhouse_client.query.assert_called_once()
@@ -0,0 +1,79 @@
+"""Tests for chainswarm_core.db.metadata module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.metadata import ColumnMetadata, SchemaMetadataCache, schema_cache
+from chainswarm_core.db.migrations import apply_schema_content
+
+COLUMN_ROWS = [
+    ("transfers", "id", "UInt64", 1, "", 1),
+    ("transfers", "amount", "Nullable(Decimal(38, 18))", 2, "", 0),
+    ("transfers", "kind", "LowCardinality(Enum8('in' = 1, 'out' = 2))", 3, "", 0),
+    ("labels", "address", "String", 1, "", 1),
+]
+
+
+@pytest.fixture
+def metadata_client():
+    """Mock client returning system.columns rows."""
+    client = MagicMock()
+    client.database = "analytics_torus"
+    client.query.return_value = MagicMock(result_rows=COLUMN_ROWS)
+    return client
+
+
+class TestColumnMetadata:
+    """Tests for ColumnMetadata class."""
+
+    def test_base_type_strips_wrappers(self):
+        """Test Nullable and LowCardinality wrappers are removed."""
+        column = ColumnMetadata("x", "LowCardinality(Nullable(String))", 1)
+        assert column.base_type == "String"
+        assert column.is_nullable
+
+    def test_type_flags(self):
+        """Test enum and decimal detection."""
+        assert ColumnMetadata("x", "Nullable(Decimal(38, 18))", 1).is_decimal
+        assert ColumnMetadata("x", "Enum8('a' = 1)", 1).is_enum
+        assert not ColumnMetadata("x", "UInt64", 1).is_enum
+
+
+class TestSchemaMetadataCache:
+    """Tests for SchemaMetadataCache class."""
+
+    def test_loads_database_once(self, metadata_client):
+        """Test all tables come from one bulk query."""
+        cache = SchemaMetadataCache()
+        assert cache.get_column_names(metadata_client, "transfers") == ["id", "amount", "kind"]
+        assert cache.get_column_types(metadata_client, "labels") == {"address": "String"}
+
+        assert metadata_client.query.call_count == 1
+        assert metadata_client.query.call_args.kwargs["parameters"] == {"database": "analytics_torus"}
+
+    def test_missing_table_reloads_once(self, metadata_client):
+        """Test unknown table triggers one reload, then raises."""
+        cache = SchemaMetadataCache()
+        cache.load(metadata_client)
+
+        with pytest.raises(ValueError, match="Table not found"):
+            cache.get_columns(metadata_client, "missing")
+        assert metadata_client.query.call_count == 2
+
+    def test_invalidate(self, metadata_client):
+        """Test invalidation forces a reload."""
+        cache = SchemaMetadataCache()
+        cache.get_columns(metadata_client, "transfers")
+        cache.invalidate("analytics_torus")
+
+        assert not cache.is_loaded("analytics_torus")
+        cache.get_columns(metadata_client, "transfers")
+        assert metadata_client.query.call_count == 2
+
+    def test_apply_schema_invalidates(self, metadata_client):
+        """Test applying DDL invalidates the shared cache."""
+        schema_cache.load(metadata_client)
+        apply_schema_content(metadata_client, "CREATE TABLE t (id UInt64) ENGINE = Memory;")
+
+        assert not schema_cache.is_loaded("analytics_torus")
@@ -0,0 +1,119 @@
+"""Tests for chainswarm_core.db.parquet module."""
+
+import io
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.parquet import export_query_to_parquet, import_parquet_file
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "transfers"
+
+
+@pytest.fixture
+def parquet_client():
+    """Mock client streaming fixed Parquet bytes."""
+    client = MagicMock()
+    client.database = "torus"
+    client.raw_stream.side_effect = lambda *a, **kw: io.BytesIO(b"PAR1" + b"x" * 100 + b"PAR1")
+
+    def raw_insert(table, column_names=None, insert_block=None, settings=None, fmt=None):
+        client.inserted = b"".join(insert_block)
+        return MagicMock(written_rows=3)
+
+    client.raw_insert.side_effect = raw_insert
+    return client
+
+
+class TestExportQueryToParquet:
+    """Tests for export_query_to_parquet function."""
+
+    def test_streams_to_file(self, parquet_client, tmp_path):
+        """Test response is written in chunks with zstd compression."""
+        target = tmp_path / "out" / "t.parquet"
+        exported = export_query_to_parquet(parquet_client, "SELECT 1", target, chunk_size=16)
+
+        assert target.read_bytes().startswith(b"PAR1")
+        assert exported.size_bytes == 108
+        kwargs = parquet_client.raw_stream.call_args.kwargs
+        assert kwargs["fmt"] == "Parquet"
+        assert kwargs["settings"]["output_format_parquet_compression_method"] == "zstd"
+        assert "query_id" in kwargs["settings"]
+
+    def test_no_partial_file_on_error(self, tmp_path):
+        """Test a failed stream leaves no file behind."""
+        client = MagicMock()
+        stream = MagicMock()
+        stream.read.side_effect = OSError("connection reset")
+        client.raw_stream.return_value = stream
+        target = tmp_path / "t.parquet"
+
+        with pytest.raises(OSError):
+            export_query_to_parquet(client, "SELECT 1", target)
+        assert list(tmp_path.iterdir()) == []
+        stream.close.assert_called_once()
+
+
+class TestImportParquetFile:
+    """Tests for import_parquet_file function."""
+
+    def test_streams_file_to_insert(self, parquet_client, tmp_path):
+        """Test file content is sent as Parquet chunks."""
+        source = tmp_path / "t.parquet"
+        source.write_bytes(b"PAR1" + b"y" * 50 + b"PAR1")
+
+        loaded = import_parquet_file(parquet_client, "transfers", source, chunk_size=8)
+
+        assert loaded.rows == 3
+        assert parquet_client.inserted == source.read_bytes()
+        assert parquet_client.raw_insert.call_args.kwargs["fmt"] == "Parquet"
+
+
+class TestRepositoryParquet:
+    """Tests for BaseRepository Parquet methods."""
+
+    def test_export_window(self, parquet_client, tmp_path):
+        """Test window export filters on the date column."""
+        repo = ConcreteRepository(parquet_client)
+        repo.export_window_to_parquet(tmp_path / "w.parquet", "block_timestamp", "2025-01-01", "2025-01-07")
+
+        args, kwargs = parquet_client.raw_stream.call_args
+        assert "FROM transfers" in args[0]
+        assert "toDate(block_timestamp) BETWEEN" in args[0]
+        assert kwargs["parameters"] == {"start_date": "2025-01-01", "end_date": "2025-01-07"}
+
+    def test_export_partitions(self, parquet_client, tmp_path):
+        """Test one file is written per partition."""
+        repo = ConcreteRepository(parquet_client)
+        files = repo.export_partitions_to_parquet(tmp_path, partition_ids=["202501", "202502"])
+
+        assert [f.path.name for f in files] == ["transfers-202501.parquet", "transfers-202502.parquet"]
+
+    def test_import_parallel_uses_client_context(self, parquet_client, tmp_path):
+        """Test parallel import opens a client per file."""
+        paths = []
+        for i in range(3):
+            path = tmp_path / f"{i}.parquet"
+            path.write_bytes(b"PAR1")
+            paths.append(path)
+
+        opened = []
+
+        @contextmanager
+        def client_context():
+            opened.append(1)
+            yield parquet_client
+
+        repo = ConcreteRepository(MagicMock())
+        loaded = repo.import_parquet(paths, client_context=client_context, max_workers=2)
+
+        assert [f.path for f in loaded] == paths
+        assert len(opened) == 3
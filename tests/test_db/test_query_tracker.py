@@ -0,0 +1,110 @@
+"""Tests for chainswarm_core.db.query_tracker module."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.query_tracker import (
+    InFlightQueryRegistry,
+    cancel_inflight_queries,
+    inflight_queries,
+)
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def schema(cls) -> str:
+        return "test_schema.sql"
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "test_table"
+
+
+class TestInFlightQueryRegistry:
+    """Tests for InFlightQueryRegistry class."""
+
+    def test_track_registers_and_unregisters(self):
+        """Test query is registered only inside the block."""
+        registry = InFlightQueryRegistry()
+        with registry.track("SELECT 1", database="torus") as query_id:
+            snapshot = registry.snapshot()
+            assert len(snapshot) == 1
+            assert snapshot[0].query_id == query_id
+            assert snapshot[0].database == "torus"
+        assert len(registry) == 0
+
+    def test_track_unregisters_on_error(self):
+        """Test query is unregistered when the block raises."""
+        registry = InFlightQueryRegistry()
+        with pytest.raises(RuntimeError):
+            with registry.track("SELECT 1"):
+                raise RuntimeError("boom")
+        assert len(registry) == 0
+
+    def test_generated_ids_are_unique(self):
+        """Test nested tracking uses distinct ids."""
+        registry = InFlightQueryRegistry()
+        with registry.track() as first, registry.track() as second:
+            assert first != second
+            assert len(registry) == 2
+
+
+class TestRepositoryTracking:
+    """Tests for query tracking in BaseRepository."""
+
+    def test_query_passes_tracked_query_id(self, mock_clickhouse_client):
+        """Test _query sends the in-flight query id as a setting."""
+        seen = {}
+
+        def fake_query(query, parameters=None, settings=None):
+            seen["ids"] = [q.query_id for q in inflight_queries.snapshot()]
+            seen["settings"] = settings
+
+        mock_clickhouse_client.query.side_effect = fake_query
+        repo = ConcreteRepository(mock_clickhouse_client)
+        repo._query("SELECT 1", settings={"max_threads": 2})
+
+        assert seen["settings"]["query_id"] in seen["ids"]
+        assert seen["settings"]["max_threads"] == 2
+        assert len(inflight_queries) == 0
+
+    def test_insert_defaults_to_table_name(self, mock_clickhouse_client):
+        """Test _insert targets table_name() by default."""
+        repo = ConcreteRepository(mock_clickhouse_client)
+        repo._insert([(1, "a")], column_names=["id", "name"])
+
+        args, kwargs = mock_clickhouse_client.insert.call_args
+        assert args[0] == "test_table"
+        assert "query_id" in kwargs["settings"]
+
+
+class TestCancelInflightQueries:
+    """Tests for cancel_inflight_queries function."""
+
+    def test_noop_without_inflight_queries(self):
+        """Test no client is created when nothing is in flight."""
+        with patch("chainswarm_core.db.query_tracker.get_client") as get_client:
+            assert cancel_inflight_queries() == 0
+            get_client.assert_not_called()
+
+    def test_kills_tracked_queries(self):
+        """Test KILL QUERY is issued with the tracked ids."""
+        client = MagicMock()
+        with patch("chainswarm_core.db.query_tracker.get_client", return_value=client):
+            with inflight_queries.track("SELECT sleep(3)") as query_id:
+                assert cancel_inflight_queries(timeout=1.0) == 1
+
+        cmd, = client.command.call_args.args
+        assert cmd.startswith("KILL QUERY")
+        assert client.command.call_args.kwargs["parameters"] == {"query_ids": [query_id]}
+        client.close.assert_called_once()
+
+    def test_errors_are_swallowed(self):
+        """Test shutdown is not interrupted when the kill fails."""
+        with patch("chainswarm_core.db.query_tracker.get_client", side_effect=OSError("down")):
+            with inflight_queries.track("SELECT 1"):
+                assert cancel_inflight_queries(timeout=0.1) == 0
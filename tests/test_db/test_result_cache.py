@@ -0,0 +1,123 @@
+"""Tests for chainswarm_core.db.result_cache module."""
+
+import os
+from datetime import date
+from unittest.mock import MagicMock
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from chainswarm_core.db.fingerprint import query_fingerprint
+from chainswarm_core.db.result_cache import ResultCache, is_closed_window
+
+
+def _table(rows: int = 100):
+    return pa.table({"id": list(range(rows)), "amount": [float(i) for i in range(rows)]})
+
+
+@pytest.fixture
+def arrow_client():
+    """Mock client returning an Arrow table."""
+    client = MagicMock()
+    client.database = "analytics_torus"
+    client.url = "http://localhost:8123"
+    client.query_arrow.return_value = _table()
+    return client
+
+
+class TestQueryFingerprint:
+    """Tests for query_fingerprint function."""
+
+    def test_whitespace_insensitive(self):
+        """Test formatting does not change the fingerprint."""
+        assert query_fingerprint("SELECT  1\n FROM t") == query_fingerprint("SELECT 1 FROM t")
+
+    def test_whitespace_in_literals_changes_fingerprint(self):
+        """Test whitespace inside quoted literals is part of the fingerprint."""
+        assert query_fingerprint("SELECT 'a  b'") != query_fingerprint("SELECT 'a b'")
+        assert query_fingerprint("SELECT 'it''s  ok'") != query_fingerprint("SELECT 'it''s ok'")
+        assert query_fingerprint("SELECT  'a  b' ,\n 1") == query_fingerprint("SELECT 'a  b' , 1")
+
+    def test_parameters_and_window_change_fingerprint(self):
+        """Test parameters and extra values are part of the fingerprint."""
+        base = query_fingerprint("SELECT 1", {"a": 1})
+        assert base != query_fingerprint("SELECT 1", {"a": 2})
+        assert base != query_fingerprint("SELECT 1", {"a": 1}, processing_date="2025-01-01")
+
+
+class TestIsClosedWindow:
+    """Tests for is_closed_window function."""
+
+    def test_past_window_is_closed(self):
+        """Test windows before today are closed."""
+        assert is_closed_window("2025-01-01", today=date(2025, 1, 2))
+
+    def test_today_is_open(self):
+        """Test today's window is still open."""
+        assert not is_closed_window("2025-01-02", today=date(2025, 1, 2))
+        assert not is_closed_window(None)
+
+
+class TestResultCache:
+    """Tests for ResultCache class."""
+
+    def test_put_and_get_roundtrip(self, tmp_path):
+        """Test stored tables are read back unchanged."""
+        cache = ResultCache(tmp_path)
+        cache.put("k", _table())
+
+        assert cache.get("k").equals(_table())
+        assert cache.get("missing") is None
+
+    def test_get_or_query_caches_closed_window(self, tmp_path, arrow_client):
+        """Test closed windows hit ClickHouse only once."""
+        cache = ResultCache(tmp_path)
+        for _ in range(2):
+            result = cache.get_or_query(arrow_client, "SELECT * FROM f", processing_date="2020-01-01", window_days=7)
+
+        assert result.num_rows == 100
+        assert arrow_client.query_arrow.call_count == 1
+
+    def test_get_or_query_bypasses_open_window(self, tmp_path, arrow_client):
+        """Test open windows are never cached."""
+        cache = ResultCache(tmp_path)
+        today = date.today().isoformat()
+        for _ in range(2):
+            cache.get_or_query(arrow_client, "SELECT * FROM f", processing_date=today)
+
+        assert arrow_client.query_arrow.call_count == 2
+        assert cache.size_bytes() == 0
+
+    def test_window_is_part_of_key(self, tmp_path, arrow_client):
+        """Test different windows are cached separately."""
+        cache = ResultCache(tmp_path)
+        cache.get_or_query(arrow_client, "SELECT * FROM f", processing_date="2020-01-01", window_days=7)
+        cache.get_or_query(arrow_client, "SELECT * FROM f", processing_date="2020-01-01", window_days=30)
+
+        assert arrow_client.query_arrow.call_count == 2
+
+    def test_settings_and_target_are_part_of_key(self, tmp_path, arrow_client):
+        """Test settings, database and server are cached separately."""
+        cache = ResultCache(tmp_path)
+        window = {"processing_date": "2020-01-01", "window_days": 7}
+        cache.get_or_query(arrow_client, "SELECT * FROM f", **window)
+        cache.get_or_query(arrow_client, "SELECT * FROM f", settings={"final": 1}, **window)
+        arrow_client.database = "analytics_bitcoin"
+        cache.get_or_query(arrow_client, "SELECT * FROM f", **window)
+        arrow_client.url = "http://replica:8123"
+        cache.get_or_query(arrow_client, "SELECT * FROM f", **window)
+
+        assert arrow_client.query_arrow.call_count == 4
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        """Test eviction removes the oldest entries first."""
+        cache = ResultCache(tmp_path, max_bytes=10 ** 9)
+        for i, key in enumerate(["old", "mid", "new"]):
+            path = cache.put(key, _table(1000))
+            os.utime(path, (1000 + i, 1000 + i))
+
+        cache.max_bytes = cache.size_bytes() - 1
+        assert cache.evict() == 1
+        assert cache.get("old") is None
+        assert cache.get("new") is not None
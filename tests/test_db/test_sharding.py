@@ -0,0 +1,141 @@
+"""Tests for chainswarm_core.db.sharding module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.sharding import (
+    AddressPartitioner,
+    ShardSpec,
+    city_hash64,
+    jump_consistent_hash,
+    shard_for_address,
+)
+from chainswarm_core.jobs.models import BaseTaskContext
+from chainswarm_core.jobs.sharding import get_context_shard, shard_contexts
+
+ADDRESSES = [f"5Address{i:040d}" for i in range(2000)]
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "transfers"
+
+
+class TestCityHash64:
+    """Tests for city_hash64 function."""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [
+            ("", 11160318154034397263),
+            ("hello", 2578220239953316063),
+        ],
+    )
+    def test_known_values(self, value, expected):
+        """Test values match ClickHouse cityHash64."""
+        assert city_hash64(value) == expected
+
+    def test_all_length_classes(self):
+        """Test every length branch returns a 64-bit value."""
+        for length in (3, 8, 16, 32, 48, 64, 65, 200):
+            assert 0 <= city_hash64(b"x" * length) < 2 ** 64
+
+    def test_str_and_bytes_agree(self):
+        """Test strings are hashed as UTF-8 bytes."""
+        assert city_hash64("torus") == city_hash64(b"torus")
+
+
+class TestJumpConsistentHash:
+    """Tests for jump_consistent_hash function."""
+
+    def test_single_bucket(self):
+        """Test one bucket always maps to 0."""
+        assert jump_consistent_hash(123456789, 1) == 0
+
+    def test_growing_buckets_moves_few_keys(self):
+        """Test adding a bucket only moves keys to the new bucket."""
+        keys = [city_hash64(a) for a in ADDRESSES]
+        before = [jump_consistent_hash(k, 8) for k in keys]
+        after = [jump_consistent_hash(k, 9) for k in keys]
+        moved = [(b, a) for b, a in zip(before, after) if b != a]
+
+        assert all(a == 8 for _, a in moved)
+        assert len(moved) < len(keys) / 4
+
+    def test_rejects_zero_buckets(self):
+        """Test non-positive bucket count raises ValueError."""
+        with pytest.raises(ValueError):
+            jump_consistent_hash(1, 0)
+
+
+class TestShardSpec:
+    """Tests for ShardSpec and AddressPartitioner."""
+
+    def test_condition_jump(self):
+        """Test jump strategy SQL predicate."""
+        assert ShardSpec(2, 8).condition("from_address") == \
+            "jumpConsistentHash(cityHash64(from_address), 8) = 2"
+
+    def test_condition_modulo(self):
+        """Test modulo strategy SQL predicate."""
+        assert ShardSpec(1, 4, "modulo").condition() == "cityHash64(address) % 4 = 1"
+
+    def test_modulo_matches_hash(self):
+        """Test modulo shard is cityHash64 % N."""
+        assert shard_for_address("hello", 7, "modulo") == 2578220239953316063 % 7
+
+    def test_invalid_index(self):
+        """Test out of range index raises ValueError."""
+        with pytest.raises(ValueError, match="out of range"):
+            ShardSpec(4, 4)
+
+    def test_partition_covers_all_addresses(self):
+        """Test partitioning is complete and roughly balanced."""
+        partitioner = AddressPartitioner(4)
+        shards = partitioner.partition(ADDRESSES)
+
+        assert sum(len(v) for v in shards.values()) == len(ADDRESSES)
+        assert all(350 < len(v) < 650 for v in shards.values())
+        for index, addresses in shards.items():
+            assert all(ShardSpec(index, 4).contains(a) for a in addresses[:20])
+
+
+class TestRepositorySharding:
+    """Tests for sharding in BaseRepository."""
+
+    def test_unsharded_condition(self, mock_clickhouse_client):
+        """Test unsharded repository condition is always true."""
+        assert ConcreteRepository(mock_clickhouse_client)._shard_condition() == "1"
+
+    def test_sharded_condition(self, mock_clickhouse_client):
+        """Test partition_id is used as shard index."""
+        repo = ConcreteRepository(mock_clickhouse_client, partition_id=3, shard_count=8)
+        assert repo.shard == ShardSpec(3, 8)
+        assert repo._shard_condition("to_address") == "jumpConsistentHash(cityHash64(to_address), 8) = 3"
+
+    def test_shard_count_requires_partition_id(self, mock_clickhouse_client):
+        """Test shard_count without partition_id raises ValueError."""
+        with pytest.raises(ValueError, match="partition_id"):
+            ConcreteRepository(mock_clickhouse_client, shard_count=8)
+
+
+class TestShardContexts:
+    """Tests for the job shard fan-out helpers."""
+
+    def test_shard_contexts(self):
+        """Test a context is split into one per shard."""
+        contexts = shard_contexts(BaseTaskContext(network="torus", processing_date="2025-01-01"), 3)
+
+        assert [c["shard_index"] for c in contexts] == [0, 1, 2]
+        assert all(c["shard_count"] == 3 and c["network"] == "torus" for c in contexts)
+        assert BaseTaskContext(**contexts[0]).shard_count == 3
+
+    def test_get_context_shard(self):
+        """Test shard is read back from a context dict."""
+        assert get_context_shard({"network": "torus"}) is None
+        assert get_context_shard({"shard_index": 1, "shard_count": 2}) == ShardSpec(1, 2)
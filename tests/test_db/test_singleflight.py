@@ -0,0 +1,152 @@
+"""Tests for chainswarm_core.db.singleflight module."""
+
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.singleflight import SingleFlight
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "labels"
+
+
+def _run_concurrently(count: int, target) -> list:
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        results[i] = target()
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight class."""
+
+    def test_concurrent_calls_share_one_execution(self):
+        """Test identical concurrent calls run the function once."""
+        flight = SingleFlight()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"value": 42}
+
+        results = _run_concurrently(8, lambda: flight.do("k", slow))
+
+        assert len(calls) == 1
+        assert all(r is results[0] for r in results)
+        assert flight.in_flight() == 0
+
+    def test_sequential_calls_execute_again(self):
+        """Test a finished call is not cached."""
+        flight = SingleFlight()
+        fn = MagicMock(return_value=1)
+        flight.do("k", fn)
+        flight.do("k", fn)
+        assert fn.call_count == 2
+
+    def test_errors_propagate_to_waiters(self):
+        """Test waiting callers see the leader's exception."""
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.05)
+            raise RuntimeError("boom")
+
+        def call():
+            try:
+                flight.do("k", failing)
+            except RuntimeError as e:
+                return str(e)
+
+        assert _run_concurrently(4, call) == ["boom"] * 4
+
+    def test_async_calls_share_one_execution(self):
+        """Test identical concurrent coroutines run once."""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "labels"
+
+        async def main():
+            return await asyncio.gather(*(flight.do_async("k", fetch) for _ in range(5)))
+
+        assert asyncio.run(main()) == ["labels"] * 5
+        assert len(calls) == 1
+
+    def test_async_errors_propagate(self):
+        """Test coroutine errors reach all waiters."""
+        flight = SingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("bad")
+
+        async def main():
+            return await asyncio.gather(
+                *(flight.do_async("k", failing) for _ in range(3)), return_exceptions=True
+            )
+
+        assert all(isinstance(r, ValueError) for r in asyncio.run(main()))
+
+    def test_cancelled_leader_elects_new_one(self):
+        """Test waiters of a cancelled leader run the call themselves instead of being cancelled."""
+        flight = SingleFlight()
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "labels"
+
+        async def main():
+            leader = asyncio.create_task(flight.do_async("k", fetch))
+            await asyncio.sleep(0.01)
+            waiters = [asyncio.create_task(flight.do_async("k", fetch)) for _ in range(3)]
+            await asyncio.sleep(0.01)
+            leader.cancel()
+            results = await asyncio.gather(*waiters)
+            return leader.cancelled(), results
+
+        leader_cancelled, results = asyncio.run(main())
+
+        assert leader_cancelled
+        assert results == ["labels"] * 3
+        assert len(calls) == 2
+
+
+class TestRepositoryQueryShared:
+    """Tests for BaseRepository._query_shared."""
+
+    def test_identical_queries_coalesce(self, mock_clickhouse_client):
+        """Test concurrent identical queries hit the client once."""
+        def slow_query(*args, **kwargs):
+            time.sleep(0.1)
+            return MagicMock()
+
+        mock_clickhouse_client.query.side_effect = slow_query
+        repo = ConcreteRepository(mock_clickhouse_client)
+
+        _run_concurrently(6, lambda: repo._query_shared("SELECT * FROM labels", {"n": "torus"}))
+
+        assert mock_clickhouse_client.query.call_count == 1
@@ -0,0 +1 @@
+"""Tests for chainswarm_core.jobs module."""
\ No newline at end of file
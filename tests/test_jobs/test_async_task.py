@@ -0,0 +1,125 @@
+"""Tests for chainswarm_core.jobs.async_task module."""
+
+import asyncio
+import os
+
+import pytest
+from celery import Celery
+from celery.exceptions import Reject
+
+from chainswarm_core.jobs import async_task as async_task_module
+from chainswarm_core.jobs.async_task import AsyncBaseTask, bounded_gather, get_worker_event_loop
+from chainswarm_core.observability import terminate_event
+
+
+class FanOutTask(AsyncBaseTask):
+    """Task fanning out to many sleeping coroutines."""
+
+    name = "fan_out_task"
+    max_concurrency = 3
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        Celery("test_async_task").register_task(self)
+
+    async def fetch(self, i):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return i * 2
+
+    async def execute_task(self, context):
+        values = await self.gather(self.fetch(i) for i in range(10))
+        return {"network": context["network"], "status": "success", "rows_processed": sum(values)}
+
+
+class SlowTask(AsyncBaseTask):
+    """Task that only finishes when cancelled."""
+
+    name = "slow_task"
+    cancel_check_interval = 0.01
+
+    def __init__(self):
+        self.cancelled = False
+        Celery("test_async_task").register_task(self)
+
+    async def execute_task(self, context):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"network": context["network"], "status": "success"}
+
+
+@pytest.fixture
+def terminate():
+    yield terminate_event
+    terminate_event.clear()
+
+
+class TestWorkerEventLoop:
+    """Tests for get_worker_event_loop function."""
+
+    def test_loop_is_reused(self):
+        """Test the same loop is returned within a process."""
+        assert get_worker_event_loop() is get_worker_event_loop()
+
+    def test_new_loop_after_fork(self, monkeypatch):
+        """Test a different process id gets a fresh loop."""
+        loop = get_worker_event_loop()
+        monkeypatch.setattr(async_task_module, "_loop_pid", os.getpid() + 1)
+        assert get_worker_event_loop() is not loop
+
+
+class TestBoundedGather:
+    """Tests for bounded_gather function."""
+
+    def test_preserves_order(self):
+        """Test results come back in input order."""
+        async def value(i):
+            await asyncio.sleep(0.001 * (5 - i))
+            return i
+
+        assert asyncio.run(bounded_gather((value(i) for i in range(5)), limit=2)) == [0, 1, 2, 3, 4]
+
+    def test_invalid_limit(self):
+        """Test a limit below one raises ValueError."""
+        with pytest.raises(ValueError, match="at least 1"):
+            asyncio.run(bounded_gather([], limit=0))
+
+
+class TestAsyncBaseTask:
+    """Tests for AsyncBaseTask class."""
+
+    def test_runs_coroutine_with_bounded_fan_out(self):
+        """Test execute_task runs on the loop and gather respects max_concurrency."""
+        task = FanOutTask()
+        result = task.run({"network": "torus"})
+
+        assert result["status"] == "success"
+        assert result["rows_processed"] == 90
+        assert task.peak == 3
+
+    def test_loop_survives_between_runs(self):
+        """Test consecutive runs share the per-process loop."""
+        task = FanOutTask()
+        task.run({"network": "torus"})
+        loop = get_worker_event_loop()
+        task.run({"network": "torus"})
+        assert get_worker_event_loop() is loop
+        assert not loop.is_closed()
+
+    def test_terminate_event_cancels_and_requeues(self, terminate):
+        """Test terminate_event cancels the coroutine and rejects with requeue."""
+        task = SlowTask()
+        loop = get_worker_event_loop()
+        loop.call_later(0.02, terminate.set)
+
+        with pytest.raises(Reject) as excinfo:
+            task.run({"network": "torus"})
+
+        assert excinfo.value.requeue
+        assert task.cancelled
@@ -0,0 +1,90 @@
+"""Tests for chainswarm_core.jobs.batching module."""
+
+import pytest
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.batching import AdaptiveBatchSizer, BatchMeasurement
+
+
+class ConcreteTask(BaseTask):
+    """Concrete task for testing."""
+
+    name = "test_task"
+
+    def execute_task(self, context):
+        return {}
+
+
+class TestAdaptiveBatchSizer:
+    """Tests for AdaptiveBatchSizer class."""
+
+    def test_rejects_invalid_bounds(self):
+        """Test min larger than max raises ValueError."""
+        with pytest.raises(ValueError, match="Invalid batch size bounds"):
+            AdaptiveBatchSizer(min_size=10, max_size=5)
+
+    def test_initial_size_is_clamped(self):
+        """Test initial size respects bounds."""
+        assert AdaptiveBatchSizer(initial_size=50, min_size=100, max_size=1000).size == 100
+
+    def test_additive_increase_when_fast(self):
+        """Test fast batches grow the size by the step."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000,
+                                   target_seconds=1.0, increase_step=500)
+        assert sizer.record(BatchMeasurement(size=1000, rows=1000, duration=0.1)) == 1500
+
+    def test_multiplicative_decrease_when_slow(self):
+        """Test slow batches halve the size."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000, target_seconds=1.0)
+        assert sizer.record(BatchMeasurement(size=1000, rows=1000, duration=2.0)) == 500
+
+    def test_decrease_when_rss_too_high(self):
+        """Test memory pressure shrinks the size."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000,
+                                   max_rss_bytes=1024)
+        assert sizer.record(BatchMeasurement(size=1000, rows=1000, duration=0.1, rss_bytes=4096)) == 500
+
+    def test_hold_when_throughput_drops(self):
+        """Test size is held when a larger batch lowers throughput."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000,
+                                   target_seconds=10.0, increase_step=1000)
+        sizer.record(BatchMeasurement(size=1000, rows=1000, duration=0.1))
+        assert sizer.record(BatchMeasurement(size=2000, rows=2000, duration=1.0)) == 2000
+
+    def test_partial_batch_does_not_adjust(self):
+        """Test the last, partial batch keeps the size."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000)
+        assert sizer.record(BatchMeasurement(size=1000, rows=10, duration=0.01)) == 1000
+
+    def test_fixed_sizer_never_changes(self):
+        """Test fixed sizer ignores measurements."""
+        sizer = AdaptiveBatchSizer.fixed(250)
+        sizer.record(BatchMeasurement(size=250, rows=250, duration=100.0))
+        assert sizer.size == 250
+
+    def test_measure_records_batch(self):
+        """Test measure() records duration and adjusts the size."""
+        sizer = AdaptiveBatchSizer(initial_size=1000, min_size=100, max_size=10_000, increase_step=100)
+        with sizer.measure() as batch:
+            batch.rows = batch.size
+
+        assert sizer.last.duration > 0
+        assert sizer.last.rss_bytes > 0
+        assert sizer.size == 1100
+
+
+class TestBaseTaskBatchSizer:
+    """Tests for BaseTask.get_batch_sizer."""
+
+    def test_fixed_when_batch_size_given(self):
+        """Test an explicit batch_size pins the size."""
+        sizer = ConcreteTask().get_batch_sizer({"network": "torus", "batch_size": 5000})
+        assert sizer.is_fixed
+        assert sizer.size == 5000
+
+    def test_adaptive_when_batch_size_none(self):
+        """Test batch_size=None gives an adaptive sizer."""
+        sizer = ConcreteTask().get_batch_sizer({"network": "torus", "batch_size": None})
+        assert not sizer.is_fixed
+        assert sizer.size == ConcreteTask.batch_size_initial
+        assert sizer.metric_labels == {"task": "test_task", "network": "torus"}
@@ -0,0 +1,188 @@
+"""Tests for chainswarm_core.jobs.celery module."""
+
+import json
+
+import pytest
+from celery.schedules import crontab
+
+from chainswarm_core.constants import networks
+from chainswarm_core.jobs.celery import (
+    MAX_STAGGER_COUNTDOWN,
+    _expand_networks,
+    _schedule_interval_seconds,
+    _shift_cron,
+    load_beat_schedule,
+)
+
+
+@pytest.fixture
+def write_schedule(tmp_path, monkeypatch):
+    monkeypatch.delenv("CELERY_BEAT_SCHEDULE_PATH", raising=False)
+
+    def write(schedule):
+        path = tmp_path / "beat_schedule.json"
+        path.write_text(json.dumps(schedule))
+        return str(path)
+
+    return write
+
+
+class TestShiftCron:
+    """Tests for _shift_cron function."""
+
+    def test_shifts_numeric_minute(self):
+        """Test whole minutes move the minute field and seconds remain as countdown."""
+        assert _shift_cron("0 * * * *", 930) == ("15 * * * *", 30)
+
+    def test_wraps_hourly_schedule(self):
+        """Test hourly schedules wrap the minute within the hour."""
+        assert _shift_cron("50 * * * *", 1200) == ("10 * * * *", 0)
+
+    def test_carries_into_hour(self):
+        """Test daily schedules carry the shift into the hour field."""
+        assert _shift_cron("50 2 * * *", 1200) == ("10 3 * * *", 0)
+
+    def test_wraps_into_next_day(self):
+        """Test a single daily run wraps past midnight."""
+        assert _shift_cron("50 23 * * *", 1200) == ("10 0 * * *", 0)
+
+    def test_shifts_minute_lists(self):
+        """Test step and list minute fields are shifted value by value."""
+        assert _shift_cron("*/15 * * * *", 300) == ("5,20,35,50 * * * *", 0)
+        assert _shift_cron("0,30 2 * * *", 600) == ("10,40 2 * * *", 0)
+
+    def test_shifts_hour_lists_and_steps(self):
+        """Test every run of an hour list or step moves into the cron fields."""
+        assert _shift_cron("0 2,14 * * *", 10800) == ("0 5,17 * * *", 0)
+        assert _shift_cron("0 */2 * * *", 3600) == ("0 1,3,5,7,9,11,13,15,17,19,21,23 * * *", 0)
+
+    def test_moves_day_of_week_past_midnight(self):
+        """Test runs crossing midnight move to the next day of the week."""
+        assert _shift_cron("0 23 * * 1", 21600) == ("0 5 * * 2", 0)
+        assert _shift_cron("0 23 * * 6", 3600) == ("0 0 * * 0", 0)
+
+    def test_refuses_unexpressible_shifts(self):
+        """Test shifts that one cron entry cannot express return None."""
+        assert _shift_cron("0,30 2 * * *", 2400) is None
+        assert _shift_cron("30 6 1 * *", 64800) is None
+        assert _shift_cron("30 * * * 1", 3600) is None
+
+
+class TestScheduleInterval:
+    """Tests for _schedule_interval_seconds function."""
+
+    @pytest.mark.parametrize("schedule, seconds", [
+        ("0 * * * *", 3600),
+        ("0,30 * * * *", 1800),
+        ("*/5 * * * *", 300),
+        ("0 2 * * *", 86400),
+        ("0 */6 * * *", 21600),
+        ("0 2,14 * * *", 43200),
+        ("0 23 * * 1", 7 * 86400),
+        ("0 3 * * 1,4", 3 * 86400),
+        ("30 6 1 * *", 63000),
+        (120, 120),
+    ])
+    def test_interval(self, schedule, seconds):
+        """Test the interval is derived from the cron fields or the interval schedule."""
+        assert _schedule_interval_seconds(schedule) == seconds
+
+
+class TestLoadBeatSchedule:
+    """Tests for load_beat_schedule function."""
+
+    def test_plain_entries(self, write_schedule):
+        """Test cron strings become crontab objects and args tuples."""
+        schedule = load_beat_schedule(write_schedule({
+            "hourly": {"task": "t", "schedule": "0 * * * *", "args": [{"network": "torus"}]},
+        }))
+
+        assert schedule["hourly"]["schedule"] == crontab(minute="0")
+        assert schedule["hourly"]["args"] == ({"network": "torus"},)
+
+    def test_expands_networks_evenly(self, write_schedule):
+        """Test a networks list expands into evenly staggered entries."""
+        schedule = load_beat_schedule(write_schedule({
+            "features": {
+                "task": "t",
+                "schedule": "0 * * * *",
+                "networks": ["torus", "bitcoin", "polkadot", "bittensor"],
+                "args": [{"window_days": 7}],
+            },
+        }))
+
+        assert list(schedule) == ["features:torus", "features:bitcoin", "features:polkadot", "features:bittensor"]
+        assert schedule["features:bitcoin"]["args"] == ({"window_days": 7, "network": "bitcoin"},)
+        minutes = [schedule[name]["schedule"] for name in schedule]
+        assert minutes == [crontab(minute=str(m)) for m in (0, 15, 30, 45)]
+        assert "networks" not in schedule["features:torus"]
+
+    def test_countdown_for_interval_schedule(self, write_schedule):
+        """Test non-cron schedules are staggered with a countdown option."""
+        schedule = load_beat_schedule(write_schedule({
+            "sync": {"task": "t", "schedule": 60, "networks": ["torus", "bitcoin"]},
+        }))
+
+        assert "options" not in schedule["sync:torus"]
+        assert schedule["sync:bitcoin"]["options"] == {"countdown": 30}
+        assert schedule["sync:bitcoin"]["args"] == ({"network": "bitcoin"},)
+
+    def test_long_countdown_is_scaled_down(self, write_schedule):
+        """Test countdowns stay within MAX_STAGGER_COUNTDOWN, below the broker visibility timeout."""
+        schedule = load_beat_schedule(write_schedule({
+            "daily": {"task": "t", "schedule": 86400, "networks": ["torus", "bitcoin"]},
+            "monthly": {"task": "t", "schedule": "0,30 23 1 * *", "networks": ["torus", "bitcoin", "polkadot"]},
+        }))
+
+        assert schedule["daily:bitcoin"]["options"] == {"countdown": MAX_STAGGER_COUNTDOWN // 2}
+        assert schedule["monthly:bitcoin"]["schedule"] == crontab(minute="10,40", hour="23", day_of_month="1")
+        for entry in schedule.values():
+            assert entry.get("options", {}).get("countdown", 0) <= MAX_STAGGER_COUNTDOWN
+
+    def test_spreads_weekly_schedule_over_the_week(self, write_schedule):
+        """Test a day-of-week schedule is spread over the week with the day moved along."""
+        schedule = load_beat_schedule(write_schedule({
+            "weekly": {"task": "t", "schedule": "0 23 * * 1", "networks": ["torus", "bitcoin"]},
+        }))
+
+        assert schedule["weekly:torus"]["schedule"] == crontab(minute="0", hour="23", day_of_week="1")
+        assert schedule["weekly:bitcoin"]["schedule"] == crontab(minute="0", hour="11", day_of_week="5")
+        assert "options" not in schedule["weekly:bitcoin"]
+
+    def test_all_networks_with_jitter(self, write_schedule):
+        """Test "all" expands to every known network with offsets inside the window."""
+        schedule = load_beat_schedule(write_schedule({
+            "sync": {"task": "t", "schedule": "*/5 * * * *", "networks": "all", "stagger": "jitter"},
+        }))
+
+        assert len(schedule) == len(networks)
+        for entry in schedule.values():
+            assert 0 <= entry.get("options", {}).get("countdown", 0) < 60
+
+    def test_spreads_over_cron_interval(self, write_schedule):
+        """Test the default window is the gap between cron runs."""
+        schedule = load_beat_schedule(write_schedule({
+            "x": {"task": "t", "schedule": "0,30 * * * *", "networks": ["torus", "bitcoin", "polkadot"]},
+        }))
+
+        assert [entry["schedule"] for entry in schedule.values()] == [
+            crontab(minute="0,30"), crontab(minute="10,40"), crontab(minute="20,50")
+        ]
+
+    def test_invalid_entry_is_skipped(self, write_schedule):
+        """Test one invalid entry is skipped without dropping the others."""
+        schedule = load_beat_schedule(write_schedule({
+            "bad": {"task": "t", "schedule": "0 * * * *", "networks": ["torus"], "stagger": "random"},
+            "good": {"task": "t", "schedule": "0 * * * *", "networks": ["torus"]},
+        }))
+
+        assert list(schedule) == ["good:torus"]
+
+    @pytest.mark.parametrize("entry", [
+        {"networks": "torus"},
+        {"networks": ["torus"], "args": ["torus", 7]},
+    ])
+    def test_invalid_network_entries(self, entry):
+        """Test a networks string other than "all" and a non-dict first arg are rejected."""
+        with pytest.raises(ValueError):
+            _expand_networks("x", {"task": "t", "schedule": "0 * * * *", **entry})
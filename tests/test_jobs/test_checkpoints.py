@@ -0,0 +1,178 @@
+"""Tests for chainswarm_core.jobs.checkpoints module."""
+
+import json
+from unittest.mock import MagicMock
+
+import pytest
+from celery import Celery
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.checkpoints import (
+    ClickHouseCheckpointStore,
+    FileCheckpointStore,
+    InMemoryCheckpointStore,
+    RedisCheckpointStore,
+    checkpoint_key,
+)
+from chainswarm_core.jobs.models import BaseTaskContext
+from chainswarm_core.jobs.watermarks import InMemoryWatermarkStore
+
+
+class BatchedTask(BaseTask):
+    """Task summing its batches, optionally failing at one of them."""
+
+    name = "batched_task"
+
+    def __init__(self, store, fail_at=None):
+        self.checkpoint_store = store
+        self.fail_at = fail_at
+        self.processed = []
+        Celery("test_checkpoints").register_task(self)
+
+    def process(self, batch):
+        if batch == self.fail_at:
+            raise MemoryError("killed")
+        self.processed.append(batch)
+        return {"rows": batch}
+
+    def execute_task(self, context):
+        results = self.run_batches(context, range(5), self.process)
+        return {"network": context["network"], "status": "success", "rows": sum(r["rows"] for r in results)}
+
+
+class TestCheckpointKey:
+    """Tests for checkpoint_key function."""
+
+    def test_stable_for_equal_contexts(self):
+        """Test key order and dataclass vs dict do not change the key."""
+        context = BaseTaskContext(network="torus", processing_date="2024-01-01")
+        assert checkpoint_key("t", context) == checkpoint_key("t", dict(reversed(list(vars(context).items()))))
+
+    def test_differs_per_task_and_context(self):
+        """Test different tasks and contexts get different keys."""
+        key = checkpoint_key("t", {"network": "torus"})
+        assert key.startswith("t:")
+        assert key != checkpoint_key("u", {"network": "torus"})
+        assert key != checkpoint_key("t", {"network": "bitcoin"})
+
+
+class TestFileCheckpointStore:
+    """Tests for FileCheckpointStore class."""
+
+    def test_save_load_clear(self, tmp_path):
+        """Test checkpoints round trip and are cleared."""
+        store = FileCheckpointStore(tmp_path)
+        store.save("t:abc", 0, {"rows": 1})
+        store.save("t:abc", 1, [1, 2])
+
+        assert store.load("t:abc") == {0: {"rows": 1}, 1: [1, 2]}
+        store.clear("t:abc")
+        assert store.load("t:abc") == {}
+
+    def test_truncated_line_is_ignored(self, tmp_path):
+        """Test a partially written line from a crash is skipped."""
+        store = FileCheckpointStore(tmp_path)
+        store.save("t:abc", 0, 1)
+        with store._path("t:abc").open("a") as f:
+            f.write('{"index": 1, "res')
+
+        assert store.load("t:abc") == {0: 1}
+
+
+class TestRedisCheckpointStore:
+    """Tests for RedisCheckpointStore class."""
+
+    def test_save_uses_hash_with_ttl(self):
+        """Test saves write a hash field and refresh the expiry."""
+        client = MagicMock()
+        store = RedisCheckpointStore(client=client, ttl_seconds=60)
+
+        store.save("t:abc", 3, {"rows": 1})
+
+        pipe = client.pipeline.return_value
+        pipe.hset.assert_called_once_with("chainswarm:checkpoint:t:abc", "3", json.dumps({"rows": 1}))
+        pipe.expire.assert_called_once_with("chainswarm:checkpoint:t:abc", 60)
+        pipe.execute.assert_called_once()
+
+    def test_load_decodes_entries(self):
+        """Test hash entries are decoded by batch index."""
+        client = MagicMock()
+        client.hgetall.return_value = {b"0": b'{"rows": 1}', b"2": b"5"}
+
+        assert RedisCheckpointStore(client=client).load("t:abc") == {0: {"rows": 1}, 2: 5}
+
+
+class TestClickHouseCheckpointStore:
+    """Tests for ClickHouseCheckpointStore class."""
+
+    def test_load_and_save(self, mock_clickhouse_client):
+        """Test rows are inserted and decoded by batch index."""
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[(0, '{"rows": 1}')])
+        store = ClickHouseCheckpointStore(mock_clickhouse_client)
+
+        store.save("t:abc", 1, {"rows": 2})
+        assert store.load("t:abc") == {0: {"rows": 1}}
+        mock_clickhouse_client.insert.assert_called_once_with(
+            "task_checkpoints", [["t:abc", 1, '{"rows": 2}']], column_names=["key", "batch_index", "result"]
+        )
+
+    def test_clear_deletes_key(self, mock_clickhouse_client):
+        """Test clear issues a delete for the key."""
+        ClickHouseCheckpointStore(mock_clickhouse_client).clear("t:abc")
+        assert mock_clickhouse_client.command.call_args[1]["parameters"] == {"key": "t:abc"}
+
+
+class TestBaseTaskRunBatches:
+    """Tests for BaseTask.run_batches."""
+
+    def test_without_store_processes_everything(self):
+        """Test run_batches without a store is a plain loop."""
+        task = BatchedTask(None)
+        assert task.run({"network": "torus"})["rows"] == 10
+        assert task.processed == [0, 1, 2, 3, 4]
+
+    def test_redelivery_skips_completed_batches(self):
+        """Test a redelivered task only reprocesses the failed batch."""
+        store = InMemoryCheckpointStore()
+        context = {"network": "torus", "processing_date": "2024-01-01"}
+
+        failing = BatchedTask(store, fail_at=3)
+        with pytest.raises(MemoryError):
+            failing.run(context)
+        assert failing.processed == [0, 1, 2]
+
+        retry = BatchedTask(store)
+        result = retry.run(context)
+
+        assert retry.processed == [3, 4]
+        assert result["rows"] == 10
+
+    def test_redelivery_with_moved_upper_bound(self):
+        """Test checkpoints are found when the watermark upper bound moved between deliveries."""
+        store = InMemoryCheckpointStore()
+        watermarks = InMemoryWatermarkStore()
+        context = {"network": "torus"}
+
+        failing = BatchedTask(store, fail_at=3)
+        failing.watermark_store = watermarks
+        failing.get_watermark_upper_bound = lambda context: 100
+        with pytest.raises(MemoryError):
+            failing.run(context)
+
+        retry = BatchedTask(store)
+        retry.watermark_store = watermarks
+        retry.get_watermark_upper_bound = lambda context: 150
+        retry.run(context)
+
+        assert retry.processed == [3, 4]
+        assert store.load(checkpoint_key("batched_task", context)) == {}
+
+    def test_checkpoints_cleared_after_success(self):
+        """Test a successful run removes its checkpoints."""
+        store = InMemoryCheckpointStore()
+        context = {"network": "torus"}
+        task = BatchedTask(store)
+
+        task.run(context)
+
+        assert store.load(checkpoint_key("batched_task", context)) == {}
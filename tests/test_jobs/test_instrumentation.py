@@ -0,0 +1,145 @@
+"""Tests for chainswarm_core.jobs.instrumentation module."""
+
+import time
+from datetime import datetime, timezone
+
+import pytest
+from celery import Celery
+from celery.signals import before_task_publish
+
+from chainswarm_core.jobs import instrumentation
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.instrumentation import PUBLISHED_AT_HEADER, measure_task
+from chainswarm_core.observability.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    metrics_registry = MetricsRegistry("test-instrumentation")
+    monkeypatch.setattr(instrumentation, "get_default_metrics_registry", lambda: metrics_registry)
+    return metrics_registry.registry
+
+
+class RowsTask(BaseTask):
+    """Task reporting processed rows."""
+
+    name = "rows_task"
+
+    def __init__(self):
+        Celery("test_instrumentation").register_task(self)
+
+    def execute_task(self, context):
+        if context.get("fail"):
+            raise RuntimeError("boom")
+        return {"network": context["network"], "status": "success", "rows_processed": 42}
+
+
+class TestPublishedAtHeader:
+    """Tests for the publish timestamp header."""
+
+    def test_stamped_on_publish(self):
+        """Test before_task_publish stamps the current time."""
+        headers = {}
+        before_task_publish.send(sender="t", body=None, headers=headers)
+        assert abs(headers[PUBLISHED_AT_HEADER] - time.time()) < 5
+
+    def test_existing_value_is_kept(self):
+        """Test a retried message keeps its original publish time."""
+        headers = {PUBLISHED_AT_HEADER: 1.0}
+        before_task_publish.send(sender="t", body=None, headers=headers)
+        assert headers[PUBLISHED_AT_HEADER] == 1.0
+
+
+class TestMeasureTask:
+    """Tests for measure_task context manager."""
+
+    def test_records_metrics(self, registry):
+        """Test queue wait, duration, RSS delta and rows are recorded."""
+        labels = {"task": "t", "network": "torus"}
+        with measure_task("t", "torus", published_at=time.time() - 2) as measurement:
+            measurement.result = {"status": "success", "rows_processed": 10}
+
+        assert measurement.queue_wait >= 2
+        assert measurement.rows_processed == 10
+        assert registry.get_sample_value("task_queue_wait_seconds_count", labels) == 1
+        assert registry.get_sample_value("task_duration_seconds_count", {**labels, "status": "success"}) == 1
+        assert registry.get_sample_value("task_peak_rss_delta_bytes_count", labels) == 1
+        assert registry.get_sample_value("task_rows_processed_total", labels) == 10
+
+    def test_peak_reset_only_when_running_alone(self, registry, monkeypatch):
+        """Test overlapping tasks neither reset the process peak RSS nor report it."""
+        resets = []
+        monkeypatch.setattr(instrumentation, "reset_peak_rss", lambda: resets.append(1) or True)
+        monkeypatch.setattr(instrumentation, "get_peak_rss_bytes", lambda: 10 ** 12)
+
+        with measure_task("outer", "torus") as outer:
+            with measure_task("inner", "torus") as inner:
+                pass
+
+        assert resets == [1]
+        assert inner.peak_rss_delta < 10 ** 11
+        assert outer.peak_rss_delta < 10 ** 11
+
+        with measure_task("alone", "torus") as alone:
+            pass
+
+        assert resets == [1, 1]
+        assert alone.peak_rss_delta > 10 ** 11
+
+    def test_queue_wait_counted_from_eta(self, registry):
+        """Test a task scheduled with an eta only waits from its eta."""
+        published_at = time.time() - 60
+        eta = datetime.fromtimestamp(time.time() - 1, tz=timezone.utc)
+
+        with measure_task("t", "torus", published_at=published_at, eta=eta.isoformat()) as measurement:
+            pass
+
+        assert 1 <= measurement.queue_wait < 30
+
+    def test_future_eta_counts_no_wait(self, registry):
+        """Test an eta in the future (early delivery) records no wait."""
+        eta = datetime.fromtimestamp(time.time() + 60, tz=timezone.utc)
+        with measure_task("t", "torus", published_at=time.time() - 60, eta=eta) as measurement:
+            pass
+
+        assert measurement.queue_wait == 0
+
+    def test_records_errors(self, registry):
+        """Test exceptions are recorded with status error."""
+        with pytest.raises(ValueError):
+            with measure_task("t", "torus"):
+                raise ValueError("boom")
+
+        labels = {"task": "t", "network": "torus", "status": "error"}
+        assert registry.get_sample_value("task_duration_seconds_count", labels) == 1
+        assert registry.get_sample_value("task_queue_wait_seconds_count", {"task": "t", "network": "torus"}) is None
+
+    def test_without_registry(self, monkeypatch):
+        """Test measuring works without a metrics registry."""
+        monkeypatch.setattr(instrumentation, "get_default_metrics_registry", lambda: None)
+        with measure_task("t", None) as measurement:
+            measurement.result = {"status": "failed"}
+        assert measurement.status == "failed"
+        assert measurement.network == "unknown"
+
+
+class TestBaseTaskInstrumentation:
+    """Tests for metrics recorded by BaseTask.run."""
+
+    def test_run_records_rows(self, registry):
+        """Test rows_processed of the result is counted per task and network."""
+        task = RowsTask()
+        task.run({"network": "torus"})
+        task.run({"network": "torus"})
+
+        labels = {"task": "rows_task", "network": "torus"}
+        assert registry.get_sample_value("task_rows_processed_total", labels) == 84
+        assert registry.get_sample_value("task_duration_seconds_count", {**labels, "status": "success"}) == 2
+
+    def test_run_records_failures(self, registry):
+        """Test failing runs are recorded with status error."""
+        with pytest.raises(RuntimeError):
+            RowsTask().run({"network": "torus", "fail": True})
+
+        labels = {"task": "rows_task", "network": "torus", "status": "error"}
+        assert registry.get_sample_value("task_duration_seconds_count", labels) == 1
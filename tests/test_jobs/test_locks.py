@@ -0,0 +1,215 @@
+"""Tests for chainswarm_core.jobs.locks module."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+from celery import Celery
+from celery.exceptions import Retry
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.locks import (
+    InMemoryTaskLock,
+    LeaseRenewer,
+    LockLostError,
+    RedisTaskLock,
+    ensure_lease_held,
+    hold_lock,
+)
+from chainswarm_core.jobs.watermarks import InMemoryWatermarkStore
+
+
+class LockedTask(BaseTask):
+    """Task that blocks until released, to simulate a long run."""
+
+    name = "locked_task"
+
+    def __init__(self, lock, on_collision="skip"):
+        self.task_lock = lock
+        self.lock_on_collision = on_collision
+        self.started = threading.Event()
+        self.release = threading.Event()
+        Celery("test_locks").register_task(self)
+
+    def execute_task(self, context):
+        self.started.set()
+        self.release.wait(5)
+        return {"network": context["network"], "status": "success"}
+
+
+class StolenLockTask(BaseTask):
+    """Task whose lock is taken over by another holder after the first batch."""
+
+    name = "stolen_lock_task"
+    lock_ttl_seconds = 0.06
+
+    def __init__(self, lock, watermarks):
+        self.task_lock = lock
+        self.watermark_store = watermarks
+        self.processed = []
+        Celery("test_locks").register_task(self)
+
+    def get_watermark_upper_bound(self, context):
+        return 100
+
+    def process(self, batch):
+        if batch == 1:
+            key = self.get_lock_key({"network": "torus"})
+            self.task_lock._leases[key] = ("other-worker", time.monotonic() + 10)
+            time.sleep(0.1)
+        self.processed.append(batch)
+
+    def execute_task(self, context):
+        self.run_batches(context, range(5), self.process)
+        return {"network": context["network"], "status": "success"}
+
+
+class TestInMemoryTaskLock:
+    """Tests for InMemoryTaskLock class."""
+
+    def test_acquire_is_exclusive_until_release(self):
+        """Test a held lock cannot be acquired again."""
+        lock = InMemoryTaskLock()
+        token = lock.acquire("k", 10)
+
+        assert token is not None
+        assert lock.acquire("k", 10) is None
+        assert not lock.release("k", "other-token")
+        assert lock.release("k", token)
+        assert lock.acquire("k", 10) is not None
+
+    def test_lease_expires(self):
+        """Test an unrenewed lease can be taken over."""
+        lock = InMemoryTaskLock()
+        token = lock.acquire("k", 0.01)
+        time.sleep(0.02)
+
+        assert lock.acquire("k", 10) is not None
+        assert not lock.renew("k", token, 10)
+
+
+class TestRedisTaskLock:
+    """Tests for RedisTaskLock class."""
+
+    def test_acquire_uses_set_nx_px(self):
+        """Test acquire issues SET NX PX with a token."""
+        client = MagicMock()
+        client.set.return_value = True
+        lock = RedisTaskLock(client=client)
+
+        token = lock.acquire("k", 1.5)
+
+        client.set.assert_called_once_with("chainswarm:lock:k", token, nx=True, px=1500)
+
+    def test_acquire_returns_none_when_held(self):
+        """Test a failed SET NX means the lock is held."""
+        client = MagicMock()
+        client.set.return_value = None
+        assert RedisTaskLock(client=client).acquire("k", 1) is None
+
+    def test_renew_and_release_run_scripts(self):
+        """Test renew and release go through the token-checked scripts."""
+        client = MagicMock()
+        renew_script, release_script = MagicMock(return_value=1), MagicMock(return_value=0)
+        client.register_script.side_effect = [renew_script, release_script]
+        lock = RedisTaskLock(client=client)
+
+        assert lock.renew("k", "token", 2)
+        assert not lock.release("k", "token")
+        renew_script.assert_called_once_with(keys=["chainswarm:lock:k"], args=["token", 2000])
+        release_script.assert_called_once_with(keys=["chainswarm:lock:k"], args=["token"])
+
+
+class TestHoldLock:
+    """Tests for hold_lock and LeaseRenewer."""
+
+    def test_renews_while_held_and_releases(self):
+        """Test the lease outlives its TTL while held and is released afterwards."""
+        lock = InMemoryTaskLock()
+        with hold_lock(lock, "k", 0.06) as acquired:
+            assert acquired
+            time.sleep(0.15)
+            assert lock.acquire("k", 1) is None
+        assert lock.acquire("k", 1) is not None
+
+    def test_yields_false_when_held(self):
+        """Test a held key yields False without releasing the other holder."""
+        lock = InMemoryTaskLock()
+        token = lock.acquire("k", 10)
+        with hold_lock(lock, "k", 10) as acquired:
+            assert not acquired
+        assert lock.renew("k", token, 10)
+
+    def test_renewer_detects_lost_lease(self):
+        """Test the renewer stops when the lease was taken over."""
+        lock = InMemoryTaskLock()
+        renewer = LeaseRenewer(lock, "k", "stale-token", 0.03)
+        renewer.start()
+        renewer.join(1)
+        assert renewer.lost
+
+
+    def test_ensure_lease_held(self):
+        """Test ensure_lease_held raises only inside a block whose lease was lost."""
+        lock = InMemoryTaskLock()
+        ensure_lease_held()
+        with hold_lock(lock, "k", 0.06) as acquired:
+            assert acquired
+            ensure_lease_held()
+            lock._leases["k"] = ("other-worker", time.monotonic() + 10)
+            time.sleep(0.1)
+            with pytest.raises(LockLostError):
+                ensure_lease_held()
+
+
+class TestBaseTaskLocking:
+    """Tests for BaseTask overlap prevention."""
+
+    def test_lost_lease_stops_batches_and_watermark(self):
+        """Test a task stops before the next batch and commits no watermark once its lease is lost."""
+        watermarks = InMemoryWatermarkStore()
+        task = StolenLockTask(InMemoryTaskLock(), watermarks)
+
+        with pytest.raises(LockLostError):
+            task.run({"network": "torus"})
+
+        assert task.processed == [0, 1]
+        assert watermarks.get("stolen_lock_task", "torus") is None
+
+    def test_duplicate_run_is_skipped(self):
+        """Test a second run of the same context is skipped while the first runs."""
+        lock = InMemoryTaskLock()
+        task = LockedTask(lock)
+        context = {"network": "torus", "processing_date": "2024-01-01"}
+        results = []
+
+        first = threading.Thread(target=lambda: results.append(task.run(context)))
+        first.start()
+        task.started.wait(1)
+
+        duplicate = task.run(context)
+        task.release.set()
+        first.join()
+
+        assert duplicate["status"] == "skipped"
+        assert duplicate["processing_date"] == "2024-01-01"
+        assert results[0]["status"] == "success"
+
+    def test_other_context_is_not_blocked(self):
+        """Test runs for other contexts proceed."""
+        lock = InMemoryTaskLock()
+        task = LockedTask(lock)
+        task.release.set()
+        lock.acquire(task.get_lock_key({"network": "bitcoin"}), 10)
+
+        assert task.run({"network": "torus"})["status"] == "success"
+
+    def test_duplicate_run_is_retried(self):
+        """Test retry mode re-queues the duplicate."""
+        lock = InMemoryTaskLock()
+        task = LockedTask(lock, on_collision="retry")
+        lock.acquire(task.get_lock_key({"network": "torus"}), 10)
+
+        with pytest.raises(Retry):
+            task.run({"network": "torus"})
@@ -0,0 +1,199 @@
+"""Tests for chainswarm_core.jobs.offload module."""
+
+import json
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+from celery import Celery
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.offload import (
+    ClickHouseBlobStore,
+    LazyResult,
+    LocalBlobStore,
+    ResultOffloader,
+    is_result_reference,
+    resolve_result,
+)
+
+
+def large_result(rows=1000):
+    return {
+        "network": "torus",
+        "status": "success",
+        "features": [{"address": f"addr-{i}", "value": i} for i in range(rows)],
+    }
+
+
+class LargeResultTask(BaseTask):
+    """Task returning a large result."""
+
+    name = "large_result_task"
+
+    def __init__(self, offloader):
+        self.result_offloader = offloader
+        Celery("test_offload").register_task(self)
+
+    def execute_task(self, context):
+        return large_result()
+
+
+class TestLocalBlobStore:
+    """Tests for LocalBlobStore class."""
+
+    def test_put_get_delete(self, tmp_path):
+        """Test blobs round trip and missing keys raise KeyError."""
+        store = LocalBlobStore(tmp_path)
+        store.put("task/abc", b"data")
+
+        assert store.get("task/abc") == b"data"
+        store.delete("task/abc")
+        with pytest.raises(KeyError):
+            store.get("task/abc")
+
+    def test_purge_removes_old_blobs(self, tmp_path):
+        """Test purge removes only blobs older than the given age."""
+        store = LocalBlobStore(tmp_path)
+        store.put("old", b"1")
+        store.put("new", b"2")
+        old_time = time.time() - 3600
+        os.utime(store._path("old"), (old_time, old_time))
+
+        assert store.purge(60) == 1
+        assert store.get("new") == b"2"
+
+    def test_expired_blobs_are_missing_and_purged_on_put(self, tmp_path):
+        """Test blobs older than ttl_seconds are not served and are removed by later writes."""
+        store = LocalBlobStore(tmp_path, ttl_seconds=60)
+        store.put("old", b"1")
+        old_time = time.time() - 3600
+        os.utime(store._path("old"), (old_time, old_time))
+
+        with pytest.raises(KeyError):
+            store.get("old")
+
+        store.put("stale", b"2")
+        os.utime(store._path("stale"), (old_time, old_time))
+        store._purged_at = float("-inf")
+        store.put("new", b"3")
+
+        assert not store._path("stale").exists()
+        assert store.get("new") == b"3"
+
+
+class TestClickHouseBlobStore:
+    """Tests for ClickHouseBlobStore class."""
+
+    def test_put_and_get(self, mock_clickhouse_client):
+        """Test blobs are inserted and read back as bytes."""
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[(b"data",)])
+        store = ClickHouseBlobStore(mock_clickhouse_client)
+
+        store.put("k", b"data")
+        assert store.get("k") == b"data"
+        mock_clickhouse_client.insert.assert_called_once_with("task_result_blobs", [["k", b"data"]], column_names=["key", "data"])
+        assert mock_clickhouse_client.query.call_args[1]["query_formats"] == {"String": "bytes"}
+
+    def test_missing_key(self, mock_clickhouse_client):
+        """Test a missing blob raises KeyError."""
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[])
+        with pytest.raises(KeyError):
+            ClickHouseBlobStore(mock_clickhouse_client).get("k")
+
+
+class TestResultOffloader:
+    """Tests for ResultOffloader class."""
+
+    def test_small_results_are_kept(self, tmp_path):
+        """Test results below the threshold are returned unchanged."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = {"network": "torus", "status": "success"}
+        assert offloader.offload(result) is result
+
+    def test_large_results_become_references(self, tmp_path):
+        """Test large results are stored and replaced by a small reference."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = large_result()
+
+        reference = offloader.offload(result, key="task/1")
+
+        assert is_result_reference(reference)
+        assert reference["key"] == "task/1"
+        assert reference["status"] == "success"
+        assert "features" not in reference
+        assert offloader.resolve(reference) == result
+        assert resolve_result(reference, LocalBlobStore(tmp_path)) == result
+
+    def test_lazy_result_loads_on_demand(self, tmp_path):
+        """Test LazyResult serves reference fields without loading the blob."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        lazy = offloader.lazy(offloader.offload(large_result(), key="task/2"))
+
+        assert isinstance(lazy, LazyResult)
+        assert lazy["status"] == "success"
+        assert not lazy.loaded
+        assert len(lazy["features"]) == 1000
+        assert lazy.loaded
+        assert dict(lazy) == large_result()
+
+    def test_lazy_result_does_not_shadow_result_fields(self, tmp_path):
+        """Test reference metadata such as size and key never replaces result fields."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = {**large_result(), "size": 3, "key": "result-key"}
+        lazy = offloader.lazy(offloader.offload(result, key="task/3"))
+
+        assert lazy["size"] == 3
+        assert lazy["key"] == "result-key"
+
+    def test_size_counts_encoded_bytes(self, tmp_path):
+        """Test the reference size is the size of the stored encoding."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = {**large_result(), "label": "ä" * 10}
+
+        reference = offloader.offload(result)
+
+        assert reference["size"] == len(json.dumps(result, separators=(",", ":"), ensure_ascii=True).encode())
+
+    def test_rich_types_round_trip(self, tmp_path):
+        """Test dates, decimals and UUIDs come back with their type."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = {
+            **large_result(),
+            "processed_at": datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+            "total": Decimal("1.50"),
+            "run_id": uuid.UUID(int=1),
+        }
+
+        assert offloader.resolve(offloader.offload(result)) == result
+
+    def test_unencodable_results_are_not_offloaded(self, tmp_path):
+        """Test results that would not round-trip are returned unchanged instead of stringified."""
+        offloader = ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024)
+        result = {**large_result(), "addresses": {"a", "b"}}
+
+        assert offloader.offload(result) is result
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestBaseTaskOffloading:
+    """Tests for BaseTask result offloading."""
+
+    def test_run_offloads_large_results(self, tmp_path):
+        """Test run returns a reference that resolves to the full result."""
+        task = LargeResultTask(ResultOffloader(LocalBlobStore(tmp_path), threshold_bytes=1024))
+
+        stored = task.run({"network": "torus"})
+
+        assert is_result_reference(stored)
+        assert stored["key"].startswith("large_result_task/")
+        assert task.resolve_result(stored) == large_result()
+
+    def test_run_without_offloader(self):
+        """Test results are untouched by default."""
+        task = LargeResultTask(None)
+        assert task.run({"network": "torus"}) == large_result()
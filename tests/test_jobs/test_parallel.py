@@ -0,0 +1,150 @@
+"""Tests for chainswarm_core.jobs.parallel module."""
+
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+from chainswarm_core.db.budget import QueryBudget, get_query_budget, query_budget
+from chainswarm_core.db.concurrency import clickhouse_workload, get_clickhouse_workload
+from chainswarm_core.jobs import parallel as parallel_module
+from chainswarm_core.jobs.parallel import EXECUTOR_PROCESS, parallel_map
+from chainswarm_core.observability.metrics import MetricsRegistry
+
+
+def square(x):
+    return x * x
+
+
+def bound_budget(_):
+    return get_query_budget(), get_clickhouse_workload()
+
+
+class ConcurrencyProbe:
+    """Callable recording the peak number of concurrent calls."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def __call__(self, item):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+        return item
+
+
+class TestParallelMap:
+    """Tests for parallel_map function."""
+
+    def test_ordered_results(self):
+        """Test results are returned in input order by default."""
+        def slow_first(x):
+            time.sleep(0.02 if x == 0 else 0)
+            return x
+
+        assert parallel_map(slow_first, range(5), max_workers=5) == [0, 1, 2, 3, 4]
+
+    def test_unordered_results(self):
+        """Test ordered=False returns results in completion order."""
+        def slow_first(x):
+            time.sleep(0.05 if x == 0 else 0)
+            return x
+
+        results = parallel_map(slow_first, range(3), max_workers=3, ordered=False)
+        assert sorted(results) == [0, 1, 2]
+        assert results[-1] == 0
+
+    def test_empty(self):
+        """Test an empty input returns an empty list."""
+        assert parallel_map(square, []) == []
+
+    def test_bounded_by_max_workers(self):
+        """Test no more than max_workers items run at once."""
+        probe = ConcurrencyProbe()
+        parallel_map(probe, range(12), max_workers=3)
+        assert probe.peak <= 3
+
+    def test_capped_at_clickhouse_pool_size(self, monkeypatch):
+        """Test concurrency never exceeds the ClickHouse pool size."""
+        monkeypatch.setenv("CLICKHOUSE_POOL_SIZE", "2")
+        probe = ConcurrencyProbe()
+        parallel_map(probe, range(8), max_workers=6)
+        assert probe.peak <= 2
+
+        probe = ConcurrencyProbe()
+        parallel_map(probe, range(8), max_workers=4, limit_to_clickhouse_pool=False)
+        assert probe.peak > 2
+
+    def test_process_executor(self):
+        """Test items can be processed in a process pool."""
+        assert parallel_map(square, range(4), executor=EXECUTOR_PROCESS, max_workers=2) == [0, 1, 4, 9]
+
+    def test_unknown_executor(self):
+        """Test an unknown executor raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown executor"):
+            parallel_map(square, [1], executor="gevent")
+
+    def test_error_propagates(self):
+        """Test the first exception of func is raised."""
+        def fail_on_two(x):
+            if x == 2:
+                raise RuntimeError("boom")
+            return x
+
+        with pytest.raises(RuntimeError, match="boom"):
+            parallel_map(fail_on_two, range(5), max_workers=2)
+
+    def test_cancellation(self):
+        """Test setting the cancel event stops the map."""
+        cancel_event = threading.Event()
+        processed = []
+
+        def work(x):
+            processed.append(x)
+            if x == 1:
+                cancel_event.set()
+            time.sleep(0.01)
+            return x
+
+        with pytest.raises(CancelledError):
+            parallel_map(work, range(50), max_workers=2, cancel_event=cancel_event)
+        assert len(processed) < 50
+
+    def test_records_item_durations(self, monkeypatch):
+        """Test each completed item is observed in the duration histogram."""
+        metrics_registry = MetricsRegistry("test-parallel")
+        monkeypatch.setattr(parallel_module, "get_default_metrics_registry", lambda: metrics_registry)
+
+        parallel_map(square, range(4), name="squares")
+
+        count = metrics_registry.registry.get_sample_value(
+            "parallel_map_item_duration_seconds_count", {"name": "squares"}
+        )
+        assert count == 4
+
+    def test_items_inherit_budget_and_workload(self):
+        """Test thread pool items see the query budget and workload of the caller."""
+        budget = QueryBudget(max_threads=4)
+
+        def bound(_):
+            return get_query_budget(), get_clickhouse_workload()
+
+        with query_budget(budget), clickhouse_workload("heavy"):
+            results = parallel_map(bound, range(3), max_workers=3)
+
+        assert results == [(budget, "heavy")] * 3
+
+    def test_process_items_inherit_budget_and_workload(self):
+        """Test process pool items get the budget and workload passed along."""
+        budget = QueryBudget(max_memory_usage=1024)
+        with query_budget(budget), clickhouse_workload("heavy"):
+            results = parallel_map(bound_budget, range(2), executor=EXECUTOR_PROCESS, max_workers=2)
+
+        assert results == [(budget, "heavy")] * 2
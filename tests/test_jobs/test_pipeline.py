@@ -0,0 +1,171 @@
+"""Tests for chainswarm_core.jobs.pipeline module."""
+
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from chainswarm_core.db.base_repository import BaseRepository
+from chainswarm_core.db.budget import QueryBudget, query_budget
+from chainswarm_core.db.query_tracker import inflight_queries
+from chainswarm_core.jobs.pipeline import BatchPipeline
+
+
+class ConcreteRepository(BaseRepository):
+    """Concrete implementation for testing."""
+
+    @classmethod
+    def table_name(cls) -> str:
+        return "transfers"
+
+
+def _blocks(count: int, size: int = 10):
+    for i in range(count):
+        yield [(i * size + j,) for j in range(size)]
+
+
+class TestBatchPipeline:
+    """Tests for BatchPipeline class."""
+
+    def test_processes_all_blocks_in_order(self):
+        """Test every row flows through transform into the sink in order."""
+        written = []
+        pipeline = BatchPipeline(
+            source=_blocks(5),
+            transform=lambda block: [(row[0] * 2,) for row in block],
+            sink=written.extend,
+            cancel_event=threading.Event(),
+        )
+        stats = pipeline.run()
+
+        assert [row[0] for row in written] == [i * 2 for i in range(50)]
+        assert stats.source.rows == 50
+        assert stats.sink.blocks == 5
+        assert not stats.cancelled
+
+    def test_sink_buffer_rows(self):
+        """Test sink is called with buffered row counts."""
+        sizes = []
+        BatchPipeline(
+            source=_blocks(5),
+            transform=lambda block: block,
+            sink=lambda rows: sizes.append(len(rows)),
+            sink_buffer_rows=25,
+            cancel_event=threading.Event(),
+        ).run()
+
+        assert sizes == [30, 20]
+
+    def test_stages_overlap(self):
+        """Test fetch and transform run concurrently with the sink."""
+        def slow_source():
+            for block in _blocks(4):
+                time.sleep(0.05)
+                yield block
+
+        def slow_transform(block):
+            time.sleep(0.05)
+            return block
+
+        started = time.perf_counter()
+        BatchPipeline(
+            source=slow_source(),
+            transform=slow_transform,
+            sink=lambda rows: time.sleep(0.05),
+            cancel_event=threading.Event(),
+        ).run()
+
+        # Sequential execution would take 12 * 0.05 = 0.6s
+        assert time.perf_counter() - started < 0.45
+
+    def test_transform_error_is_raised(self):
+        """Test a failing stage stops the pipeline and re-raises."""
+        def failing(block):
+            raise ValueError("bad block")
+
+        pipeline = BatchPipeline(
+            source=_blocks(100),
+            transform=failing,
+            sink=MagicMock(),
+            cancel_event=threading.Event(),
+        )
+        with pytest.raises(ValueError, match="bad block"):
+            pipeline.run()
+
+    def test_cancel_event_stops_source(self):
+        """Test setting the cancel event ends the run early."""
+        cancel = threading.Event()
+        written = []
+
+        def sink(rows):
+            written.extend(rows)
+            cancel.set()
+
+        stats = BatchPipeline(
+            source=_blocks(1000),
+            transform=lambda block: block,
+            sink=sink,
+            queue_size=1,
+            cancel_event=cancel,
+        ).run()
+
+        assert stats.cancelled
+        assert stats.source.blocks < 1000
+
+    def test_source_closed_on_error(self):
+        """Test the source generator is closed when a later stage fails."""
+        closed = []
+
+        def source():
+            try:
+                for i in range(1000):
+                    yield [i]
+            finally:
+                closed.append(True)
+
+        def failing(block):
+            raise ValueError("bad block")
+
+        with pytest.raises(ValueError):
+            BatchPipeline(source(), failing, MagicMock(), cancel_event=threading.Event()).run()
+
+        assert closed == [True]
+
+    def test_rejects_invalid_queue_size(self):
+        """Test queue_size below 1 raises ValueError."""
+        with pytest.raises(ValueError, match="queue_size"):
+            BatchPipeline([], lambda b: b, MagicMock(), queue_size=0)
+
+
+class TestRepositoryStream:
+    """Tests for BaseRepository._stream."""
+
+    def test_stream_yields_blocks(self, mock_clickhouse_client):
+        """Test blocks from the row block stream are yielded."""
+        stream = MagicMock()
+        stream.__enter__.return_value = iter([[(1,)], [(2,)]])
+        mock_clickhouse_client.query_row_block_stream.return_value = stream
+        repo = ConcreteRepository(mock_clickhouse_client)
+
+        assert list(repo._stream("SELECT id FROM transfers")) == [[(1,)], [(2,)]]
+        settings = mock_clickhouse_client.query_row_block_stream.call_args.kwargs["settings"]
+        assert "query_id" in settings
+
+    def test_stream_source_keeps_budget_and_is_closed(self, mock_clickhouse_client):
+        """Test a streamed source runs with the caller's budget and leaves no in-flight query."""
+        stream = MagicMock()
+        stream.__enter__.return_value = iter([[(i,)] for i in range(100)])
+        mock_clickhouse_client.query_row_block_stream.return_value = stream
+        repo = ConcreteRepository(mock_clickhouse_client)
+        cancel = threading.Event()
+
+        def sink(rows):
+            cancel.set()
+
+        with query_budget(QueryBudget(max_threads=2)):
+            BatchPipeline(repo._stream("SELECT id"), lambda b: b, sink, queue_size=1, cancel_event=cancel).run()
+
+        settings = mock_clickhouse_client.query_row_block_stream.call_args.kwargs["settings"]
+        assert settings["max_threads"] == 2
+        assert inflight_queries.snapshot() == []
@@ -0,0 +1,196 @@
+"""Tests for chainswarm_core.jobs.profiling module."""
+
+import pstats
+import time
+
+import pytest
+from celery import Celery
+
+from chainswarm_core.jobs import profiling as profiling_module
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.profiling import (
+    PROFILE_HEADER,
+    ProfilingConfig,
+    StackSampler,
+    profile,
+)
+from chainswarm_core.observability import set_correlation_id
+
+
+def busy_work(seconds=0.05):
+    deadline = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(100))
+    return total
+
+
+class ProfiledTask(BaseTask):
+    """Task doing some CPU work."""
+
+    name = "profiled.task"
+
+    def __init__(self, profiling):
+        self.profiling = profiling
+        Celery("test_profiling").register_task(self)
+
+    def execute_task(self, context):
+        busy_work()
+        return {"network": context["network"], "status": "success"}
+
+
+class TestProfilingConfig:
+    """Tests for ProfilingConfig class."""
+
+    def test_from_env(self, monkeypatch):
+        """Test configuration is read from environment variables."""
+        monkeypatch.setenv("CHAINSWARM_PROFILE", "cprofile")
+        monkeypatch.setenv("CHAINSWARM_PROFILE_RATE", "0.25")
+        monkeypatch.setenv("CHAINSWARM_PROFILE_DIR", "/tmp/p")
+
+        config = ProfilingConfig.from_env()
+
+        assert config == ProfilingConfig(mode="cprofile", sample_rate=0.25, directory="/tmp/p")
+
+    def test_invalid_numbers_use_defaults(self, monkeypatch):
+        """Test unparsable rate and interval values fall back to the defaults."""
+        monkeypatch.setenv("CHAINSWARM_PROFILE_RATE", "ten percent")
+        monkeypatch.setenv("CHAINSWARM_PROFILE_INTERVAL", "")
+
+        config = ProfilingConfig.from_env()
+
+        assert config.sample_rate == 1.0
+        assert config.interval == 0.005
+
+    def test_unknown_mode_disables(self, monkeypatch):
+        """Test an unknown profiler in the environment disables profiling."""
+        monkeypatch.setenv("CHAINSWARM_PROFILE", "perf")
+        assert ProfilingConfig.from_env().mode is None
+
+    def test_select(self):
+        """Test header, mode and sample rate decide the profiler."""
+        assert ProfilingConfig().select() is None
+        assert ProfilingConfig().select(header=True) == "sampler"
+        assert ProfilingConfig().select(header="cprofile") == "cprofile"
+        assert ProfilingConfig(mode="cprofile").select() == "cprofile"
+        assert ProfilingConfig(mode="cprofile", sample_rate=0).select() is None
+
+
+class TestStackSampler:
+    """Tests for StackSampler class."""
+
+    def test_collects_collapsed_stacks(self):
+        """Test samples of the target thread are aggregated root first."""
+        sampler = StackSampler(interval=0.001)
+        sampler.start()
+        busy_work(0.1)
+        sampler.stop()
+
+        assert sampler.samples > 0
+        lines = sampler.collapsed().splitlines()
+        assert any("busy_work" in line for line in lines)
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0
+        assert ";" in stack
+
+
+class TestProfile:
+    """Tests for the profile context manager."""
+
+    def test_disabled(self, tmp_path):
+        """Test mode None profiles nothing."""
+        with profile(None, "t", tmp_path) as path:
+            pass
+        assert path is None
+        assert list(tmp_path.iterdir()) == []
+
+    def test_cprofile_writes_pstats(self, tmp_path):
+        """Test cProfile output is a loadable pstats file named after task and correlation id."""
+        set_correlation_id("req_abc")
+        with profile("cprofile", "my.task", tmp_path) as path:
+            busy_work(0.01)
+
+        assert path.name.startswith("my.task-req_abc-")
+        assert path.suffix == ".pstats"
+        assert pstats.Stats(str(path)).total_calls > 0
+
+    def test_sampler_writes_collapsed(self, tmp_path):
+        """Test the sampler writes collapsed stacks."""
+        with profile("sampler", "t", tmp_path, interval=0.001) as path:
+            busy_work(0.05)
+
+        assert path.suffix == ".collapsed"
+        assert "busy_work" in path.read_text()
+
+    def test_cprofile_busy_falls_back_to_sampler(self, tmp_path, monkeypatch):
+        """Test a cProfile that cannot be enabled falls back to the sampler."""
+        class BusyProfile:
+            def enable(self):
+                raise ValueError("Another profiling tool is already active")
+
+        monkeypatch.setattr(profiling_module.cProfile, "Profile", BusyProfile)
+        with profile("cprofile", "t", tmp_path, interval=0.001) as path:
+            busy_work(0.02)
+
+        assert path.suffix == ".collapsed"
+        assert path.exists()
+
+    def test_write_failure_does_not_fail_block(self, tmp_path, monkeypatch):
+        """Test a profile that cannot be written is reported, not raised."""
+        monkeypatch.setattr(
+            profiling_module, "profile_path", lambda directory, task_name, extension: tmp_path / "missing" / "p"
+        )
+        with profile("sampler", "t", tmp_path, interval=0.001) as path:
+            busy_work(0.01)
+
+        assert not path.exists()
+
+    def test_unwritable_directory_runs_unprofiled(self, tmp_path):
+        """Test a profile directory that cannot be created leaves the block unprofiled."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+
+        with profile("cprofile", "t", blocker / "profiles") as path:
+            busy_work(0.01)
+
+        assert path is None
+
+    def test_unknown_mode(self, tmp_path):
+        """Test an unknown profiler raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown profiler"):
+            with profile("perf", "t", tmp_path):
+                pass
+
+
+class TestBaseTaskProfiling:
+    """Tests for profiling in BaseTask.run."""
+
+    def test_profiles_when_enabled(self, tmp_path):
+        """Test an enabled configuration writes one profile per run."""
+        task = ProfiledTask(ProfilingConfig(mode="sampler", directory=str(tmp_path), interval=0.001))
+        task.run({"network": "torus"})
+        assert len(list(tmp_path.glob("profiled.task-*.collapsed"))) == 1
+
+    def test_header_forces_profiling(self, tmp_path):
+        """Test the profile header enables profiling for a single task."""
+        task = ProfiledTask(ProfilingConfig(directory=str(tmp_path)))
+        task.push_request(headers={PROFILE_HEADER: "cprofile"})
+        try:
+            task.run({"network": "torus"})
+        finally:
+            task.pop_request()
+        assert len(list(tmp_path.glob("*.pstats"))) == 1
+
+    def test_unwritable_directory_does_not_fail_task(self, tmp_path):
+        """Test the task still runs when CHAINSWARM_PROFILE_DIR cannot be created."""
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        task = ProfiledTask(ProfilingConfig(mode="sampler", directory=str(blocker / "profiles")))
+
+        assert task.run({"network": "torus"})["status"] == "success"
+
+    def test_disabled_by_default(self, tmp_path):
+        """Test nothing is written without configuration or header."""
+        task = ProfiledTask(ProfilingConfig(directory=str(tmp_path)))
+        task.run({"network": "torus"})
+        assert not tmp_path.exists() or list(tmp_path.iterdir()) == []
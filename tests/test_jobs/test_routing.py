@@ -0,0 +1,116 @@
+"""Tests for chainswarm_core.jobs.routing module."""
+
+import pytest
+from celery.signals import before_task_publish
+
+from chainswarm_core.jobs.celery import create_celery_app
+from chainswarm_core.jobs.routing import (
+    LANE_HEADER,
+    LANES_BY_NETWORK_TYPE,
+    PRIORITY_LOW,
+    PRIORITY_NORMAL,
+    NetworkRouter,
+    configure_network_lanes,
+    lane_for_network,
+)
+
+
+class TestLaneForNetwork:
+    """Tests for lane_for_network function."""
+
+    def test_network_strategy(self):
+        """Test each supported network is its own lane."""
+        assert lane_for_network("torus") == "torus"
+        assert lane_for_network("BITCOIN") == "bitcoin"
+        assert lane_for_network("unknown") is None
+
+    def test_network_type_strategy(self):
+        """Test networks map to their NetworkType lane."""
+        assert lane_for_network("torus", LANES_BY_NETWORK_TYPE) == "substrate"
+        assert lane_for_network("torus_evm", LANES_BY_NETWORK_TYPE) == "evm"
+        assert lane_for_network("bitcoin", LANES_BY_NETWORK_TYPE) == "utxo"
+
+    def test_unknown_strategy(self):
+        """Test an unknown strategy raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown lane strategy"):
+            lane_for_network("torus", "region")
+
+
+class TestNetworkRouter:
+    """Tests for NetworkRouter class."""
+
+    def test_routes_by_context_network(self):
+        """Test the network is read from the positional context."""
+        router = NetworkRouter(queue_prefix="lane.")
+        assert router("t", ({"network": "torus"},), {}, {}) == {"queue": "lane.torus", "routing_key": "lane.torus"}
+
+    def test_routes_by_keyword_context(self):
+        """Test the network is read from a context keyword argument."""
+        router = NetworkRouter(LANES_BY_NETWORK_TYPE)
+        assert router("t", (), {"context": {"network": "bitcoin"}}, {})["queue"] == "utxo"
+
+    def test_falls_through(self):
+        """Test explicit queues, missing networks and unknown networks are not routed."""
+        router = NetworkRouter(networks=["torus"])
+        assert router("t", ({"network": "torus"},), {}, {"queue": "manual"}) is None
+        assert router("t", (), {}, {}) is None
+        assert router("t", ({"network": "bitcoin"},), {}, {}) is None
+
+
+class TestConfigureNetworkLanes:
+    """Tests for configure_network_lanes and create_celery_app integration."""
+
+    def test_config_contains_queues_and_priorities(self):
+        """Test one queue per lane plus the default queue."""
+        config = configure_network_lanes(LANES_BY_NETWORK_TYPE)
+
+        assert [q.name for q in config["task_queues"]] == ["default", "substrate", "evm", "utxo"]
+        assert config["task_default_priority"] == PRIORITY_NORMAL
+        assert config["task_queue_max_priority"] == PRIORITY_LOW
+        assert "queue_order_strategy" not in config["broker_transport_options"]
+
+    def test_lane_header_is_stamped(self):
+        """Test published messages routed to a lane carry the lane header."""
+        configure_network_lanes(queue_prefix="hdr.")
+        headers = {}
+
+        before_task_publish.send(sender="t", body=None, headers=headers, routing_key="hdr.torus")
+
+        assert headers[LANE_HEADER] == "torus"
+
+    def test_unrouted_messages_have_no_header(self):
+        """Test messages on other queues are left alone."""
+        configure_network_lanes(queue_prefix="hdr.")
+        headers = {}
+
+        before_task_publish.send(sender="t", body=None, headers=headers, routing_key="default")
+
+        assert LANE_HEADER not in headers
+
+    def test_create_celery_app_routes_tasks(self):
+        """Test create_celery_app wires the router when network_lanes is set."""
+        app = create_celery_app("test_routing", autodiscover=[], network_lanes="network")
+
+        route = app.amqp.router.route({}, "some.task", ({"network": "bitcoin"},), {})
+
+        assert route["queue"].name == "bitcoin"
+        assert app.conf.task_default_queue == "default"
+
+    def test_create_celery_app_merges_transport_options(self):
+        """Test broker_transport_options overrides are merged with the lane options."""
+        app = create_celery_app(
+            "test_routing_transport",
+            autodiscover=[],
+            network_lanes="network",
+            broker_transport_options={"visibility_timeout": 7200},
+        )
+
+        options = app.conf.broker_transport_options
+        assert options["visibility_timeout"] == 7200
+        assert options["sep"] == ":"
+        assert "priority_steps" in options
+
+    def test_create_celery_app_without_lanes(self):
+        """Test lanes are off by default."""
+        app = create_celery_app("test_routing_plain", autodiscover=[])
+        assert app.conf.task_routes is None
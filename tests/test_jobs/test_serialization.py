@@ -0,0 +1,104 @@
+"""Tests for chainswarm_core.jobs.serialization module."""
+
+from datetime import date, datetime, timezone
+
+import pytest
+
+pytest.importorskip("msgpack")
+pytest.importorskip("zstandard")
+
+from kombu.serialization import dumps, loads
+
+from chainswarm_core.jobs.celery import create_celery_app
+from chainswarm_core.jobs.models import BaseTaskContext, BaseTaskResult
+from chainswarm_core.jobs.serialization import (
+    MSGPACK_CONTENT_TYPE,
+    MSGPACK_SERIALIZER,
+    TaskPayloadCodec,
+    benchmark,
+    register_msgpack_serializer,
+)
+
+
+class TestTaskPayloadCodec:
+    """Tests for TaskPayloadCodec class."""
+
+    def test_round_trips_task_models(self):
+        """Test context and result dataclasses decode to the same types."""
+        codec = TaskPayloadCodec()
+        payload = {
+            "context": BaseTaskContext(network="torus", processing_date="2024-01-01", window_days=7),
+            "result": BaseTaskResult(network="torus", status="success"),
+        }
+        assert codec.loads(codec.dumps(payload)) == payload
+
+    def test_round_trips_dates_and_big_ints(self):
+        """Test dates and integers beyond 64 bits survive encoding."""
+        codec = TaskPayloadCodec()
+        payload = [date(2024, 1, 1), datetime(2024, 1, 1, 12, tzinfo=timezone.utc), 2 ** 200, -(2 ** 70)]
+        assert codec.loads(codec.dumps(payload)) == payload
+
+    def test_compresses_above_threshold(self):
+        """Test large payloads are zstd compressed and small ones are not."""
+        codec = TaskPayloadCodec(compress_threshold=1024)
+        small = codec.dumps({"a": 1})
+        large_payload = {"rows": ["x" * 50] * 1000}
+        large = codec.dumps(large_payload)
+
+        assert small[:1] == b"\x00"
+        assert large[:1] == b"\x01"
+        assert len(large) < 1000
+        assert codec.loads(large) == large_payload
+
+    def test_uncompressed_codec_reads_compressed_payload(self):
+        """Test a codec without compression can still read compressed frames."""
+        data = TaskPayloadCodec(compress_threshold=1).dumps({"a": "b" * 100})
+        assert TaskPayloadCodec(compress_threshold=None).loads(data) == {"a": "b" * 100}
+
+    def test_unknown_frame_raises(self):
+        """Test an unknown frame marker raises ValueError."""
+        with pytest.raises(ValueError, match="frame marker"):
+            TaskPayloadCodec().loads(b"\x07abc")
+
+    def test_unsupported_type_raises(self):
+        """Test unsupported objects raise TypeError."""
+        with pytest.raises(TypeError, match="not msgpack serializable"):
+            TaskPayloadCodec().dumps(object())
+
+
+class TestRegistration:
+    """Tests for kombu registration and create_celery_app integration."""
+
+    def test_registered_with_kombu(self):
+        """Test kombu encodes through the registered serializer."""
+        register_msgpack_serializer()
+        content_type, encoding, data = dumps({"network": "torus"}, serializer=MSGPACK_SERIALIZER)
+
+        assert content_type == MSGPACK_CONTENT_TYPE
+        assert encoding == "binary"
+        assert loads(data, content_type, encoding, accept=[MSGPACK_CONTENT_TYPE]) == {"network": "torus"}
+
+    def test_create_celery_app_uses_msgpack(self):
+        """Test serializer='msgpack' switches task and result serializers."""
+        app = create_celery_app("test_serialization", autodiscover=[], serializer="msgpack")
+
+        assert app.conf.task_serializer == MSGPACK_SERIALIZER
+        assert app.conf.result_serializer == MSGPACK_SERIALIZER
+        assert app.conf.accept_content == ["json", MSGPACK_SERIALIZER]
+
+    def test_create_celery_app_rejects_unknown_serializer(self):
+        """Test an unknown serializer raises ValueError."""
+        with pytest.raises(ValueError, match="Unknown serializer"):
+            create_celery_app("test_serialization_bad", autodiscover=[], serializer="pickle")
+
+
+class TestBenchmark:
+    """Tests for benchmark function."""
+
+    def test_reports_both_codecs(self):
+        """Test the benchmark reports size and timings for JSON and msgpack."""
+        report = benchmark({"network": "torus", "values": list(range(100))}, iterations=5)
+
+        assert set(report) == {"json", "msgpack"}
+        assert report["msgpack"]["bytes"] < report["json"]["bytes"]
+        assert report["json"]["encode_us"] > 0
@@ -0,0 +1,115 @@
+"""Tests for chainswarm_core.jobs.warmup module."""
+
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+from celery.signals import worker_process_init
+
+from chainswarm_core.jobs import warmup as warmup_module
+from chainswarm_core.jobs.celery import create_celery_app
+from chainswarm_core.jobs.warmup import WorkerWarmup
+from chainswarm_core.observability.metrics import MetricsRegistry
+
+
+@pytest.fixture
+def factory(monkeypatch):
+    client = MagicMock()
+    created = []
+
+    class FakeClientFactory:
+        def __init__(self, params):
+            created.append(params)
+
+        @contextmanager
+        def client_context(self):
+            yield client
+
+    monkeypatch.setattr(warmup_module, "ClientFactory", FakeClientFactory)
+    load = MagicMock()
+    monkeypatch.setattr(warmup_module.schema_cache, "load", load)
+    return client, created, load
+
+
+class TestWorkerWarmup:
+    """Tests for WorkerWarmup class."""
+
+    def test_runs_steps_in_order(self, factory):
+        """Test imports, connections and callbacks run and are timed."""
+        client, created, load = factory
+        calls = []
+
+        def prime_cache():
+            calls.append("prime")
+
+        warmup = WorkerWarmup(
+            imports=["json"],
+            networks=["torus"],
+            database_prefix="analytics",
+            callbacks=[prime_cache],
+        )
+        durations = warmup.run()
+
+        assert list(durations) == ["import:json", "clickhouse:torus", "callback:prime_cache", "total"]
+        assert created[0]["database"] == "analytics_torus"
+        client.query.assert_called_once_with("SELECT 1")
+        load.assert_called_once_with(client, "analytics_torus")
+        assert calls == ["prime"]
+
+    def test_schema_load_is_optional(self, factory):
+        """Test load_schema=False only opens the connection."""
+        _, _, load = factory
+        WorkerWarmup(networks=["torus"], load_schema=False).run()
+        load.assert_not_called()
+
+    def test_failing_step_does_not_stop_warmup(self):
+        """Test a failing step is skipped and later steps still run."""
+        calls = []
+
+        def broken():
+            raise RuntimeError("boom")
+
+        durations = WorkerWarmup(imports=["no_such_module_xyz"], callbacks=[broken, lambda: calls.append(1)]).run()
+
+        assert calls == [1]
+        assert "import:no_such_module_xyz" in durations
+
+    def test_skips_steps_past_time_budget(self):
+        """Test steps left after the time budget is used up are skipped."""
+        calls = []
+
+        durations = WorkerWarmup(
+            callbacks=[lambda: calls.append(1), lambda: calls.append(2)],
+            time_budget_seconds=-1,
+        ).run()
+
+        assert calls == []
+        assert list(durations) == ["total"]
+
+    def test_records_metrics(self, monkeypatch):
+        """Test step durations are observed in the warm-up histogram."""
+        metrics_registry = MetricsRegistry("test-warmup")
+        monkeypatch.setattr(warmup_module, "get_default_metrics_registry", lambda: metrics_registry)
+
+        WorkerWarmup(imports=["json"]).run()
+
+        registry = metrics_registry.registry
+        assert registry.get_sample_value("worker_warmup_duration_seconds_count", {"step": "total"}) == 1
+        assert registry.get_sample_value("worker_warmup_duration_seconds_count", {"step": "import:json"}) == 1
+
+    def test_runs_on_worker_process_init(self):
+        """Test create_celery_app installs the warm-up on worker_process_init."""
+        calls = []
+        create_celery_app("test_warmup", autodiscover=[], warmup=WorkerWarmup(callbacks=[lambda: calls.append(1)]))
+
+        worker_process_init.send(sender=None)
+
+        assert calls == [1]
+
+    def test_raises_worker_alive_timeout(self):
+        """Test create_celery_app sets worker_proc_alive_timeout to cover the warm-up budget."""
+        app = create_celery_app(
+            "test_warmup_timeout", autodiscover=[], warmup=WorkerWarmup(time_budget_seconds=20)
+        )
+
+        assert app.conf.worker_proc_alive_timeout == 20 + warmup_module.ALIVE_TIMEOUT_MARGIN_SECONDS
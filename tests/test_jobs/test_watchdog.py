@@ -0,0 +1,136 @@
+"""Tests for chainswarm_core.jobs.watchdog module."""
+
+import os
+
+import pytest
+from celery import Celery
+from celery.exceptions import Reject
+from celery.signals import task_postrun
+
+from chainswarm_core.jobs import watchdog as watchdog_module
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.celery import create_celery_app
+from chainswarm_core.jobs.watchdog import MemoryWatchdog, get_memory_watchdog
+from chainswarm_core.observability.metrics import MetricsRegistry
+
+MiB = 1024 * 1024
+
+
+@pytest.fixture(autouse=True)
+def reset_watchdog(monkeypatch):
+    monkeypatch.setattr(watchdog_module, "_active_watchdog", None)
+
+
+@pytest.fixture
+def rss(monkeypatch):
+    state = {"rss": 100 * MiB}
+    monkeypatch.setattr(watchdog_module, "get_rss_bytes", lambda: state["rss"])
+    return state
+
+
+class SimpleTask(BaseTask):
+    """Task returning success."""
+
+    name = "simple_task"
+
+    def __init__(self):
+        Celery("test_watchdog").register_task(self)
+
+    def execute_task(self, context):
+        return {"network": context["network"], "status": "success"}
+
+
+class TestMemoryWatchdog:
+    """Tests for MemoryWatchdog class."""
+
+    def test_hard_limit_defaults_above_soft(self):
+        """Test the hard limit defaults to 125% of the soft limit."""
+        assert MemoryWatchdog(soft_limit_bytes=100).hard_limit_bytes == 125
+
+    def test_rejects_hard_below_soft(self):
+        """Test inconsistent limits raise ValueError."""
+        with pytest.raises(ValueError, match="below soft limit"):
+            MemoryWatchdog(soft_limit_bytes=100, hard_limit_bytes=50)
+
+    def test_celery_config_in_kib(self):
+        """Test the soft limit maps to worker_max_memory_per_child in KiB."""
+        assert MemoryWatchdog(soft_limit_bytes=512 * MiB).celery_config() == {"worker_max_memory_per_child": 512 * 1024}
+        assert MemoryWatchdog().celery_config() == {}
+
+    def test_hard_limit_only_recycles(self):
+        """Test a hard limit alone still recycles the child instead of rejecting forever."""
+        assert MemoryWatchdog(hard_limit_bytes=512 * MiB).celery_config() == {"worker_max_memory_per_child": 512 * 1024}
+
+    def test_from_env(self, monkeypatch):
+        """Test limits are read in MiB from the environment."""
+        monkeypatch.delenv("WORKER_MEMORY_SOFT_LIMIT_MB", raising=False)
+        monkeypatch.delenv("WORKER_MEMORY_HARD_LIMIT_MB", raising=False)
+        assert MemoryWatchdog.from_env() is None
+
+        monkeypatch.setenv("WORKER_MEMORY_SOFT_LIMIT_MB", "1024")
+        watchdog = MemoryWatchdog.from_env()
+        assert watchdog.soft_limit_bytes == 1024 * MiB
+        assert watchdog.hard_limit_bytes == 1280 * MiB
+
+    def test_check_admission(self, rss):
+        """Test tasks are rejected with requeue only above the hard limit."""
+        watchdog = MemoryWatchdog(soft_limit_bytes=150 * MiB, hard_limit_bytes=200 * MiB)
+        watchdog.check_admission("t")
+
+        rss["rss"] = 250 * MiB
+        with pytest.raises(Reject) as excinfo:
+            watchdog.check_admission("t")
+        assert excinfo.value.requeue
+
+    def test_sample_sets_child_gauge(self, rss, monkeypatch):
+        """Test sampling exports the per-child RSS gauge."""
+        metrics_registry = MetricsRegistry("test-watchdog")
+        monkeypatch.setattr(watchdog_module, "get_default_metrics_registry", lambda: metrics_registry)
+
+        MemoryWatchdog(soft_limit_bytes=50 * MiB).after_task()
+
+        registry = metrics_registry.registry
+        assert registry.get_sample_value("worker_child_rss_bytes", {"pid": str(os.getpid())}) == 100 * MiB
+        assert registry.get_sample_value("worker_memory_recycles_total") == 1
+
+    def test_hard_limit_only_counts_recycle(self, rss, monkeypatch):
+        """Test exceeding a lone hard limit is counted as a recycle."""
+        metrics_registry = MetricsRegistry("test-watchdog-hard")
+        monkeypatch.setattr(watchdog_module, "get_default_metrics_registry", lambda: metrics_registry)
+
+        MemoryWatchdog(hard_limit_bytes=50 * MiB).after_task()
+
+        assert metrics_registry.registry.get_sample_value("worker_memory_recycles_total") == 1
+
+
+class TestWatchdogIntegration:
+    """Tests for BaseTask and create_celery_app integration."""
+
+    def test_installed_watchdog_samples_after_tasks(self, rss):
+        """Test the task_postrun signal samples RSS."""
+        watchdog = MemoryWatchdog(soft_limit_bytes=500 * MiB).install()
+
+        task_postrun.send(sender=None, task_id="1", task=None)
+
+        assert get_memory_watchdog() is watchdog
+        assert watchdog.last_rss_bytes == 100 * MiB
+
+    def test_base_task_rejects_above_hard_limit(self, rss):
+        """Test BaseTask.run refuses work above the hard limit."""
+        MemoryWatchdog(soft_limit_bytes=50 * MiB, hard_limit_bytes=80 * MiB).install()
+
+        with pytest.raises(Reject):
+            SimpleTask().run({"network": "torus"})
+
+    def test_base_task_runs_below_hard_limit(self, rss):
+        """Test BaseTask.run proceeds below the hard limit."""
+        MemoryWatchdog(soft_limit_bytes=500 * MiB).install()
+        assert SimpleTask().run({"network": "torus"})["status"] == "success"
+
+    def test_create_celery_app_sets_max_memory_per_child(self):
+        """Test create_celery_app applies the watchdog's soft limit."""
+        app = create_celery_app(
+            "test_watchdog_app", autodiscover=[], memory_watchdog=MemoryWatchdog(soft_limit_bytes=256 * MiB)
+        )
+        assert app.conf.worker_max_memory_per_child == 256 * 1024
+        assert get_memory_watchdog() is not None
@@ -0,0 +1,154 @@
+"""Tests for chainswarm_core.jobs.watermarks module."""
+
+from unittest.mock import MagicMock
+
+import pytest
+from celery import Celery
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.watermarks import ClickHouseWatermarkStore, InMemoryWatermarkStore
+
+
+class DeltaTask(BaseTask):
+    """Task recording the bounds it was run with."""
+
+    name = "delta_task"
+    latest_block = 100
+    status = "success"
+
+    def __init__(self, store):
+        self.watermark_store = store
+        self.contexts = []
+        Celery("test_watermarks").register_task(self)
+
+    def get_watermark_upper_bound(self, context):
+        return self.latest_block
+
+    def execute_task(self, context):
+        self.contexts.append(context)
+        return {"network": context["network"], "status": self.status}
+
+
+class TestInMemoryWatermarkStore:
+    """Tests for InMemoryWatermarkStore class."""
+
+    def test_get_set_reset(self):
+        """Test values are stored per (task, network) and can be reset."""
+        store = InMemoryWatermarkStore()
+        assert store.get("task", "torus") is None
+
+        store.set("task", "torus", 10)
+        store.set("task", "bitcoin", 20)
+        assert store.get("task", "torus") == 10
+
+        store.reset("task", "torus", 5)
+        assert store.get("task", "torus") == 5
+        store.reset("task", "torus")
+        assert store.get("task", "torus") is None
+        assert store.get("task", "bitcoin") == 20
+
+
+class TestClickHouseWatermarkStore:
+    """Tests for ClickHouseWatermarkStore class."""
+
+    def test_ensure_table_uses_replacing_merge_tree(self, mock_clickhouse_client):
+        """Test the table is created as a ReplacingMergeTree."""
+        ClickHouseWatermarkStore(mock_clickhouse_client).ensure_table()
+        ddl = mock_clickhouse_client.command.call_args[0][0]
+        assert "CREATE TABLE IF NOT EXISTS task_watermarks" in ddl
+        assert "ReplacingMergeTree(version)" in ddl
+
+    def test_get_returns_latest_value(self, mock_clickhouse_client):
+        """Test get reads the latest version."""
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[(42, 0, 3)])
+        store = ClickHouseWatermarkStore(mock_clickhouse_client)
+
+        assert store.get("task", "torus") == 42
+        assert mock_clickhouse_client.query.call_args[1]["parameters"] == {"task": "task", "network": "torus"}
+
+    def test_get_returns_none_without_rows_or_after_reset(self, mock_clickhouse_client):
+        """Test missing and reset watermarks read as None."""
+        store = ClickHouseWatermarkStore(mock_clickhouse_client)
+
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[(0, 0, 0)])
+        assert store.get("task", "torus") is None
+
+        mock_clickhouse_client.query.return_value = MagicMock(result_rows=[(0, 1, 2)])
+        assert store.get("task", "torus") is None
+
+    def test_set_and_reset_insert_versions(self, mock_clickhouse_client):
+        """Test updates are inserted as new versions."""
+        store = ClickHouseWatermarkStore(mock_clickhouse_client)
+
+        store.set("task", "torus", 7)
+        store.reset("task", "torus")
+
+        first, second = mock_clickhouse_client.insert.call_args_list
+        assert first[0][1][0][:4] == ["task", "torus", 7, 0]
+        assert second[0][1][0][:4] == ["task", "torus", 0, 1]
+        assert second[0][1][0][4] >= first[0][1][0][4]
+
+
+class TestBaseTaskWatermarks:
+    """Tests for BaseTask watermark handling."""
+
+    def test_first_run_has_no_lower_bound(self):
+        """Test the first run gets from_watermark None and commits the upper bound."""
+        store = InMemoryWatermarkStore()
+        task = DeltaTask(store)
+
+        task.run({"network": "torus", "window_days": 7})
+
+        assert task.contexts[0]["from_watermark"] is None
+        assert task.contexts[0]["to_watermark"] == 100
+        assert store.get("delta_task", "torus") == 100
+
+    def test_next_run_processes_delta(self):
+        """Test a later run starts at the stored watermark."""
+        store = InMemoryWatermarkStore()
+        store.set("delta_task", "torus", 100)
+        task = DeltaTask(store)
+        task.latest_block = 150
+
+        task.run({"network": "torus"})
+
+        assert (task.contexts[0]["from_watermark"], task.contexts[0]["to_watermark"]) == (100, 150)
+        assert store.get("delta_task", "torus") == 150
+
+    def test_failed_run_does_not_advance(self):
+        """Test the watermark is only committed on success."""
+        store = InMemoryWatermarkStore()
+        store.set("delta_task", "torus", 100)
+        task = DeltaTask(store)
+        task.status = "failed"
+        task.latest_block = 150
+
+        task.run({"network": "torus"})
+
+        assert store.get("delta_task", "torus") == 100
+
+    def test_explicit_bounds_take_precedence(self):
+        """Test bounds set in the context are kept."""
+        store = InMemoryWatermarkStore()
+        store.set("delta_task", "torus", 100)
+        task = DeltaTask(store)
+
+        task.run({"network": "torus", "from_watermark": 10, "to_watermark": 20})
+
+        assert (task.contexts[0]["from_watermark"], task.contexts[0]["to_watermark"]) == (10, 20)
+
+    def test_reset_watermark(self):
+        """Test reset_watermark reprocesses from the given position."""
+        store = InMemoryWatermarkStore()
+        store.set("delta_task", "torus", 100)
+        task = DeltaTask(store)
+
+        task.reset_watermark("torus", 50)
+        assert store.get("delta_task", "torus") == 50
+        task.reset_watermark("torus")
+        assert store.get("delta_task", "torus") is None
+
+    def test_reset_without_store_raises(self):
+        """Test reset_watermark requires a store."""
+        with pytest.raises(ValueError, match="no watermark store"):
+            DeltaTask(None).reset_watermark("torus")
@@ -0,0 +1,192 @@
+"""Tests for chainswarm_core.jobs.windows module."""
+
+from datetime import date
+from unittest.mock import patch
+
+import pytest
+from celery import Celery
+
+from chainswarm_core.jobs.base_task import BaseTask
+from chainswarm_core.jobs.models import BaseTaskContext
+from chainswarm_core.jobs.windows import (
+    WINDOW_PART_HEADER,
+    merge_window_results,
+    split_date_range,
+    window_contexts,
+)
+
+
+@pytest.fixture
+def app():
+    app = Celery("test_windows", set_as_current=True)
+    app.conf.task_always_eager = False
+
+    class SplitTask(BaseTask):
+        name = "test_split_task"
+        window_split_days = 10
+        window_max_parallel = 2
+
+        def execute_task(self, context):
+            return {"network": context["network"], "status": "success"}
+
+    app.register_task(SplitTask())
+    app.finalize()
+    return app
+
+
+class TestSplitDateRange:
+    """Tests for split_date_range function."""
+
+    def test_splits_into_max_days(self):
+        """Test windows are at most max_days long and cover the range."""
+        windows = split_date_range("2024-01-01", "2024-01-25", 10, align="day")
+        assert windows == [
+            (date(2024, 1, 1), date(2024, 1, 10)),
+            (date(2024, 1, 11), date(2024, 1, 20)),
+            (date(2024, 1, 21), date(2024, 1, 25)),
+        ]
+
+    def test_month_alignment_does_not_cross_partitions(self):
+        """Test month alignment cuts windows at month boundaries."""
+        windows = split_date_range("2024-01-25", "2024-03-05", 31)
+        assert windows == [
+            (date(2024, 1, 25), date(2024, 1, 31)),
+            (date(2024, 2, 1), date(2024, 2, 29)),
+            (date(2024, 3, 1), date(2024, 3, 5)),
+        ]
+
+    def test_december_rolls_over_year(self):
+        """Test month alignment across a year boundary."""
+        windows = split_date_range(date(2023, 12, 30), date(2024, 1, 2), 7)
+        assert windows == [
+            (date(2023, 12, 30), date(2023, 12, 31)),
+            (date(2024, 1, 1), date(2024, 1, 2)),
+        ]
+
+    def test_single_day(self):
+        """Test a one-day range yields one window."""
+        assert split_date_range("2024-05-05", "2024-05-05", 3) == [(date(2024, 5, 5), date(2024, 5, 5))]
+
+    def test_invalid_arguments(self):
+        """Test invalid arguments raise ValueError."""
+        with pytest.raises(ValueError, match="max_days"):
+            split_date_range("2024-01-01", "2024-01-02", 0)
+        with pytest.raises(ValueError, match="alignment"):
+            split_date_range("2024-01-01", "2024-01-02", 1, align="week")
+        with pytest.raises(ValueError, match="before start"):
+            split_date_range("2024-01-02", "2024-01-01", 1)
+
+
+class TestWindowContexts:
+    """Tests for window_contexts function."""
+
+    def test_narrows_dates_and_keeps_other_fields(self):
+        """Test sub-window contexts keep the rest of the context."""
+        windows = [(date(2024, 1, 1), date(2024, 1, 10)), (date(2024, 1, 11), date(2024, 1, 12))]
+        contexts = window_contexts({"network": "torus", "window_days": 7}, windows)
+        assert contexts == [
+            {"network": "torus", "window_days": 7, "start_date": "2024-01-01", "end_date": "2024-01-10"},
+            {"network": "torus", "window_days": 7, "start_date": "2024-01-11", "end_date": "2024-01-12"},
+        ]
+
+
+class TestBaseTaskWindowSplitting:
+    """Tests for BaseTask window splitting."""
+
+    def test_disabled_by_default(self, app):
+        """Test tasks without window_split_days never split."""
+
+        class PlainTask(BaseTask):
+            name = "plain"
+
+            def execute_task(self, context):
+                return {}
+
+        task = PlainTask()
+        assert not task.should_split_window({"network": "torus", "start_date": "2024-01-01", "end_date": "2024-06-01"})
+
+    def test_splits_multi_window_range(self, app):
+        """Test a range spanning several sub-windows is split."""
+        task = app.tasks["test_split_task"]
+        context = {"network": "torus", "start_date": "2024-01-01", "end_date": "2024-01-25"}
+        task.push_request(called_directly=False)
+        try:
+            assert task.should_split_window(context)
+        finally:
+            task.pop_request()
+
+    def test_splits_dataclass_context(self, app):
+        """Test a BaseTaskContext (as decoded by the msgpack codec) is split like a dict."""
+        task = app.tasks["test_split_task"]
+        context = BaseTaskContext(network="torus", start_date="2024-01-01", end_date="2024-01-25")
+        task.push_request(called_directly=False)
+        try:
+            assert task.should_split_window(context)
+            with patch("chainswarm_core.jobs.windows.chord") as chord:
+                task.build_window_chord(context)
+        finally:
+            task.pop_request()
+
+        header = chord.call_args.args[0]
+        assert header[0].args[0]["start_date"] == "2024-01-01"
+        assert header[0].args[0]["network"] == "torus"
+
+    def test_does_not_split_single_window_or_sub_window(self, app):
+        """Test short ranges and sub-window tasks run directly."""
+        task = app.tasks["test_split_task"]
+        task.push_request(called_directly=False)
+        try:
+            assert not task.should_split_window({"network": "torus", "start_date": "2024-01-01", "end_date": "2024-01-05"})
+        finally:
+            task.pop_request()
+
+        task.push_request(called_directly=False, headers={WINDOW_PART_HEADER: True})
+        try:
+            assert not task.should_split_window({"network": "torus", "start_date": "2024-01-01", "end_date": "2024-01-25"})
+        finally:
+            task.pop_request()
+
+    def test_called_directly_runs_serially(self, app):
+        """Test a direct call runs the whole range in-process."""
+        task = app.tasks["test_split_task"]
+        result = task({"network": "torus", "start_date": "2024-01-01", "end_date": "2024-01-25"})
+        assert result == {"network": "torus", "status": "success"}
+
+    def test_chord_is_capped_by_max_parallel(self, app):
+        """Test the first wave holds at most window_max_parallel sub-windows."""
+        task = app.tasks["test_split_task"]
+        context = {"network": "torus", "start_date": "2024-01-01", "end_date": "2024-01-25"}
+
+        sig = task.build_window_chord(context)
+
+        assert len(sig.tasks) == 2
+        assert [s.args[0]["start_date"] for s in sig.tasks] == ["2024-01-01", "2024-01-11"]
+        assert all(s.options["headers"] == {WINDOW_PART_HEADER: True} for s in sig.tasks)
+        _, _, pending, max_parallel, collected = sig.body.args
+        assert [c["start_date"] for c in pending] == ["2024-01-21"]
+        assert max_parallel == 2
+        assert collected == []
+
+    def test_reducer_merges_when_nothing_pending(self, app):
+        """Test the reducer merges collected and current results."""
+        context = {"network": "torus", "window_days": 7}
+        results = [{"status": "success"}, {"status": "failed"}]
+
+        merged = merge_window_results.run(results, "test_split_task", context, [], 2, [{"status": "success"}])
+
+        assert merged["network"] == "torus"
+        assert merged["status"] == "failed"
+        assert merged["windows"] == 3
+        assert merged["failed_windows"] == 1
+
+    def test_reducer_dispatches_next_wave(self, app):
+        """Test the reducer replaces itself with the next wave's chord."""
+        pending = [{"network": "torus", "start_date": "2024-01-21", "end_date": "2024-01-25"}]
+
+        with patch.object(merge_window_results, "replace", side_effect=lambda sig: sig) as replace:
+            sig = merge_window_results.run([{"status": "success"}], "test_split_task", {"network": "torus"}, pending, 2, [])
+
+        replace.assert_called_once()
+        assert len(sig.tasks) == 1
+        assert sig.body.args[2] == []
+        assert sig.body.args[4] == [{"status": "success"}]